@@ -2,14 +2,18 @@
 Módulo de autenticación con JWT.
 """
 
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+from modelos import get_read_db, get_async_read_db, Usuario
+from servicios.cache import CacheLRU
 
 SECRET_KEY = "tu-clave-secreta-super-segura-cambiar-en-produccion"  # En producción, usar variable de entorno
 ALGORITHM = "HS256"
@@ -20,6 +24,14 @@ oauth2_scheme = OAuth2PasswordBearer(
     scheme_name="Bearer"
 )
 
+# Usuarios autenticados recientemente, por ID. Evita consultar la tabla usuarios
+# en cada petición protegida. crud.usuario la invalida al actualizar o eliminar
+# un usuario; el TTL acota el desfase ante cambios hechos fuera de la API.
+CACHE_USUARIOS = CacheLRU(
+    max_entradas=int(os.getenv("AUTH_CACHE_MAX_USUARIOS", "1024")),
+    ttl_segundos=float(os.getenv("AUTH_CACHE_TTL_SEGUNDOS", "60")),
+)
+
 
 def verificar_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -127,7 +139,7 @@ def verificar_token(token: str) -> dict:
 
 def obtener_usuario_actual(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Usuario:
     """
     Dependencia de FastAPI para obtener el usuario actual autenticado.
@@ -136,7 +148,35 @@ def obtener_usuario_actual(
     
     Args:
         token: Token JWT obtenido del header Authorization
-        db: Sesión de base de datos
+        db: Sesión de base de datos de solo lectura
+        
+    Returns:
+        Usuario autenticado
+        
+    Raises:
+        HTTPException: Si el token es inválido o el usuario no existe
+    """
+    usuario_id = obtener_usuario_id_de_token(token)
+    usuario = CACHE_USUARIOS.obtener(usuario_id)
+    if usuario is None:
+        usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+        _guardar_usuario_en_cache(usuario)
+    return _validar_usuario_encontrado(usuario)
+
+
+async def obtener_usuario_actual_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> Usuario:
+    """
+    Versión asíncrona de obtener_usuario_actual.
+    
+    Usarla en los endpoints async para que la autenticación no ocupe un hilo
+    del threadpool.
+    
+    Args:
+        token: Token JWT obtenido del header Authorization
+        db: Sesión asíncrona de base de datos de solo lectura
         
     Returns:
         Usuario autenticado
@@ -144,6 +184,27 @@ def obtener_usuario_actual(
     Raises:
         HTTPException: Si el token es inválido o el usuario no existe
     """
+    usuario_id = obtener_usuario_id_de_token(token)
+    usuario = CACHE_USUARIOS.obtener(usuario_id)
+    if usuario is None:
+        usuario = await db.scalar(select(Usuario).where(Usuario.id == usuario_id))
+        _guardar_usuario_en_cache(usuario)
+    return _validar_usuario_encontrado(usuario)
+
+
+def obtener_usuario_id_de_token(token: str) -> int:
+    """
+    Verifica el token JWT y extrae el ID del usuario (claim "sub").
+    
+    Args:
+        token: Token JWT
+        
+    Returns:
+        ID del usuario
+        
+    Raises:
+        HTTPException: Si el token es inválido o no contiene un ID válido
+    """
     payload = verificar_token(token)
     usuario_id_str = payload.get("sub")
     
@@ -155,15 +216,48 @@ def obtener_usuario_actual(
         )
     
     try:
-        usuario_id = int(usuario_id_str)
+        return int(usuario_id_str)
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido: ID de usuario inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+def _guardar_usuario_en_cache(usuario: Optional[Usuario]) -> None:
+    """
+    Guarda en CACHE_USUARIOS una copia del usuario desligada de la sesión.
     
-    usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    La copia solo tiene las columnas (no las relaciones), de modo que se puede
+    leer después de cerrar la sesión y desde cualquier petición. Los usuarios
+    inexistentes no se guardan.
+    """
+    if usuario is None:
+        return
+    copia = Usuario(
+        id=usuario.id,
+        nombre=usuario.nombre,
+        email=usuario.email,
+        password=usuario.password,
+        rol=usuario.rol,
+    )
+    CACHE_USUARIOS.guardar(usuario.id, copia)
+
+
+def invalidar_usuario_en_cache(usuario_id: int) -> None:
+    """
+    Descarta el usuario de CACHE_USUARIOS para que la próxima petición lo lea
+    de la base. Llamar después de modificar o eliminar un usuario.
+    
+    Args:
+        usuario_id: ID del usuario
+    """
+    CACHE_USUARIOS.invalidar(usuario_id)
+
+
+def _validar_usuario_encontrado(usuario: Optional[Usuario]) -> Usuario:
+    """Lanza 401 si el usuario del token ya no existe."""
     if usuario is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -176,7 +270,7 @@ def obtener_usuario_actual(
 
 def obtener_usuario_actual_opcional(
     token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Optional[Usuario]:
     """
     Dependencia opcional para obtener el usuario actual.
@@ -12,11 +12,23 @@ from crud.usuario import (
 )
 from crud.llamada import (
     crear_llamada,
+    crear_llamadas_lote,
     obtener_llamada,
     obtener_llamadas,
     obtener_llamadas_por_usuario,
     actualizar_llamada,
     eliminar_llamada,
+    cursor_siguiente_llamadas,
+    exportar_llamadas,
+    rellenar_fecha_hora_epoch,
+    crear_llamada_async,
+    crear_llamadas_lote_async,
+    obtener_llamada_async,
+    obtener_llamadas_async,
+    obtener_llamadas_por_usuario_async,
+    exportar_llamadas_async,
+    actualizar_llamada_async,
+    eliminar_llamada_async,
 )
 from crud.clasificacion_ia import (
     crear_clasificacion_ia,
@@ -25,6 +37,17 @@ from crud.clasificacion_ia import (
     obtener_clasificaciones_ia,
     actualizar_clasificacion_ia,
     eliminar_clasificacion_ia,
+    cursor_siguiente_clasificaciones_ia,
+    crear_clasificaciones_ia_lote,
+    obtener_llamadas_para_clasificar,
+    crear_clasificacion_ia_async,
+    obtener_clasificacion_ia_async,
+    obtener_clasificacion_ia_por_llamada_async,
+    obtener_clasificaciones_ia_async,
+    actualizar_clasificacion_ia_async,
+    eliminar_clasificacion_ia_async,
+    crear_clasificaciones_ia_lote_async,
+    obtener_llamadas_para_clasificar_async,
 )
 from crud.metrica import (
     crear_metrica,
@@ -33,6 +56,14 @@ from crud.metrica import (
     obtener_metricas,
     actualizar_metrica,
     eliminar_metrica,
+    acumular_metrica_diaria,
+    reconstruir_metricas,
+    crear_metrica_async,
+    obtener_metrica_async,
+    obtener_metrica_por_fecha_async,
+    obtener_metricas_async,
+    actualizar_metrica_async,
+    eliminar_metrica_async,
 )
 from crud.reporte import (
     crear_reporte,
@@ -41,6 +72,7 @@ from crud.reporte import (
     obtener_reportes_por_usuario,
     actualizar_reporte,
     eliminar_reporte,
+    cursor_siguiente_reportes,
 )
 
 __all__ = [
@@ -53,11 +85,23 @@ __all__ = [
     "eliminar_usuario",
     # Llamada
     "crear_llamada",
+    "crear_llamadas_lote",
     "obtener_llamada",
     "obtener_llamadas",
     "obtener_llamadas_por_usuario",
     "actualizar_llamada",
     "eliminar_llamada",
+    "cursor_siguiente_llamadas",
+    "exportar_llamadas",
+    "rellenar_fecha_hora_epoch",
+    "crear_llamada_async",
+    "crear_llamadas_lote_async",
+    "obtener_llamada_async",
+    "obtener_llamadas_async",
+    "obtener_llamadas_por_usuario_async",
+    "exportar_llamadas_async",
+    "actualizar_llamada_async",
+    "eliminar_llamada_async",
     # ClasificacionIA
     "crear_clasificacion_ia",
     "obtener_clasificacion_ia",
@@ -65,6 +109,17 @@ __all__ = [
     "obtener_clasificaciones_ia",
     "actualizar_clasificacion_ia",
     "eliminar_clasificacion_ia",
+    "cursor_siguiente_clasificaciones_ia",
+    "crear_clasificaciones_ia_lote",
+    "obtener_llamadas_para_clasificar",
+    "crear_clasificacion_ia_async",
+    "obtener_clasificacion_ia_async",
+    "obtener_clasificacion_ia_por_llamada_async",
+    "obtener_clasificaciones_ia_async",
+    "actualizar_clasificacion_ia_async",
+    "eliminar_clasificacion_ia_async",
+    "crear_clasificaciones_ia_lote_async",
+    "obtener_llamadas_para_clasificar_async",
     # Metrica
     "crear_metrica",
     "obtener_metrica",
@@ -72,6 +127,14 @@ __all__ = [
     "obtener_metricas",
     "actualizar_metrica",
     "eliminar_metrica",
+    "acumular_metrica_diaria",
+    "reconstruir_metricas",
+    "crear_metrica_async",
+    "obtener_metrica_async",
+    "obtener_metrica_por_fecha_async",
+    "obtener_metricas_async",
+    "actualizar_metrica_async",
+    "eliminar_metrica_async",
     # Reporte
     "crear_reporte",
     "obtener_reporte",
@@ -79,5 +142,6 @@ __all__ = [
     "obtener_reportes_por_usuario",
     "actualizar_reporte",
     "eliminar_reporte",
+    "cursor_siguiente_reportes",
 ]
 
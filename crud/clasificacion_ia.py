@@ -2,11 +2,15 @@
 Operaciones CRUD para el modelo ClasificacionIA.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from modelos import ClasificacionIA, Llamada
 from esquemas import ClasificacionIACreate, ClasificacionIAUpdate
+from crud.paginacion import ENTERO, REAL, decodificar_cursor, siguiente_cursor
 
 
 def crear_clasificacion_ia(
@@ -52,6 +56,75 @@ def crear_clasificacion_ia(
         raise ValueError("Error al crear la clasificación IA (posible llamada_id duplicado)")
 
 
+def crear_clasificaciones_ia_lote(
+    db: Session,
+    clasificaciones: List[ClasificacionIACreate]
+) -> List[ClasificacionIA]:
+    """
+    Crea muchas clasificaciones IA en una sola transacción (un executemany).
+    
+    No valida las llamadas una por una: se espera que el llamador ya las haya
+    cargado con obtener_llamadas_para_clasificar. Las llamadas que entretanto
+    recibieron una clasificación (p. ej. de la cola de clasificación
+    automática) se omiten (ON CONFLICT DO NOTHING) sin descartar las demás.
+    
+    Args:
+        db: Sesión de base de datos
+        clasificaciones: Datos de las clasificaciones a crear
+        
+    Returns:
+        Clasificaciones creadas; las omitidas no aparecen
+        
+    Raises:
+        ValueError: Si la inserción falla por otro motivo (no se crea ninguna)
+    """
+    if not clasificaciones:
+        return []
+    
+    filas = [clasificacion.model_dump() for clasificacion in clasificaciones]
+    try:
+        creadas = db.scalars(
+            insert(ClasificacionIA)
+            .on_conflict_do_nothing(index_elements=[ClasificacionIA.llamada_id])
+            .returning(ClasificacionIA),
+            filas
+        ).all()
+        db.commit()
+        return list(creadas)
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Error al crear las clasificaciones IA")
+
+
+def obtener_llamadas_para_clasificar(
+    db: Session,
+    llamada_ids: List[int]
+) -> Dict[int, Tuple[Llamada, bool]]:
+    """
+    Carga varias llamadas con una sola consulta e indica si ya están clasificadas.
+    
+    Args:
+        db: Sesión de base de datos
+        llamada_ids: IDs de las llamadas
+        
+    Returns:
+        {llamada_id: (llamada, ya_clasificada)} para las llamadas que existen
+    """
+    return {
+        llamada.id: (llamada, clasificacion_id is not None)
+        for llamada, clasificacion_id in db.execute(_consulta_llamadas_para_clasificar(llamada_ids))
+    }
+
+
+def _consulta_llamadas_para_clasificar(llamada_ids: List[int]):
+    """Llamadas por ID junto con el ID de su clasificación, si la tienen."""
+    return (
+        select(Llamada, ClasificacionIA.id)
+        .outerjoin(ClasificacionIA, ClasificacionIA.llamada_id == Llamada.id)
+        .where(Llamada.id.in_(set(llamada_ids)))
+    )
+
+
 def obtener_clasificacion_ia(
     db: Session,
     clasificacion_id: int
@@ -91,29 +164,76 @@ def obtener_clasificaciones_ia(
     skip: int = 0,
     limit: int = 100,
     categoria: Optional[str] = None,
-    confianza_minima: Optional[float] = None
+    confianza_minima: Optional[float] = None,
+    cursor: Optional[str] = None
 ) -> List[ClasificacionIA]:
     """
     Obtiene una lista de clasificaciones IA con opciones de paginación y filtrado.
     
     Args:
         db: Sesión de base de datos
-        skip: Número de registros a saltar (paginación)
+        skip: Número de registros a saltar (paginación por offset)
         limit: Número máximo de registros a retornar
         categoria: Filtrar por categoría (opcional)
         confianza_minima: Filtrar por confianza mínima (opcional)
+        cursor: Cursor de la página anterior (opcional). Si se indica, se ignora skip
+        
+    Returns:
+        Lista de clasificaciones IA ordenadas por confianza e id descendentes
+        
+    Raises:
+        ValueError: Si el cursor es inválido
+    """
+    consulta = _consulta_clasificaciones_ia(skip, limit, categoria, confianza_minima, cursor)
+    return list(db.scalars(consulta).all())
+
+
+def cursor_siguiente_clasificaciones_ia(
+    clasificaciones: List[ClasificacionIA],
+    limit: int
+) -> Optional[str]:
+    """
+    Cursor para pedir la página siguiente a la de `clasificaciones`.
+    
+    Args:
+        clasificaciones: Página actual devuelta por obtener_clasificaciones_ia
+        limit: Tamaño de página solicitado
         
     Returns:
-        Lista de clasificaciones IA
+        Cursor opaco, o None si no hay más páginas
     """
-    query = db.query(ClasificacionIA)
+    return siguiente_cursor(clasificaciones, limit, "confianza", "id")
+
+
+def _consulta_clasificaciones_ia(
+    skip: int,
+    limit: int,
+    categoria: Optional[str],
+    confianza_minima: Optional[float],
+    cursor: Optional[str] = None
+):
+    """
+    Construye la consulta de listado de clasificaciones IA (compartida por la
+    versión síncrona y la asíncrona).
+    """
+    consulta = select(ClasificacionIA)
     
     if categoria:
-        query = query.filter(ClasificacionIA.categoria == categoria)
+        consulta = consulta.where(ClasificacionIA.categoria == categoria)
     if confianza_minima is not None:
-        query = query.filter(ClasificacionIA.confianza >= confianza_minima)
+        consulta = consulta.where(ClasificacionIA.confianza >= confianza_minima)
+    
+    consulta = consulta.order_by(ClasificacionIA.confianza.desc(), ClasificacionIA.id.desc())
     
-    return query.order_by(ClasificacionIA.confianza.desc()).offset(skip).limit(limit).all()
+    if cursor:
+        # Keyset: continuar justo después del último (confianza, id) visto
+        confianza, clasificacion_id = decodificar_cursor(cursor, REAL, ENTERO)
+        consulta = consulta.where(
+            tuple_(ClasificacionIA.confianza, ClasificacionIA.id) < (confianza, clasificacion_id)
+        )
+        return consulta.limit(limit)
+    
+    return consulta.offset(skip).limit(limit)
 
 
 def actualizar_clasificacion_ia(
@@ -178,3 +298,110 @@ def eliminar_clasificacion_ia(db: Session, clasificacion_id: int) -> bool:
     db.commit()
     return True
 
+
+
+# ==========================================
+# Versiones asíncronas (AsyncSession)
+# ==========================================
+# Las lecturas se ejecutan con consultas nativas asíncronas. Las escrituras
+# reutilizan la lógica síncrona mediante AsyncSession.run_sync.
+
+
+async def crear_clasificacion_ia_async(
+    db: AsyncSession,
+    clasificacion: ClasificacionIACreate
+) -> ClasificacionIA:
+    """
+    Versión asíncrona de crear_clasificacion_ia.
+    
+    Raises:
+        ValueError: Si la llamada no existe o ya tiene una clasificación
+    """
+    return await db.run_sync(crear_clasificacion_ia, clasificacion)
+
+
+async def crear_clasificaciones_ia_lote_async(
+    db: AsyncSession,
+    clasificaciones: List[ClasificacionIACreate]
+) -> List[ClasificacionIA]:
+    """
+    Versión asíncrona de crear_clasificaciones_ia_lote.
+    
+    Raises:
+        ValueError: Si la inserción falla por otro motivo que una
+            clasificación ya existente (no se crea ninguna)
+    """
+    return await db.run_sync(crear_clasificaciones_ia_lote, clasificaciones)
+
+
+async def obtener_llamadas_para_clasificar_async(
+    db: AsyncSession,
+    llamada_ids: List[int]
+) -> Dict[int, Tuple[Llamada, bool]]:
+    """
+    Versión asíncrona de obtener_llamadas_para_clasificar.
+    """
+    filas = await db.execute(_consulta_llamadas_para_clasificar(llamada_ids))
+    return {
+        llamada.id: (llamada, clasificacion_id is not None)
+        for llamada, clasificacion_id in filas
+    }
+
+
+async def obtener_clasificacion_ia_async(
+    db: AsyncSession,
+    clasificacion_id: int
+) -> Optional[ClasificacionIA]:
+    """
+    Versión asíncrona de obtener_clasificacion_ia.
+    """
+    return await db.scalar(select(ClasificacionIA).where(ClasificacionIA.id == clasificacion_id))
+
+
+async def obtener_clasificacion_ia_por_llamada_async(
+    db: AsyncSession,
+    llamada_id: int
+) -> Optional[ClasificacionIA]:
+    """
+    Versión asíncrona de obtener_clasificacion_ia_por_llamada.
+    """
+    return await db.scalar(select(ClasificacionIA).where(ClasificacionIA.llamada_id == llamada_id))
+
+
+async def obtener_clasificaciones_ia_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    categoria: Optional[str] = None,
+    confianza_minima: Optional[float] = None,
+    cursor: Optional[str] = None
+) -> List[ClasificacionIA]:
+    """
+    Versión asíncrona de obtener_clasificaciones_ia.
+    
+    Raises:
+        ValueError: Si el cursor es inválido
+    """
+    consulta = _consulta_clasificaciones_ia(skip, limit, categoria, confianza_minima, cursor)
+    return list((await db.scalars(consulta)).all())
+
+
+async def actualizar_clasificacion_ia_async(
+    db: AsyncSession,
+    clasificacion_id: int,
+    clasificacion_update: ClasificacionIAUpdate
+) -> Optional[ClasificacionIA]:
+    """
+    Versión asíncrona de actualizar_clasificacion_ia.
+    
+    Raises:
+        ValueError: Si la llamada_id proporcionada no existe
+    """
+    return await db.run_sync(actualizar_clasificacion_ia, clasificacion_id, clasificacion_update)
+
+
+async def eliminar_clasificacion_ia_async(db: AsyncSession, clasificacion_id: int) -> bool:
+    """
+    Versión asíncrona de eliminar_clasificacion_ia.
+    """
+    return await db.run_sync(eliminar_clasificacion_ia, clasificacion_id)
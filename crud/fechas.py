@@ -0,0 +1,80 @@
+"""
+Conversión de fechas ISO 8601 a marcas de tiempo numéricas.
+
+Las llamadas guardan fecha_hora como texto libre: algunas con 'Z', otras con
+desplazamiento (-05:00) y otras sin zona. Comparar ese texto no ordena bien
+instantes con zonas distintas, así que los filtros y el ordenamiento usan
+fecha_hora_epoch: segundos desde 1970-01-01 UTC.
+
+Las fechas sin zona se interpretan en la hora local del servidor, igual que
+el valor por defecto de LlamadaCreate (datetime.now()).
+"""
+
+from datetime import date, datetime, timedelta
+
+
+def fecha_hora_a_epoch(valor: str) -> int:
+    """
+    Convierte una fecha ISO 8601 a segundos desde epoch (UTC).
+
+    Args:
+        valor: Fecha u hora ISO 8601 (ej: 2025-01-20T10:30:00, 2025-01-20T15:30:00Z)
+
+    Returns:
+        Segundos desde 1970-01-01 UTC
+
+    Raises:
+        ValueError: Si el valor no es una fecha ISO 8601 válida
+    """
+    try:
+        momento = datetime.fromisoformat(valor.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Fecha inválida: {valor!r} (formato ISO 8601, ej: 2025-01-20T10:30:00)")
+    return int(momento.timestamp())
+
+
+def limite_inferior_epoch(fecha_desde: str) -> int:
+    """
+    Límite inferior inclusivo de un filtro por rango.
+
+    Args:
+        fecha_desde: Fecha (2025-01-20) o fecha y hora ISO 8601
+
+    Returns:
+        Segundos desde epoch del inicio del rango
+    """
+    return fecha_hora_a_epoch(fecha_desde)
+
+
+def limite_superior_epoch(fecha_hasta: str) -> int:
+    """
+    Límite superior inclusivo de un filtro por rango.
+
+    Si solo se indica la fecha (2025-01-20), el rango incluye el día completo.
+
+    Args:
+        fecha_hasta: Fecha (2025-01-20) o fecha y hora ISO 8601
+
+    Returns:
+        Segundos desde epoch del último segundo incluido en el rango
+    """
+    try:
+        dia = date.fromisoformat(fecha_hasta)
+    except (TypeError, ValueError):
+        return fecha_hora_a_epoch(fecha_hasta)
+    return fecha_hora_a_epoch((dia + timedelta(days=1)).isoformat()) - 1
+
+
+def dia_de_epoch(epoch: int) -> str:
+    """
+    Día (YYYY-MM-DD, hora local del servidor) al que pertenece un instante.
+
+    Coincide con date(epoch, 'unixepoch', 'localtime') de SQLite.
+
+    Args:
+        epoch: Segundos desde 1970-01-01 UTC
+
+    Returns:
+        Fecha en formato YYYY-MM-DD
+    """
+    return datetime.fromtimestamp(epoch).date().isoformat()
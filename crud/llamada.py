@@ -2,10 +2,15 @@
 Operaciones CRUD para el modelo Llamada.
 """
 
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from sqlalchemy import bindparam, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from modelos import Llamada, Usuario
 from esquemas import LlamadaCreate, LlamadaUpdate
+from crud.fechas import dia_de_epoch, fecha_hora_a_epoch, limite_inferior_epoch, limite_superior_epoch
+from crud.metrica import acumular_metrica_diaria
+from crud.paginacion import ENTERO, NULO, decodificar_cursor, siguiente_cursor
 
 
 def crear_llamada(db: Session, llamada: LlamadaCreate) -> Llamada:
@@ -27,20 +32,98 @@ def crear_llamada(db: Session, llamada: LlamadaCreate) -> Llamada:
     if not usuario:
         raise ValueError(f"El usuario con ID {llamada.usuario_id} no existe")
     
-    db_llamada = Llamada(
-        usuario_id=llamada.usuario_id,
-        numero_cliente=llamada.numero_cliente,
-        duracion_segundos=llamada.duracion_segundos,
-        tipo=llamada.tipo,
-        resultado=llamada.resultado,
-        fecha_hora=llamada.fecha_hora
-    )
+    db_llamada = Llamada(**_valores_llamada(llamada))
     db.add(db_llamada)
+    _acumular_metrica(db, db_llamada.fecha_hora_epoch, 1, db_llamada.duracion_segundos)
     db.commit()
     db.refresh(db_llamada)
     return db_llamada
 
 
+def crear_llamadas_lote(db: Session, llamadas: List[LlamadaCreate]) -> List[Dict[str, Any]]:
+    """
+    Crea muchas llamadas en una sola transacción.
+    
+    Valida todos los usuario_id con una única consulta IN e inserta las filas
+    válidas con un solo executemany. Las llamadas con usuario inexistente se
+    reportan como error sin afectar al resto del lote.
+    
+    Args:
+        db: Sesión de base de datos
+        llamadas: Datos de las llamadas a crear
+        
+    Returns:
+        Un resultado por llamada, en el mismo orden:
+        {"indice": int, "ok": bool, "id": int | None, "error": str | None}
+    """
+    usuarios_solicitados = {llamada.usuario_id for llamada in llamadas}
+    usuarios_existentes = set(
+        db.scalars(select(Usuario.id).where(Usuario.id.in_(usuarios_solicitados))).all()
+    )
+    
+    resultados = []
+    filas = []
+    for indice, llamada in enumerate(llamadas):
+        if llamada.usuario_id not in usuarios_existentes:
+            resultados.append({
+                "indice": indice,
+                "ok": False,
+                "id": None,
+                "error": f"El usuario con ID {llamada.usuario_id} no existe"
+            })
+            continue
+        resultados.append({"indice": indice, "ok": True, "id": None, "error": None})
+        filas.append(_valores_llamada(llamada))
+    
+    if filas:
+        ids = db.scalars(
+            insert(Llamada).returning(Llamada.id, sort_by_parameter_order=True),
+            filas
+        ).all()
+        
+        # Un UPSERT de métricas por día del lote, no uno por llamada
+        por_dia: Dict[str, List[int]] = {}
+        for fila in filas:
+            acumulado = por_dia.setdefault(dia_de_epoch(fila["fecha_hora_epoch"]), [0, 0])
+            acumulado[0] += 1
+            acumulado[1] += fila["duracion_segundos"]
+        for dia, (cantidad, duracion) in por_dia.items():
+            acumular_metrica_diaria(db, dia, cantidad, duracion)
+        db.commit()
+        
+        # Asignar los IDs generados a los resultados exitosos, en orden
+        ids_generados = iter(ids)
+        for resultado in resultados:
+            if resultado["ok"]:
+                resultado["id"] = next(ids_generados)
+    
+    return resultados
+
+
+def _acumular_metrica(db: Session, epoch: Optional[int], llamadas: int, duracion: int) -> None:
+    """
+    Refleja en la métrica diaria el alta (+1) o baja (-1) de una llamada.
+    
+    Las llamadas sin fecha_hora_epoch (anteriores a la columna y sin rellenar)
+    no cuentan en las métricas, igual que en reconstruir_metricas.
+    """
+    if epoch is not None:
+        acumular_metrica_diaria(db, dia_de_epoch(epoch), llamadas, duracion)
+
+
+def _valores_llamada(llamada: LlamadaCreate) -> Dict[str, Any]:
+    """Columnas de la fila a insertar para una LlamadaCreate."""
+    return {
+        "usuario_id": llamada.usuario_id,
+        "numero_cliente": llamada.numero_cliente,
+        "duracion_segundos": llamada.duracion_segundos,
+        "tipo": llamada.tipo,
+        "resultado": llamada.resultado,
+        "fecha_hora": llamada.fecha_hora,
+        "fecha_hora_epoch": fecha_hora_a_epoch(llamada.fecha_hora),
+    }
+
+
 def obtener_llamada(db: Session, llamada_id: int) -> Optional[Llamada]:
     """
     Obtiene una llamada por su ID.
@@ -61,39 +144,192 @@ def obtener_llamadas(
     limit: int = 100,
     usuario_id: Optional[int] = None,
     tipo: Optional[str] = None,
-    resultado: Optional[str] = None
+    resultado: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
 ) -> List[Llamada]:
     """
     Obtiene una lista de llamadas con opciones de paginación y filtrado.
     
     Args:
         db: Sesión de base de datos
-        skip: Número de registros a saltar (paginación)
+        skip: Número de registros a saltar (paginación por offset)
         limit: Número máximo de registros a retornar
         usuario_id: Filtrar por usuario (opcional)
         tipo: Filtrar por tipo de llamada (opcional)
         resultado: Filtrar por resultado (opcional)
+        cursor: Cursor de la página anterior (opcional). Si se indica, se ignora skip
+        fecha_desde: Incluir llamadas desde esta fecha (opcional, formato ISO 8601)
+        fecha_hasta: Incluir llamadas hasta esta fecha (opcional, formato ISO 8601;
+            si solo se indica el día, se incluye completo)
+        
+    Returns:
+        Lista de llamadas ordenadas por fecha_hora_epoch e id descendentes
+        
+    Raises:
+        ValueError: Si el cursor o alguna de las fechas es inválido
+    """
+    consulta = _consulta_llamadas(
+        skip, limit, usuario_id, tipo, resultado, cursor, fecha_desde, fecha_hasta
+    )
+    return list(db.scalars(consulta).all())
+
+
+def cursor_siguiente_llamadas(llamadas: List[Llamada], limit: int) -> Optional[str]:
+    """
+    Cursor para pedir la página siguiente a la de `llamadas`.
+    
+    Args:
+        llamadas: Página actual devuelta por obtener_llamadas
+        limit: Tamaño de página solicitado
         
     Returns:
-        Lista de llamadas
+        Cursor opaco, o None si no hay más páginas
+    """
+    return siguiente_cursor(llamadas, limit, "fecha_hora_epoch", "id")
+
+
+def _consulta_llamadas(
+    skip: int,
+    limit: int,
+    usuario_id: Optional[int],
+    tipo: Optional[str],
+    resultado: Optional[str],
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+):
+    """
+    Construye la consulta de listado de llamadas (compartida por la versión
+    síncrona y la asíncrona).
+    """
+    consulta = _filtrar_llamadas(
+        select(Llamada), usuario_id, tipo, resultado, fecha_desde, fecha_hasta
+    )
+    consulta = consulta.order_by(Llamada.fecha_hora_epoch.desc(), Llamada.id.desc())
+    
+    if cursor:
+        # Keyset: continuar justo después del último (fecha_hora_epoch, id) visto.
+        # En orden descendente SQLite deja al final las llamadas sin
+        # fecha_hora_epoch (sin rellenar o con fecha inválida): se siguen por id.
+        epoch, llamada_id = decodificar_cursor(cursor, (ENTERO, NULO), ENTERO)
+        if epoch is None:
+            consulta = consulta.where(Llamada.fecha_hora_epoch.is_(None), Llamada.id < llamada_id)
+        else:
+            consulta = consulta.where(or_(
+                tuple_(Llamada.fecha_hora_epoch, Llamada.id) < (epoch, llamada_id),
+                Llamada.fecha_hora_epoch.is_(None),
+            ))
+        return consulta.limit(limit)
+    
+    return consulta.offset(skip).limit(limit)
+
+
+def _filtrar_llamadas(
+    consulta,
+    usuario_id: Optional[int],
+    tipo: Optional[str],
+    resultado: Optional[str],
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+):
     """
-    query = db.query(Llamada)
+    Aplica los filtros comunes de los listados y la exportación de llamadas.
     
+    El rango de fechas se compara sobre fecha_hora_epoch, no sobre el texto,
+    para que fechas con distinta zona horaria se comparen como instantes.
+    
+    Raises:
+        ValueError: Si alguna de las fechas es inválida
+    """
     if usuario_id:
-        query = query.filter(Llamada.usuario_id == usuario_id)
+        consulta = consulta.where(Llamada.usuario_id == usuario_id)
     if tipo:
-        query = query.filter(Llamada.tipo == tipo)
+        consulta = consulta.where(Llamada.tipo == tipo)
     if resultado:
-        query = query.filter(Llamada.resultado == resultado)
+        consulta = consulta.where(Llamada.resultado == resultado)
+    if fecha_desde:
+        consulta = consulta.where(Llamada.fecha_hora_epoch >= limite_inferior_epoch(fecha_desde))
+    if fecha_hasta:
+        consulta = consulta.where(Llamada.fecha_hora_epoch <= limite_superior_epoch(fecha_hasta))
+    return consulta
+
+
+# Columnas incluidas en la exportación, en orden
+COLUMNAS_EXPORTACION = (
+    "id",
+    "usuario_id",
+    "numero_cliente",
+    "duracion_segundos",
+    "tipo",
+    "resultado",
+    "fecha_hora",
+)
+
+# Filas que se leen del cursor de SQLite en cada bloque durante la exportación
+FILAS_POR_BLOQUE_EXPORTACION = 1000
+
+
+def _consulta_exportacion_llamadas(
+    usuario_id: Optional[int],
+    tipo: Optional[str],
+    resultado: Optional[str],
+    fecha_desde: Optional[str],
+    fecha_hasta: Optional[str]
+):
+    """
+    Construye la consulta de exportación: solo columnas (sin objetos ORM),
+    en orden cronológico y leída por bloques con yield_per.
+    """
+    columnas = [getattr(Llamada, columna) for columna in COLUMNAS_EXPORTACION]
+    consulta = _filtrar_llamadas(
+        select(*columnas), usuario_id, tipo, resultado, fecha_desde, fecha_hasta
+    )
     
-    return query.order_by(Llamada.fecha_hora.desc()).offset(skip).limit(limit).all()
+    return (
+        consulta
+        .order_by(Llamada.fecha_hora_epoch, Llamada.id)
+        .execution_options(yield_per=FILAS_POR_BLOQUE_EXPORTACION)
+    )
+
+
+def exportar_llamadas(
+    db: Session,
+    usuario_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    resultado: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre las llamadas a exportar sin cargarlas todas en memoria.
+    
+    Args:
+        db: Sesión de base de datos (debe seguir abierta mientras se itera)
+        usuario_id: Filtrar por usuario (opcional)
+        tipo: Filtrar por tipo de llamada (opcional)
+        resultado: Filtrar por resultado (opcional)
+        fecha_desde: Incluir llamadas desde esta fecha (opcional, formato ISO 8601)
+        fecha_hasta: Incluir llamadas hasta esta fecha (opcional, formato ISO 8601)
+        
+    Returns:
+        Iterador de diccionarios {columna: valor}, en orden cronológico
+        
+    Raises:
+        ValueError: Si alguna de las fechas es inválida (al empezar a iterar)
+    """
+    consulta = _consulta_exportacion_llamadas(usuario_id, tipo, resultado, fecha_desde, fecha_hasta)
+    for fila in db.execute(consulta):
+        yield fila._asdict()
 
 
 def obtener_llamadas_por_usuario(
     db: Session,
     usuario_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ) -> List[Llamada]:
     """
     Obtiene todas las llamadas de un usuario específico.
@@ -101,13 +337,14 @@ def obtener_llamadas_por_usuario(
     Args:
         db: Sesión de base de datos
         usuario_id: ID del usuario
-        skip: Número de registros a saltar (paginación)
+        skip: Número de registros a saltar (paginación por offset)
         limit: Número máximo de registros a retornar
+        cursor: Cursor de la página anterior (opcional). Si se indica, se ignora skip
         
     Returns:
         Lista de llamadas del usuario
     """
-    return obtener_llamadas(db, skip=skip, limit=limit, usuario_id=usuario_id)
+    return obtener_llamadas(db, skip=skip, limit=limit, usuario_id=usuario_id, cursor=cursor)
 
 
 def actualizar_llamada(
@@ -139,10 +376,20 @@ def actualizar_llamada(
         if not usuario:
             raise ValueError(f"El usuario con ID {llamada_update.usuario_id} no existe")
     
+    epoch_anterior = db_llamada.fecha_hora_epoch
+    duracion_anterior = db_llamada.duracion_segundos
+    
     # Actualizar solo los campos proporcionados
     update_data = llamada_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_llamada, field, value)
+    if "fecha_hora" in update_data:
+        db_llamada.fecha_hora_epoch = fecha_hora_a_epoch(db_llamada.fecha_hora)
+    
+    # Mover la llamada en las métricas si cambió su día o su duración
+    if (epoch_anterior, duracion_anterior) != (db_llamada.fecha_hora_epoch, db_llamada.duracion_segundos):
+        _acumular_metrica(db, epoch_anterior, -1, -duracion_anterior)
+        _acumular_metrica(db, db_llamada.fecha_hora_epoch, 1, db_llamada.duracion_segundos)
     
     db.commit()
     db.refresh(db_llamada)
@@ -165,6 +412,166 @@ def eliminar_llamada(db: Session, llamada_id: int) -> bool:
         return False
     
     db.delete(db_llamada)
+    _acumular_metrica(db, db_llamada.fecha_hora_epoch, -1, -db_llamada.duracion_segundos)
     db.commit()
     return True
 
+
+def rellenar_fecha_hora_epoch(db: Session, tamano_lote: int = 1000) -> Dict[str, Any]:
+    """
+    Calcula fecha_hora_epoch de las llamadas que aún no la tienen.
+    
+    Recorre las filas pendientes por bloques de id (keyset) y confirma cada
+    bloque por separado, así que se puede interrumpir y volver a ejecutar.
+    
+    Args:
+        db: Sesión de base de datos
+        tamano_lote: Filas actualizadas por transacción
+        
+    Returns:
+        {"actualizadas": int, "invalidas": [id, ...]} con las llamadas cuya
+        fecha_hora no es ISO 8601 y quedaron sin rellenar
+    """
+    actualizadas = 0
+    invalidas = []
+    ultimo_id = 0
+    sentencia = (
+        update(Llamada)
+        .where(Llamada.id == bindparam("llamada_id"))
+        .values(fecha_hora_epoch=bindparam("epoch"))
+    )
+    
+    while True:
+        pendientes = db.execute(
+            select(Llamada.id, Llamada.fecha_hora)
+            .where(Llamada.fecha_hora_epoch.is_(None), Llamada.id > ultimo_id)
+            .order_by(Llamada.id)
+            .limit(tamano_lote)
+        ).all()
+        if not pendientes:
+            break
+        
+        valores = []
+        for llamada_id, fecha_hora in pendientes:
+            try:
+                valores.append({"llamada_id": llamada_id, "epoch": fecha_hora_a_epoch(fecha_hora)})
+            except ValueError:
+                invalidas.append(llamada_id)
+        if valores:
+            db.connection().execute(sentencia, valores)
+        db.commit()
+        
+        actualizadas += len(valores)
+        ultimo_id = pendientes[-1][0]
+    
+    return {"actualizadas": actualizadas, "invalidas": invalidas}
+
+
+# ==========================================
+# Versiones asíncronas (AsyncSession)
+# ==========================================
+# Las lecturas se ejecutan con consultas nativas asíncronas. Las escrituras
+# reutilizan la lógica síncrona mediante AsyncSession.run_sync, que la ejecuta
+# sobre la misma conexión aiosqlite sin ocupar un hilo del threadpool.
+
+
+async def crear_llamada_async(db: AsyncSession, llamada: LlamadaCreate) -> Llamada:
+    """
+    Versión asíncrona de crear_llamada.
+    
+    Raises:
+        ValueError: Si el usuario_id no existe
+    """
+    return await db.run_sync(crear_llamada, llamada)
+
+
+async def crear_llamadas_lote_async(
+    db: AsyncSession,
+    llamadas: List[LlamadaCreate]
+) -> List[Dict[str, Any]]:
+    """
+    Versión asíncrona de crear_llamadas_lote.
+    """
+    return await db.run_sync(crear_llamadas_lote, llamadas)
+
+
+async def obtener_llamada_async(db: AsyncSession, llamada_id: int) -> Optional[Llamada]:
+    """
+    Versión asíncrona de obtener_llamada.
+    """
+    return await db.scalar(select(Llamada).where(Llamada.id == llamada_id))
+
+
+async def obtener_llamadas_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    usuario_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    resultado: Optional[str] = None,
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+) -> List[Llamada]:
+    """
+    Versión asíncrona de obtener_llamadas.
+    
+    Raises:
+        ValueError: Si el cursor o alguna de las fechas es inválido
+    """
+    consulta = _consulta_llamadas(
+        skip, limit, usuario_id, tipo, resultado, cursor, fecha_desde, fecha_hasta
+    )
+    return list((await db.scalars(consulta)).all())
+
+
+async def exportar_llamadas_async(
+    db: AsyncSession,
+    usuario_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    resultado: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Versión asíncrona de exportar_llamadas (iteración del lado del servidor
+    con AsyncSession.stream).
+    """
+    consulta = _consulta_exportacion_llamadas(usuario_id, tipo, resultado, fecha_desde, fecha_hasta)
+    resultado_stream = await db.stream(consulta)
+    async for fila in resultado_stream:
+        yield fila._asdict()
+
+
+async def obtener_llamadas_por_usuario_async(
+    db: AsyncSession,
+    usuario_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> List[Llamada]:
+    """
+    Versión asíncrona de obtener_llamadas_por_usuario.
+    """
+    return await obtener_llamadas_async(db, skip=skip, limit=limit, usuario_id=usuario_id, cursor=cursor)
+
+
+async def actualizar_llamada_async(
+    db: AsyncSession,
+    llamada_id: int,
+    llamada_update: LlamadaUpdate
+) -> Optional[Llamada]:
+    """
+    Versión asíncrona de actualizar_llamada.
+    
+    Raises:
+        ValueError: Si el usuario_id proporcionado no existe
+    """
+    return await db.run_sync(actualizar_llamada, llamada_id, llamada_update)
+
+
+async def eliminar_llamada_async(db: AsyncSession, llamada_id: int) -> bool:
+    """
+    Versión asíncrona de eliminar_llamada.
+    """
+    return await db.run_sync(eliminar_llamada, llamada_id)
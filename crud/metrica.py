@@ -3,9 +3,12 @@ Operaciones CRUD para el modelo Metrica.
 """
 
 from typing import List, Optional
+from sqlalchemy import Float, cast, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from modelos import Metrica
+from modelos import Llamada, Metrica
 from esquemas import MetricaCreate, MetricaUpdate
 
 
@@ -92,14 +95,28 @@ def obtener_metricas(
     Returns:
         Lista de métricas ordenadas por fecha descendente
     """
-    query = db.query(Metrica)
+    consulta = _consulta_metricas(skip, limit, fecha_desde, fecha_hasta)
+    return list(db.scalars(consulta).all())
+
+
+def _consulta_metricas(
+    skip: int,
+    limit: int,
+    fecha_desde: Optional[str],
+    fecha_hasta: Optional[str]
+):
+    """
+    Construye la consulta de listado de métricas (compartida por la versión
+    síncrona y la asíncrona).
+    """
+    consulta = select(Metrica)
     
     if fecha_desde:
-        query = query.filter(Metrica.fecha >= fecha_desde)
+        consulta = consulta.where(Metrica.fecha >= fecha_desde)
     if fecha_hasta:
-        query = query.filter(Metrica.fecha <= fecha_hasta)
+        consulta = consulta.where(Metrica.fecha <= fecha_hasta)
     
-    return query.order_by(Metrica.fecha.desc()).offset(skip).limit(limit).all()
+    return consulta.order_by(Metrica.fecha.desc()).offset(skip).limit(limit)
 
 
 def actualizar_metrica(
@@ -164,3 +181,161 @@ def eliminar_metrica(db: Session, metrica_id: int) -> bool:
     db.commit()
     return True
 
+
+
+def acumular_metrica_diaria(db: Session, fecha: str, llamadas: int, duracion: int) -> None:
+    """
+    Suma (o resta, con valores negativos) llamadas y duración a la métrica de un día.
+    
+    Es un único UPSERT sobre la fila del día, sin leer la tabla de llamadas.
+    Solo se inserta una fila cuando el día gana llamadas: las restas y los
+    cambios de duración (llamadas <= 0) actualizan la fila si existe y, si
+    no, no hacen nada, para no crear días con totales negativos.
+    No hace commit: se llama desde crud.llamada antes de confirmar la
+    transacción que modifica las llamadas, para que ambas queden consistentes.
+    
+    Args:
+        db: Sesión de base de datos
+        fecha: Día en formato YYYY-MM-DD
+        llamadas: Llamadas a sumar al total del día
+        duracion: Segundos a sumar a la duración total del día
+    """
+    # Métricas cargadas a mano antes de duracion_total: se parte del promedio
+    duracion_actual = func.coalesce(
+        Metrica.duracion_total,
+        func.round(Metrica.promedio_duracion * Metrica.total_llamadas)
+    )
+    total_nuevo = Metrica.total_llamadas + llamadas
+    duracion_nueva = duracion_actual + duracion
+    valores = {
+        "total_llamadas": total_nuevo,
+        "duracion_total": duracion_nueva,
+        "promedio_duracion": func.coalesce(
+            cast(duracion_nueva, Float) / func.nullif(total_nuevo, 0), 0.0
+        ),
+    }
+    
+    if llamadas <= 0:
+        db.execute(update(Metrica).where(Metrica.fecha == fecha).values(valores))
+        return
+    
+    sentencia = insert(Metrica).values(
+        fecha=fecha,
+        total_llamadas=llamadas,
+        duracion_total=duracion,
+        promedio_duracion=duracion / llamadas
+    )
+    sentencia = sentencia.on_conflict_do_update(index_elements=[Metrica.fecha], set_=valores)
+    db.execute(sentencia)
+
+
+def reconstruir_metricas(db: Session) -> int:
+    """
+    Recalcula total_llamadas, duracion_total y promedio_duracion de todos los
+    días a partir de la tabla llamadas. Para reparar la métrica si se desfasó
+    (p. ej. llamadas modificadas directamente en la base).
+    
+    Conserva satisfaccion_cliente. Los días sin llamadas quedan en cero.
+    Las llamadas sin fecha_hora_epoch no se cuentan.
+    
+    Args:
+        db: Sesión de base de datos
+        
+    Returns:
+        Número de días con llamadas
+    """
+    dia = func.date(Llamada.fecha_hora_epoch, "unixepoch", "localtime")
+    resumen = (
+        select(
+            dia,
+            func.count(),
+            func.sum(Llamada.duracion_segundos),
+            cast(func.avg(Llamada.duracion_segundos), Float),
+        )
+        .where(Llamada.fecha_hora_epoch.is_not(None))
+        .group_by(dia)
+    )
+    
+    db.execute(update(Metrica).values(total_llamadas=0, duracion_total=0, promedio_duracion=0.0))
+    sentencia = insert(Metrica).from_select(
+        ["fecha", "total_llamadas", "duracion_total", "promedio_duracion"],
+        resumen
+    )
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[Metrica.fecha],
+        set_={
+            "total_llamadas": sentencia.excluded.total_llamadas,
+            "duracion_total": sentencia.excluded.duracion_total,
+            "promedio_duracion": sentencia.excluded.promedio_duracion,
+        }
+    )
+    db.execute(sentencia)
+    db.commit()
+    
+    return db.scalar(select(func.count()).select_from(resumen.subquery()))
+
+
+# ==========================================
+# Versiones asíncronas (AsyncSession)
+# ==========================================
+# Las lecturas se ejecutan con consultas nativas asíncronas. Las escrituras
+# reutilizan la lógica síncrona mediante AsyncSession.run_sync.
+
+
+async def crear_metrica_async(db: AsyncSession, metrica: MetricaCreate) -> Metrica:
+    """
+    Versión asíncrona de crear_metrica.
+    
+    Raises:
+        ValueError: Si ya existe una métrica para esa fecha
+    """
+    return await db.run_sync(crear_metrica, metrica)
+
+
+async def obtener_metrica_async(db: AsyncSession, metrica_id: int) -> Optional[Metrica]:
+    """
+    Versión asíncrona de obtener_metrica.
+    """
+    return await db.scalar(select(Metrica).where(Metrica.id == metrica_id))
+
+
+async def obtener_metrica_por_fecha_async(db: AsyncSession, fecha: str) -> Optional[Metrica]:
+    """
+    Versión asíncrona de obtener_metrica_por_fecha.
+    """
+    return await db.scalar(select(Metrica).where(Metrica.fecha == fecha))
+
+
+async def obtener_metricas_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None
+) -> List[Metrica]:
+    """
+    Versión asíncrona de obtener_metricas.
+    """
+    consulta = _consulta_metricas(skip, limit, fecha_desde, fecha_hasta)
+    return list((await db.scalars(consulta)).all())
+
+
+async def actualizar_metrica_async(
+    db: AsyncSession,
+    metrica_id: int,
+    metrica_update: MetricaUpdate
+) -> Optional[Metrica]:
+    """
+    Versión asíncrona de actualizar_metrica.
+    
+    Raises:
+        ValueError: Si se intenta cambiar la fecha a una que ya existe
+    """
+    return await db.run_sync(actualizar_metrica, metrica_id, metrica_update)
+
+
+async def eliminar_metrica_async(db: AsyncSession, metrica_id: int) -> bool:
+    """
+    Versión asíncrona de eliminar_metrica.
+    """
+    return await db.run_sync(eliminar_metrica, metrica_id)
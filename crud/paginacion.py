@@ -0,0 +1,88 @@
+"""
+Utilidades para paginación por cursor (keyset pagination).
+
+El cursor es opaco para el cliente: codifica en base64 los valores de las
+columnas de ordenamiento del último registro de la página, p. ej.
+(fecha_hora, id). La siguiente página se obtiene con un WHERE sobre esos
+valores en lugar de un OFFSET, así que su costo no depende de la profundidad.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+# Tipos admitidos para un valor del cursor: un tipo o una tupla de tipos
+TipoValor = Union[Type, Tuple[Type, ...]]
+
+# Tipos según la columna de ordenamiento (JSON no distingue 1 de 1.0)
+ENTERO = int
+REAL = (int, float)
+TEXTO = str
+NULO = type(None)
+
+# Cabecera HTTP en la que los endpoints de listado devuelven el cursor siguiente
+CABECERA_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """
+    Codifica los valores de ordenamiento de un registro como cursor opaco.
+
+    Args:
+        *valores: Valores de las columnas de ordenamiento (JSON serializables)
+
+    Returns:
+        Cursor en base64 url-safe, sin relleno
+    """
+    crudo = json.dumps(list(valores), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).rstrip(b"=").decode("ascii")
+
+
+def decodificar_cursor(cursor: str, *tipos: TipoValor) -> List[Any]:
+    """
+    Decodifica un cursor generado por codificar_cursor.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        *tipos: Tipo admitido de cada valor, en orden (ENTERO, REAL, TEXTO,
+            o una tupla como (ENTERO, NULO) para columnas nullable)
+
+    Returns:
+        Lista con los valores de ordenamiento
+
+    Raises:
+        ValueError: Si el cursor está mal formado o algún valor no es del
+            tipo de su columna
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, ValueError):
+        raise ValueError("Cursor de paginación inválido")
+
+    if not isinstance(valores, list) or len(valores) != len(tipos):
+        raise ValueError("Cursor de paginación inválido")
+    for valor, tipo in zip(valores, tipos):
+        # bool es subclase de int, pero ninguna columna de ordenamiento es booleana
+        if isinstance(valor, bool) or not isinstance(valor, tipo):
+            raise ValueError("Cursor de paginación inválido")
+    return valores
+
+
+def siguiente_cursor(registros: Sequence[Any], limit: int, *atributos: str) -> Optional[str]:
+    """
+    Calcula el cursor de la página siguiente a partir de la página actual.
+
+    Args:
+        registros: Registros devueltos en la página actual
+        limit: Tamaño de página solicitado
+        *atributos: Nombres de los atributos de ordenamiento, en orden
+
+    Returns:
+        Cursor para pedir la siguiente página, o None si no hay más registros
+    """
+    if not registros or len(registros) < limit:
+        return None
+    ultimo = registros[-1]
+    return codificar_cursor(*(getattr(ultimo, atributo) for atributo in atributos))
@@ -3,9 +3,11 @@ Operaciones CRUD para el modelo Reporte.
 """
 
 from typing import List, Optional
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from modelos import Reporte, Usuario
 from esquemas import ReporteCreate, ReporteUpdate
+from crud.paginacion import ENTERO, TEXTO, decodificar_cursor, siguiente_cursor
 
 
 def crear_reporte(db: Session, reporte: ReporteCreate) -> Reporte:
@@ -58,21 +60,26 @@ def obtener_reportes(
     limit: int = 100,
     generado_por: Optional[int] = None,
     fecha_desde: Optional[str] = None,
-    fecha_hasta: Optional[str] = None
+    fecha_hasta: Optional[str] = None,
+    cursor: Optional[str] = None
 ) -> List[Reporte]:
     """
     Obtiene una lista de reportes con opciones de paginación y filtrado.
     
     Args:
         db: Sesión de base de datos
-        skip: Número de registros a saltar (paginación)
+        skip: Número de registros a saltar (paginación por offset)
         limit: Número máximo de registros a retornar
         generado_por: Filtrar por usuario que generó el reporte (opcional)
         fecha_desde: Filtrar desde esta fecha (opcional, formato ISO 8601)
         fecha_hasta: Filtrar hasta esta fecha (opcional, formato ISO 8601)
+        cursor: Cursor de la página anterior (opcional). Si se indica, se ignora skip
         
     Returns:
-        Lista de reportes ordenados por fecha descendente
+        Lista de reportes ordenados por fecha e id descendentes
+        
+    Raises:
+        ValueError: Si el cursor es inválido
     """
     query = db.query(Reporte)
     
@@ -83,14 +90,37 @@ def obtener_reportes(
     if fecha_hasta:
         query = query.filter(Reporte.fecha_generado <= fecha_hasta)
     
-    return query.order_by(Reporte.fecha_generado.desc()).offset(skip).limit(limit).all()
+    query = query.order_by(Reporte.fecha_generado.desc(), Reporte.id.desc())
+    
+    if cursor:
+        # Keyset: continuar justo después del último (fecha_generado, id) visto
+        fecha_generado, reporte_id = decodificar_cursor(cursor, TEXTO, ENTERO)
+        query = query.filter(tuple_(Reporte.fecha_generado, Reporte.id) < (fecha_generado, reporte_id))
+        return query.limit(limit).all()
+    
+    return query.offset(skip).limit(limit).all()
+
+
+def cursor_siguiente_reportes(reportes: List[Reporte], limit: int) -> Optional[str]:
+    """
+    Cursor para pedir la página siguiente a la de `reportes`.
+    
+    Args:
+        reportes: Página actual devuelta por obtener_reportes
+        limit: Tamaño de página solicitado
+        
+    Returns:
+        Cursor opaco, o None si no hay más páginas
+    """
+    return siguiente_cursor(reportes, limit, "fecha_generado", "id")
 
 
 def obtener_reportes_por_usuario(
     db: Session,
     usuario_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ) -> List[Reporte]:
     """
     Obtiene todos los reportes generados por un usuario específico.
@@ -98,13 +128,14 @@ def obtener_reportes_por_usuario(
     Args:
         db: Sesión de base de datos
         usuario_id: ID del usuario
-        skip: Número de registros a saltar (paginación)
+        skip: Número de registros a saltar (paginación por offset)
         limit: Número máximo de registros a retornar
+        cursor: Cursor de la página anterior (opcional). Si se indica, se ignora skip
         
     Returns:
         Lista de reportes del usuario
     """
-    return obtener_reportes(db, skip=skip, limit=limit, generado_por=usuario_id)
+    return obtener_reportes(db, skip=skip, limit=limit, generado_por=usuario_id, cursor=cursor)
 
 
 def actualizar_reporte(
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from modelos import Usuario
 from esquemas import UsuarioCreate, UsuarioUpdate
-from auth import obtener_password_hash
+from auth import invalidar_usuario_en_cache, obtener_password_hash
 
 def crear_usuario(db: Session, usuario: UsuarioCreate) -> Usuario:
     """
@@ -124,11 +124,13 @@ def actualizar_usuario(
     
     try:
         db.commit()
-        db.refresh(db_usuario)
-        return db_usuario
     except IntegrityError:
         db.rollback()
         raise ValueError("Error al actualizar el usuario (posible email duplicado)")
+    
+    invalidar_usuario_en_cache(usuario_id)
+    db.refresh(db_usuario)
+    return db_usuario
 
 
 def eliminar_usuario(db: Session, usuario_id: int) -> bool:
@@ -148,5 +150,6 @@ def eliminar_usuario(db: Session, usuario_id: int) -> bool:
     
     db.delete(db_usuario)
     db.commit()
+    invalidar_usuario_en_cache(usuario_id)
     return True
 
@@ -27,10 +27,17 @@ CREATE TABLE llamadas (
     tipo TEXT NOT NULL,                   -- venta, soporte, reclamo
     resultado TEXT NOT NULL,              -- atendida, colgada, resuelta, escalada
     fecha_hora TEXT NOT NULL,             -- formato ISO 8601
+    fecha_hora_epoch INTEGER,             -- fecha_hora en segundos desde epoch (UTC)
 
     FOREIGN KEY (usuario_id) REFERENCES usuarios(id)
 );
 
+-- Índices de listado: filtro + columna de orden (ver modelos/llamada.py)
+CREATE INDEX IF NOT EXISTS ix_llamadas_fecha_hora_epoch ON llamadas (fecha_hora_epoch);
+CREATE INDEX IF NOT EXISTS ix_llamadas_usuario_fecha_hora_epoch ON llamadas (usuario_id, fecha_hora_epoch);
+CREATE INDEX IF NOT EXISTS ix_llamadas_tipo_fecha_hora_epoch ON llamadas (tipo, fecha_hora_epoch);
+CREATE INDEX IF NOT EXISTS ix_llamadas_resultado_fecha_hora_epoch ON llamadas (resultado, fecha_hora_epoch);
+
 -- -------------------------
 -- Tabla de clasificación con IA
 -- -------------------------
@@ -44,6 +51,11 @@ CREATE TABLE clasificacion_ia (
     FOREIGN KEY (llamada_id) REFERENCES llamadas(id)
 );
 
+-- Una clasificación por llamada (uq_clasificacion_ia_llamada_id en modelos/clasificacion_ia.py)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_clasificacion_ia_llamada_id ON clasificacion_ia (llamada_id);
+CREATE INDEX IF NOT EXISTS ix_clasificacion_ia_confianza ON clasificacion_ia (confianza);
+CREATE INDEX IF NOT EXISTS ix_clasificacion_ia_categoria_confianza ON clasificacion_ia (categoria, confianza);
+
 -- -------------------------
 -- Tabla de métricas (dashboard)
 -- -------------------------
@@ -52,6 +64,7 @@ CREATE TABLE metricas (
     fecha TEXT NOT NULL,                 -- ejemplo: '2025-10-20'
     total_llamadas INTEGER NOT NULL,
     promedio_duracion REAL NOT NULL,
+    duracion_total INTEGER,              -- suma de duracion_segundos del día
     satisfaccion_cliente REAL,           -- puntuación simulada 1-5
 
     UNIQUE (fecha)
@@ -69,6 +82,9 @@ CREATE TABLE reportes (
     FOREIGN KEY (generado_por) REFERENCES usuarios(id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_reportes_fecha_generado ON reportes (fecha_generado);
+CREATE INDEX IF NOT EXISTS ix_reportes_generado_por_fecha_generado ON reportes (generado_por, fecha_generado);
+
 -- DATOS DE PRUEBA
 INSERT INTO usuarios (nombre, email, password, rol)
 VALUES
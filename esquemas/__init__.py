@@ -15,6 +15,9 @@ from esquemas.llamada import (
     LlamadaCreate,
     LlamadaUpdate,
     LlamadaResponse,
+    LlamadaLoteCreate,
+    LlamadaLoteResultado,
+    LlamadaLoteResponse,
 )
 from esquemas.clasificacion_ia import (
     ClasificacionIABase,
@@ -24,6 +27,10 @@ from esquemas.clasificacion_ia import (
     ClasificacionIAResponse,
     ClasificacionTextoRequest,
     ClasificacionTextoResponse,
+    ClasificacionIALoteCreate,
+    ClasificacionIALoteResultado,
+    ClasificacionIALoteResponse,
+    TrabajoClasificacionResponse,
 )
 from esquemas.metrica import (
     MetricaBase,
@@ -51,6 +58,9 @@ __all__ = [
     "LlamadaCreate",
     "LlamadaUpdate",
     "LlamadaResponse",
+    "LlamadaLoteCreate",
+    "LlamadaLoteResultado",
+    "LlamadaLoteResponse",
     # ClasificacionIA
     "ClasificacionIABase",
     "ClasificacionIACreate",
@@ -59,6 +69,10 @@ __all__ = [
     "ClasificacionIAResponse",
     "ClasificacionTextoRequest",
     "ClasificacionTextoResponse",
+    "ClasificacionIALoteCreate",
+    "ClasificacionIALoteResultado",
+    "ClasificacionIALoteResponse",
+    "TrabajoClasificacionResponse",
     # Metrica
     "MetricaBase",
     "MetricaCreate",
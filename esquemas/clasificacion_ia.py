@@ -2,7 +2,7 @@
 Esquemas Pydantic para el modelo ClasificacionIA.
 """
 
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -79,3 +79,45 @@ class ClasificacionTextoResponse(BaseModel):
         if v.lower() not in categorias_permitidas:
             raise ValueError(f"La categoría debe ser una de: {', '.join(categorias_permitidas)}")
         return v.lower()
+
+
+# Máximo de llamadas aceptadas en una sola petición de clasificación en lote
+MAX_CLASIFICACIONES_POR_LOTE = 500
+
+
+class ClasificacionIALoteCreate(BaseModel):
+    """Esquema para clasificar automáticamente varias llamadas en una sola petición."""
+    llamada_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_CLASIFICACIONES_POR_LOTE,
+        description="IDs de las llamadas a clasificar"
+    )
+
+
+class ClasificacionIALoteResultado(BaseModel):
+    """Resultado de la clasificación de una llamada del lote."""
+    llamada_id: int
+    ok: bool
+    clasificacion: Optional[ClasificacionIAResponse] = Field(None, description="Clasificación creada")
+    error: Optional[str] = Field(None, description="Motivo por el que no se clasificó")
+
+
+class ClasificacionIALoteResponse(BaseModel):
+    """Respuesta de la clasificación en lote."""
+    total: int
+    creadas: int
+    fallidas: int
+    resultados: List[ClasificacionIALoteResultado]
+
+
+class TrabajoClasificacionResponse(BaseModel):
+    """Estado de un trabajo de la cola de clasificación automática."""
+    id: int
+    llamada_id: int
+    estado: Literal["pendiente", "en_proceso", "reintentando", "completado", "fallido"]
+    intentos: int = Field(..., description="Intentos realizados")
+    error: Optional[str] = Field(None, description="Último error, si hubo")
+    clasificacion_id: Optional[int] = Field(None, description="Clasificación creada (estado completado)")
+    creado: float = Field(..., description="Momento en que se encoló (segundos desde epoch)")
+    actualizado: float = Field(..., description="Último cambio de estado (segundos desde epoch)")
@@ -2,7 +2,7 @@
 Esquemas Pydantic para el modelo Llamada.
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -109,3 +109,38 @@ class LlamadaResponse(LlamadaBase):
     class Config:
         from_attributes = True
 
+
+
+# Máximo de llamadas aceptadas en una sola petición de carga masiva
+MAX_LLAMADAS_POR_LOTE = 5000
+
+
+class LlamadaLoteCreate(BaseModel):
+    """
+    Esquema para registrar muchas llamadas en una sola petición.
+    
+    Cada elemento tiene el formato de LlamadaCreate. Se validan uno por uno,
+    de modo que un elemento inválido no rechaza el lote completo.
+    """
+    llamadas: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_LLAMADAS_POR_LOTE,
+        description="Llamadas a registrar, cada una con el formato de LlamadaCreate"
+    )
+
+
+class LlamadaLoteResultado(BaseModel):
+    """Resultado del registro de un elemento del lote."""
+    indice: int = Field(..., description="Posición del elemento en el lote recibido")
+    ok: bool
+    id: Optional[int] = Field(None, description="ID de la llamada creada")
+    error: Optional[str] = Field(None, description="Motivo del rechazo")
+
+
+class LlamadaLoteResponse(BaseModel):
+    """Esquema para la respuesta de una carga masiva de llamadas."""
+    total: int
+    creadas: int
+    fallidas: int
+    resultados: List[LlamadaLoteResultado]
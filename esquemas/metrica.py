@@ -58,6 +58,7 @@ class MetricaUpdate(BaseModel):
 class MetricaResponse(MetricaBase):
     """Esquema para la respuesta de una métrica."""
     id: int
+    duracion_total: Optional[int] = Field(None, description="Suma de la duración de las llamadas del día en segundos")
 
     class Config:
         from_attributes = True
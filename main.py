@@ -2,9 +2,33 @@
 API del Call Center - FastAPI
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from rutas import api_router
+from crud.paginacion import CABECERA_CURSOR
+from servicios.cola_clasificacion import CABECERA_TRABAJO, COLA_CLASIFICACION
+from servicios.clasificador_vecinos import INDICE_VECINOS
+from servicios.llm import POOL_LLM, SONDEO_SEGUNDOS
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranca los trabajadores de la cola de clasificación y los sondeos de
+    salud de los servidores LLM, y los detiene al salir; al salir también
+    cierra los clientes del LLM y guarda los ejemplos nuevos del índice de
+    vecinos.
+    """
+    COLA_CLASIFICACION.iniciar()
+    POOL_LLM.iniciar_sondeos(SONDEO_SEGUNDOS)
+    yield
+    POOL_LLM.detener_sondeos()
+    await COLA_CLASIFICACION.detener()
+    await POOL_LLM.cerrar_clientes_async()
+    if INDICE_VECINOS.pendientes_guardar:
+        INDICE_VECINOS.guardar()
+
 
 app = FastAPI(
     title="Call Center API",
@@ -12,7 +36,8 @@ app = FastAPI(
     version="1.0.0",
     swagger_ui_parameters={
         "persistAuthorization": True,  # Mantiene el token después de recargar la página
-    }
+    },
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CABECERA_CURSOR, CABECERA_TRABAJO],  # El frontend necesita leer el cursor y el trabajo
 )
 
 app.include_router(api_router, prefix="/api")
@@ -0,0 +1,213 @@
+"""
+Tareas de mantenimiento de la base de datos.
+
+Uso:
+    python mantenimiento.py actualizar-esquema
+    python mantenimiento.py rellenar-fechas [--tamano-lote 1000]
+    python mantenimiento.py reconstruir-metricas
+    python mantenimiento.py construir-indice-vecinos [--textos corpus.json] [--agregar | --reemplazar]
+        [--directorio data/indice_vecinos]
+"""
+
+import argparse
+import json
+from sqlalchemy import inspect, text
+from modelos import Base, ClasificacionIA, Llamada, SessionLocal, engine
+from crud import reconstruir_metricas, rellenar_fecha_hora_epoch
+from servicios.clasificacion_ia import _describir_llamada
+from servicios.clasificador_vecinos import DIRECTORIO_INDICE, construir_indice, ejemplos_en_disco
+
+# Índices reemplazados por versiones nuevas; se eliminan al actualizar el esquema
+INDICES_OBSOLETOS = (
+    "ix_llamadas_fecha_hora",
+    "ix_llamadas_usuario_fecha_hora",
+    "ix_llamadas_tipo_fecha_hora",
+    "ix_llamadas_resultado_fecha_hora",
+)
+
+
+def actualizar_esquema(motor) -> None:
+    """
+    Lleva una base existente al esquema de los modelos.
+
+    Crea las tablas que falten, agrega las columnas nuevas (deben ser nullable,
+    SQLite solo permite ADD COLUMN), crea los índices que falten y elimina los
+    obsoletos. No modifica ni borra datos.
+
+    Args:
+        motor: Motor de SQLAlchemy sobre la base a actualizar
+
+    Raises:
+        ValueError: Si un índice único nuevo no puede crearse porque hay
+            filas repetidas (no se aplica ningún cambio)
+    """
+    Base.metadata.create_all(motor)
+    inspector = inspect(motor)
+
+    # Antes de cualquier cambio: los índices únicos nuevos no deben chocar con los datos
+    with motor.connect() as conexion:
+        for tabla in Base.metadata.sorted_tables:
+            creados = {indice["name"] for indice in inspector.get_indexes(tabla.name)}
+            for indice in tabla.indexes:
+                if indice.unique and indice.name not in creados:
+                    _verificar_unico(conexion, indice)
+
+    with motor.begin() as conexion:
+        for tabla in Base.metadata.sorted_tables:
+            existentes = {columna["name"] for columna in inspector.get_columns(tabla.name)}
+            for columna in tabla.columns:
+                if columna.name not in existentes:
+                    tipo = columna.type.compile(dialect=motor.dialect)
+                    conexion.execute(text(f"ALTER TABLE {tabla.name} ADD COLUMN {columna.name} {tipo}"))
+                    print(f"Columna agregada: {tabla.name}.{columna.name}")
+
+        for nombre in INDICES_OBSOLETOS:
+            conexion.execute(text(f"DROP INDEX IF EXISTS {nombre}"))
+
+        for tabla in Base.metadata.sorted_tables:
+            for indice in tabla.indexes:
+                indice.create(conexion, checkfirst=True)
+
+
+def _verificar_unico(conexion, indice) -> None:
+    """Lanza ValueError si las columnas de un índice único tienen valores repetidos."""
+    columnas = ", ".join(columna.name for columna in indice.columns)
+    repetidos = conexion.execute(text(
+        f"SELECT {columnas}, COUNT(*) AS filas FROM {indice.table.name}"
+        f" GROUP BY {columnas} HAVING COUNT(*) > 1 LIMIT 5"
+    )).all()
+    if repetidos:
+        ejemplos = "; ".join(
+            f"{columnas}={', '.join(map(str, fila[:-1]))} ({fila.filas} filas)" for fila in repetidos
+        )
+        raise ValueError(
+            f"No se puede crear el índice único {indice.name}: {indice.table.name} tiene valores"
+            f" repetidos de {columnas} ({ejemplos}). Elimine las filas sobrantes y vuelva a"
+            " ejecutar actualizar-esquema."
+        )
+
+
+def rellenar_fechas(tamano_lote: int = 1000) -> None:
+    """
+    Calcula fecha_hora_epoch de las llamadas que no la tienen y, si rellenó
+    alguna, reconstruye las métricas diarias para que pasen a contar.
+
+    Args:
+        tamano_lote: Llamadas actualizadas por transacción
+    """
+    with SessionLocal() as db:
+        resultado = rellenar_fecha_hora_epoch(db, tamano_lote=tamano_lote)
+    print(f"Llamadas actualizadas: {resultado['actualizadas']}")
+    if resultado["invalidas"]:
+        print(f"Llamadas con fecha_hora inválida (sin rellenar): {resultado['invalidas']}")
+    if resultado["actualizadas"]:
+        with SessionLocal() as db:
+            dias = reconstruir_metricas(db)
+        print(f"Métricas reconstruidas: {dias} días")
+
+
+def ejemplos_clasificados(db) -> list:
+    """
+    Pares (descripción, categoría) de las llamadas ya clasificadas, con la
+    misma descripción que se envía al LLM.
+
+    Son descripciones armadas con tipo, resultado y duración, no texto libre:
+    se parecen poco a los textos de clasificar_texto_llamada, así que rara vez
+    alcanzan VECINOS_SIMILITUD_MINIMA frente a ellos. Sirven para arrancar un
+    índice vacío; los ejemplos útiles son textos libres (ejemplos_texto) y los
+    que el servidor aprende del LLM.
+
+    Args:
+        db: Sesión de base de datos
+
+    Returns:
+        Lista de pares (descripción, categoría)
+    """
+    filas = db.query(
+        Llamada.tipo, Llamada.resultado, Llamada.duracion_segundos, ClasificacionIA.categoria
+    ).join(ClasificacionIA, ClasificacionIA.llamada_id == Llamada.id).yield_per(1000)
+    return [
+        (_describir_llamada(tipo, resultado, duracion_segundos or 0), categoria)
+        for tipo, resultado, duracion_segundos, categoria in filas
+    ]
+
+
+def ejemplos_texto(archivo: str) -> list:
+    """
+    Pares (texto, categoría) de un archivo JSON con textos libres
+    etiquetados, en el formato de test/corpus_clasificacion.json:
+    {"textos": [{"texto": "...", "categoria": "venta"}, ...]}.
+
+    Args:
+        archivo: Ruta del archivo JSON
+
+    Returns:
+        Lista de pares (texto, categoría)
+    """
+    with open(archivo, encoding="utf-8") as entrada:
+        return [(ejemplo["texto"], ejemplo["categoria"]) for ejemplo in json.load(entrada)["textos"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser(
+        "actualizar-esquema", help="Agrega tablas, columnas e índices nuevos y rellena fecha_hora_epoch"
+    )
+    rellenar = comandos.add_parser("rellenar-fechas", help="Calcula fecha_hora_epoch de las llamadas existentes")
+    rellenar.add_argument("--tamano-lote", type=int, default=1000)
+    comandos.add_parser("reconstruir-metricas", help="Recalcula las métricas diarias desde las llamadas")
+    indice = comandos.add_parser(
+        "construir-indice-vecinos",
+        help="Carga ejemplos en el índice de vecinos: textos libres de --textos o, sin él, las llamadas clasificadas",
+    )
+    indice.add_argument("--textos", help="JSON con textos etiquetados (formato de test/corpus_clasificacion.json)")
+    indice.add_argument("--directorio", default=DIRECTORIO_INDICE)
+    modo = indice.add_mutually_exclusive_group()
+    modo.add_argument("--agregar", action="store_true", help="Suma los ejemplos al índice existente")
+    modo.add_argument("--reemplazar", action="store_true", help="Descarta el índice existente")
+    args = parser.parse_args()
+
+    try:
+        ejecutar(args)
+    except ValueError as e:
+        parser.exit(1, f"Error: {e}\n")
+
+
+def ejecutar(args) -> None:
+    """Ejecuta el comando elegido en la línea de comandos."""
+    if args.comando == "actualizar-esquema":
+        actualizar_esquema(engine)
+        print("Esquema actualizado.")
+        # Sin fecha_hora_epoch las llamadas quedan fuera de los filtros por fecha
+        rellenar_fechas()
+
+    elif args.comando == "rellenar-fechas":
+        actualizar_esquema(engine)
+        rellenar_fechas(args.tamano_lote)
+
+    elif args.comando == "reconstruir-metricas":
+        actualizar_esquema(engine)
+        with SessionLocal() as db:
+            dias = reconstruir_metricas(db)
+        print(f"Métricas reconstruidas: {dias} días")
+
+    elif args.comando == "construir-indice-vecinos":
+        # El índice guardado incluye los textos aprendidos del LLM: no se descarta sin pedirlo
+        existentes = ejemplos_en_disco(args.directorio)
+        if existentes and not (args.agregar or args.reemplazar):
+            raise ValueError(
+                f"El índice de {args.directorio} ya tiene {existentes} ejemplos. Use --agregar para"
+                " conservarlos o --reemplazar para descartarlos."
+            )
+        if args.textos:
+            ejemplos = ejemplos_texto(args.textos)
+        else:
+            with SessionLocal() as db:
+                ejemplos = ejemplos_clasificados(db)
+        total = construir_indice(ejemplos, args.directorio, agregar=args.agregar)
+        print(f"Índice de vecinos: {total} ejemplos en {args.directorio}")
+
+
+if __name__ == "__main__":
+    main()
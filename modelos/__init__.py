@@ -2,7 +2,21 @@
 Modelos para la base de datos del Call Center.
 """
 
-from modelos.database import Base, engine, SessionLocal, get_db
+from modelos.database import (
+    Base,
+    engine,
+    read_engine,
+    async_engine,
+    async_read_engine,
+    SessionLocal,
+    ReadSessionLocal,
+    AsyncSessionLocal,
+    AsyncReadSessionLocal,
+    get_db,
+    get_read_db,
+    get_async_db,
+    get_async_read_db,
+)
 from modelos.usuario import Usuario
 from modelos.llamada import Llamada
 from modelos.clasificacion_ia import ClasificacionIA
@@ -12,8 +26,17 @@ from modelos.reporte import Reporte
 __all__ = [
     "Base",
     "engine",
+    "read_engine",
+    "async_engine",
+    "async_read_engine",
     "SessionLocal",
+    "ReadSessionLocal",
+    "AsyncSessionLocal",
+    "AsyncReadSessionLocal",
     "get_db",
+    "get_read_db",
+    "get_async_db",
+    "get_async_read_db",
     "Usuario",
     "Llamada",
     "ClasificacionIA",
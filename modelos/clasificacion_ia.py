@@ -2,7 +2,7 @@
 Modelo para la tabla clasificacion_ia.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from modelos.database import Base
 
@@ -16,7 +16,7 @@ class ClasificacionIA(Base):
     __tablename__ = "clasificacion_ia"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    llamada_id = Column(Integer, ForeignKey("llamadas.id"), nullable=False, unique=True)
+    llamada_id = Column(Integer, ForeignKey("llamadas.id"), nullable=False)
     categoria = Column(String, nullable=False)  # venta / soporte / reclamo
     confianza = Column(Float, nullable=False)  # porcentaje 0.0 - 1.0
     recomendacion_agente = Column(String, nullable=True)
@@ -24,6 +24,16 @@ class ClasificacionIA(Base):
     # Relaciones
     llamada = relationship("Llamada", back_populates="clasificacion_ia")
 
+    # Una clasificación por llamada (índice único y no UNIQUE de columna, para
+    # que actualizar-esquema lo cree en bases anteriores; ON CONFLICT lo
+    # necesita en crear_clasificaciones_ia_lote). Los demás índices sirven a
+    # obtener_clasificaciones_ia (filtro por categoría, orden por confianza)
+    __table_args__ = (
+        Index('uq_clasificacion_ia_llamada_id', 'llamada_id', unique=True),
+        Index('ix_clasificacion_ia_confianza', 'confianza'),
+        Index('ix_clasificacion_ia_categoria_confianza', 'categoria', 'confianza'),
+    )
+
     def __repr__(self):
         return f"<ClasificacionIA(id={self.id}, llamada_id={self.llamada_id}, categoria='{self.categoria}', confianza={self.confianza})>"
 
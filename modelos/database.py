@@ -2,17 +2,133 @@
 Configuración de la base de datos SQLite.
 """
 
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Ruta a la base de datos
-DATABASE_URL = "sqlite:///./data/db.db"
+DATABASE_PATH = "./data/db.db"
+DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+
+# Misma base abierta en modo solo lectura (URI de SQLite con mode=ro)
+READ_DATABASE_URL = f"sqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
+
+# Mismas bases a través del driver asíncrono aiosqlite
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+ASYNC_READ_DATABASE_URL = f"sqlite+aiosqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
+
+# Perfil de conexión SQLite. Cada entrada se aplica como PRAGMA al abrir una conexión.
+# Los valores se pueden ajustar con variables de entorno sin tocar el código.
+PERFIL_SQLITE = {
+    # WAL permite que lectores y escritores trabajen en paralelo
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    # NORMAL es seguro con WAL y evita un fsync por cada commit
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Bytes del archivo mapeados en memoria (256 MB)
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", "268435456")),
+    # Valor negativo = tamaño en KiB (64 MB de caché de páginas)
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),
+    # Milisegundos que se espera un bloqueo antes de fallar con "database is locked"
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+    # Tablas e índices temporales en memoria
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Perfil para las conexiones de solo lectura: no tocan el journal y rechazan
+# cualquier escritura a nivel de conexión.
+PERFIL_SQLITE_LECTURA = {
+    **{
+        pragma: valor
+        for pragma, valor in PERFIL_SQLITE.items()
+        if pragma not in ("journal_mode", "synchronous")
+    },
+    "query_only": "ON",
+}
+
+
+def aplicar_perfil_sqlite(engine, perfil: dict) -> None:
+    """
+    Registra un listener que ejecuta los PRAGMA del perfil en cada conexión nueva.
+
+    Args:
+        engine: Motor de SQLAlchemy sobre SQLite
+        perfil: Diccionario {pragma: valor}
+    """
+    @event.listens_for(engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, valor in perfil.items():
+            cursor.execute(f"PRAGMA {pragma}={valor}")
+        cursor.close()
+
+
+def crear_motor(url: str = DATABASE_URL, perfil: dict = PERFIL_SQLITE, **kwargs):
+    """
+    Crea un motor SQLite con el perfil de PRAGMA indicado.
+
+    Args:
+        url: URL de conexión de SQLAlchemy
+        perfil: PRAGMA a aplicar en cada conexión (None o {} para no aplicar ninguno)
+        **kwargs: Argumentos adicionales para create_engine
+
+    Returns:
+        Motor de SQLAlchemy configurado
+    """
+    motor = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Necesario para SQLite
+        echo=False,  # Cambiar a True para ver las consultas SQL
+        **kwargs
+    )
+    if perfil:
+        aplicar_perfil_sqlite(motor, perfil)
+    return motor
+
+
+def crear_motor_async(url: str = ASYNC_DATABASE_URL, perfil: dict = PERFIL_SQLITE, **kwargs):
+    """
+    Crea un motor asíncrono (aiosqlite) con el perfil de PRAGMA indicado.
+
+    Args:
+        url: URL de conexión de SQLAlchemy con driver aiosqlite
+        perfil: PRAGMA a aplicar en cada conexión (None o {} para no aplicar ninguno)
+        **kwargs: Argumentos adicionales para create_async_engine
+
+    Returns:
+        Motor asíncrono de SQLAlchemy configurado
+    """
+    motor = create_async_engine(url, echo=False, **kwargs)
+    if perfil:
+        # Los eventos de conexión se registran sobre el motor síncrono subyacente
+        aplicar_perfil_sqlite(motor.sync_engine, perfil)
+    return motor
+
 
 # Crear el motor de la base de datos
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Necesario para SQLite
-    echo=False  # Cambiar a True para ver las consultas SQL
+engine = crear_motor()
+
+# Motor de solo lectura con su propio pool, para los endpoints GET.
+# En AUTOCOMMIT no se abre transacción y el pool no hace rollback al devolver
+# la conexión, ya que nunca hay nada que deshacer.
+read_engine = crear_motor(
+    READ_DATABASE_URL,
+    perfil=PERFIL_SQLITE_LECTURA,
+    isolation_level="AUTOCOMMIT",
+    pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("SQLITE_READ_MAX_OVERFLOW", "20")),
+    pool_reset_on_return=None,
+)
+
+# Motores asíncronos equivalentes (escritura y solo lectura)
+async_engine = crear_motor_async()
+async_read_engine = crear_motor_async(
+    ASYNC_READ_DATABASE_URL,
+    perfil=PERFIL_SQLITE_LECTURA,
+    isolation_level="AUTOCOMMIT",
+    pool_size=int(os.getenv("SQLITE_READ_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("SQLITE_READ_MAX_OVERFLOW", "20")),
+    pool_reset_on_return=None,
 )
 
 # Crear la clase base para los modelos
@@ -21,6 +137,14 @@ Base = declarative_base()
 # Crear la fábrica de sesiones
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Fábrica de sesiones de solo lectura (sin autoflush ni expiración tras commit)
+ReadSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=read_engine)
+
+# Fábricas de sesiones asíncronas. expire_on_commit=False evita que acceder a un
+# atributo después del commit dispare una consulta implícita fuera del await.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     """
@@ -33,3 +157,30 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    """
+    Generador de dependencias para obtener una sesión de solo lectura.
+    Usar en los endpoints GET; cualquier intento de escritura falla.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Generador de dependencias para obtener una sesión asíncrona de base de datos.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """
+    Generador de dependencias para obtener una sesión asíncrona de solo lectura.
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
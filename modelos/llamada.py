@@ -2,7 +2,7 @@
 Modelo para la tabla llamadas.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from modelos.database import Base
 
@@ -23,11 +23,24 @@ class Llamada(Base):
     tipo = Column(String, nullable=False)  # venta, soporte, reclamo
     resultado = Column(String, nullable=False)  # atendida, colgada, resuelta, escalada
     fecha_hora = Column(String, nullable=False)  # formato ISO 8601
+    # fecha_hora normalizada a segundos desde epoch (UTC); la calcula crud.llamada.
+    # Es nullable para las filas anteriores a la columna, hasta que se rellenan
+    # con `python mantenimiento.py actualizar-esquema` (o rellenar-fechas).
+    fecha_hora_epoch = Column(Integer, nullable=True)
 
     # Relaciones
     usuario = relationship("Usuario", back_populates="llamadas")
     clasificacion_ia = relationship("ClasificacionIA", back_populates="llamada", uselist=False)
 
+    # Índices para los listados: cada filtro de obtener_llamadas seguido de la
+    # columna de ordenamiento, para buscar y ordenar sin tabla temporal
+    __table_args__ = (
+        Index('ix_llamadas_fecha_hora_epoch', 'fecha_hora_epoch'),
+        Index('ix_llamadas_usuario_fecha_hora_epoch', 'usuario_id', 'fecha_hora_epoch'),
+        Index('ix_llamadas_tipo_fecha_hora_epoch', 'tipo', 'fecha_hora_epoch'),
+        Index('ix_llamadas_resultado_fecha_hora_epoch', 'resultado', 'fecha_hora_epoch'),
+    )
+
     def __repr__(self):
         return f"<Llamada(id={self.id}, usuario_id={self.usuario_id}, tipo='{self.tipo}', resultado='{self.resultado}')>"
 
@@ -10,6 +10,9 @@ class Metrica(Base):
     """
     Modelo que representa las métricas diarias del call center.
     
+    total_llamadas, duracion_total y promedio_duracion se mantienen desde
+    crud.llamada en la misma transacción que cada alta, cambio o baja de
+    llamadas (ver crud.metrica.acumular_metrica_diaria).
     La satisfacción del cliente es una puntuación simulada entre 1-5.
     """
     __tablename__ = "metricas"
@@ -18,6 +21,10 @@ class Metrica(Base):
     fecha = Column(String, nullable=False)  # formato: '2025-10-20'
     total_llamadas = Column(Integer, nullable=False)
     promedio_duracion = Column(Float, nullable=False)
+    # Suma de duracion_segundos del día; junto con total_llamadas permite
+    # actualizar el promedio de forma incremental al registrar cada llamada.
+    # Nullable para las métricas cargadas a mano antes de la columna.
+    duracion_total = Column(Integer, nullable=True)
     satisfaccion_cliente = Column(Float, nullable=True)  # puntuación 1-5
 
     # Constraint único para la fecha
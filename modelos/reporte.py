@@ -2,7 +2,7 @@
 Modelo para la tabla reportes.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from modelos.database import Base
 
@@ -21,6 +21,12 @@ class Reporte(Base):
     # Relaciones
     generado_por_usuario = relationship("Usuario", back_populates="reportes")
 
+    # Índices para obtener_reportes (filtro por autor y/o rango de fechas, orden por fecha)
+    __table_args__ = (
+        Index('ix_reportes_fecha_generado', 'fecha_generado'),
+        Index('ix_reportes_generado_por_fecha_generado', 'generado_por', 'fecha_generado'),
+    )
+
     def __repr__(self):
         return f"<Reporte(id={self.id}, generado_por={self.generado_por}, fecha_generado='{self.fecha_generado}')>"
 
@@ -2,10 +2,10 @@
 Endpoints para el modelo ClasificacionIA.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from modelos import get_async_db, get_async_read_db, Usuario
 from esquemas import (
     ClasificacionIACreate,
     ClasificacionIACreateAuto,
@@ -13,18 +13,32 @@ from esquemas import (
     ClasificacionIAResponse,
     ClasificacionTextoRequest,
     ClasificacionTextoResponse,
+    ClasificacionIALoteCreate,
+    ClasificacionIALoteResponse,
+    TrabajoClasificacionResponse,
 )
 from crud import (
-    crear_clasificacion_ia,
-    obtener_clasificacion_ia,
-    obtener_clasificacion_ia_por_llamada,
-    obtener_clasificaciones_ia,
-    actualizar_clasificacion_ia,
-    eliminar_clasificacion_ia,
+    crear_clasificacion_ia_async,
+    crear_clasificaciones_ia_lote_async,
+    obtener_llamadas_para_clasificar_async,
+    obtener_clasificacion_ia_async,
+    obtener_clasificacion_ia_por_llamada_async,
+    obtener_clasificaciones_ia_async,
+    actualizar_clasificacion_ia_async,
+    eliminar_clasificacion_ia_async,
+    cursor_siguiente_clasificaciones_ia,
 )
-from crud.llamada import obtener_llamada
-from auth import obtener_usuario_actual
-from servicios.clasificacion_ia import clasificar_llamada_con_ia, clasificar_texto_llamada
+from crud.paginacion import CABECERA_CURSOR
+from crud.llamada import obtener_llamada_async
+from auth import CACHE_USUARIOS, obtener_usuario_actual_async
+from servicios.clasificacion_ia import (
+    clasificar_llamada_con_ia_async,
+    clasificar_llamadas_lote_async,
+    clasificar_texto_llamada_async,
+    estadisticas_clasificacion,
+)
+from servicios.cola_clasificacion import COLA_CLASIFICACION
+from servicios.metricas_llm import METRICAS_LLM
 
 router = APIRouter()
 
@@ -35,16 +49,16 @@ router = APIRouter()
     summary="Clasificar una llamada por descripción textual",
     description="Clasifica una llamada basándose únicamente en su descripción textual. No guarda la clasificación en la base de datos, solo retorna el resultado."
 )
-def clasificar_texto_endpoint(
+async def clasificar_texto_endpoint(
     request: ClasificacionTextoRequest,
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """
     Clasifica una llamada basándose en su descripción textual usando IA.
     Esta función no guarda la clasificación, solo la retorna.
     """
     try:
-        resultado = clasificar_texto_llamada(request.descripcion)
+        resultado = await clasificar_texto_llamada_async(request.descripcion)
         
         return ClasificacionTextoResponse(
             categoria=resultado["categoria"],
@@ -65,10 +79,10 @@ def clasificar_texto_endpoint(
     summary="Crear una nueva clasificación IA automáticamente",
     description="Clasifica automáticamente una llamada usando IA. Solo requiere el ID de la llamada. La clasificación se genera automáticamente basándose en las características de la llamada."
 )
-def crear_clasificacion_ia_endpoint(
+async def crear_clasificacion_ia_endpoint(
     clasificacion_auto: ClasificacionIACreateAuto,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """
     Crea una nueva clasificación IA automáticamente usando el LLM.
@@ -76,7 +90,7 @@ def crear_clasificacion_ia_endpoint(
     """
     try:
         # Obtener la llamada
-        llamada = obtener_llamada(db, clasificacion_auto.llamada_id)
+        llamada = await obtener_llamada_async(db, clasificacion_auto.llamada_id)
         if not llamada:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -84,7 +98,7 @@ def crear_clasificacion_ia_endpoint(
             )
         
         # Verificar que la llamada no tenga ya una clasificación
-        existe = obtener_clasificacion_ia_por_llamada(db, clasificacion_auto.llamada_id)
+        existe = await obtener_clasificacion_ia_por_llamada_async(db, clasificacion_auto.llamada_id)
         if existe:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -92,7 +106,7 @@ def crear_clasificacion_ia_endpoint(
             )
         
         # Clasificar usando IA
-        resultado_ia = clasificar_llamada_con_ia(
+        resultado_ia = await clasificar_llamada_con_ia_async(
             tipo_llamada=llamada.tipo,
             resultado_llamada=llamada.resultado,
             numero_cliente=llamada.numero_cliente,
@@ -107,7 +121,7 @@ def crear_clasificacion_ia_endpoint(
             recomendacion_agente=resultado_ia["recomendacion_agente"]
         )
         
-        return crear_clasificacion_ia(db, clasificacion)
+        return await crear_clasificacion_ia_async(db, clasificacion)
         
     except HTTPException:
         raise
@@ -123,28 +137,178 @@ def crear_clasificacion_ia_endpoint(
         )
 
 
+@router.post(
+    "/lote",
+    response_model=ClasificacionIALoteResponse,
+    summary="Clasificar varias llamadas con IA",
+    description="Clasifica automáticamente varias llamadas. Las llamadas se cargan con una sola consulta, se envían al LLM en bloques (varias descripciones por prompt) y las clasificaciones se guardan en una sola transacción. La respuesta indica, por llamada, si se clasificó o por qué no."
+)
+async def crear_clasificaciones_ia_lote_endpoint(
+    lote: ClasificacionIALoteCreate,
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Clasifica un lote de llamadas usando el LLM."""
+    llamada_ids = list(dict.fromkeys(lote.llamada_ids))  # sin repetidos, en orden
+    encontradas = await obtener_llamadas_para_clasificar_async(db, llamada_ids)
+    
+    errores = {}
+    por_clasificar = []
+    for llamada_id in llamada_ids:
+        if llamada_id not in encontradas:
+            errores[llamada_id] = f"La llamada con ID {llamada_id} no existe"
+        elif encontradas[llamada_id][1]:
+            errores[llamada_id] = f"La llamada con ID {llamada_id} ya tiene una clasificación IA"
+        else:
+            por_clasificar.append(encontradas[llamada_id][0])
+    
+    resultados_ia = await clasificar_llamadas_lote_async([
+        {
+            "tipo_llamada": llamada.tipo,
+            "resultado_llamada": llamada.resultado,
+            "duracion_segundos": llamada.duracion_segundos,
+        }
+        for llamada in por_clasificar
+    ])
+    clasificaciones = [
+        ClasificacionIACreate(llamada_id=llamada.id, **resultado_ia)
+        for llamada, resultado_ia in zip(por_clasificar, resultados_ia)
+    ]
+    
+    try:
+        creadas = await crear_clasificaciones_ia_lote_async(db, clasificaciones)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    por_llamada = {clasificacion.llamada_id: clasificacion for clasificacion in creadas}
+    for clasificacion in clasificaciones:
+        if clasificacion.llamada_id not in por_llamada:
+            # Clasificada por otra petición o por la cola mientras se consultaba al LLM
+            errores[clasificacion.llamada_id] = (
+                f"La llamada con ID {clasificacion.llamada_id} ya tiene una clasificación IA"
+            )
+    resultados = [
+        {
+            "llamada_id": llamada_id,
+            "ok": llamada_id in por_llamada,
+            "clasificacion": por_llamada.get(llamada_id),
+            "error": errores.get(llamada_id),
+        }
+        for llamada_id in llamada_ids
+    ]
+    return ClasificacionIALoteResponse(
+        total=len(resultados),
+        creadas=len(creadas),
+        fallidas=len(resultados) - len(creadas),
+        resultados=resultados
+    )
+
+
 @router.get(
     "/",
     response_model=List[ClasificacionIAResponse],
     summary="Obtener lista de clasificaciones IA",
-    description="Obtiene una lista de clasificaciones IA con opciones de paginación y filtrado."
+    description="Obtiene una lista de clasificaciones IA con opciones de paginación y filtrado. Para paginar por cursor, enviar en `cursor` el valor de la cabecera X-Next-Cursor de la página anterior."
 )
-def obtener_clasificaciones_ia_endpoint(
+async def obtener_clasificaciones_ia_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     categoria: Optional[str] = None,
     confianza_minima: Optional[float] = None,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una lista de clasificaciones IA."""
-    return obtener_clasificaciones_ia(
-        db,
-        skip=skip,
-        limit=limit,
-        categoria=categoria,
-        confianza_minima=confianza_minima
-    )
+    try:
+        clasificaciones = await obtener_clasificaciones_ia_async(
+            db,
+            skip=skip,
+            limit=limit,
+            categoria=categoria,
+            confianza_minima=confianza_minima,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    siguiente = cursor_siguiente_clasificaciones_ia(clasificaciones, limit)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return clasificaciones
+
+
+@router.get(
+    "/estado-llm",
+    response_model=Dict[str, Any],
+    summary="Estado del acceso al LLM",
+    description="Métricas del proceso sobre las peticiones al LLM: modelo configurado, peticiones en curso, en espera y tiempo de espera en la cola del limitador de concurrencia (LLM_MAX_CONCURRENCIA), aciertos de las cachés de clasificaciones y de usuarios autenticados, y estado de la cola de clasificación automática."
+)
+async def estado_llm_endpoint(
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Retorna las métricas del acceso al LLM."""
+    return {
+        **estadisticas_clasificacion(),
+        "cola_clasificacion": COLA_CLASIFICACION.estadisticas(),
+        "cache_usuarios": CACHE_USUARIOS.estadisticas(),
+    }
+
+
+@router.get(
+    "/metricas-llm",
+    response_model=Dict[str, Any],
+    summary="Métricas por petición al LLM",
+    description="Peticiones al LLM de la clasificación en este proceso: contadores por operación, servidor, modelo y resultado (ok, json_error, fallback) con sus tokens y segundos, e histogramas de latencia y de tokens de prompt y respuesta. Con LLM_TRAZA_ARCHIVO cada petición se escribe además como una línea JSON en ese archivo."
+)
+async def metricas_llm_endpoint(
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Retorna los contadores e histogramas de las peticiones al LLM."""
+    return METRICAS_LLM.estadisticas()
+
+
+@router.get(
+    "/trabajos",
+    response_model=List[TrabajoClasificacionResponse],
+    summary="Listar trabajos de clasificación automática",
+    description="Trabajos de la cola de clasificación automática de este proceso, los más recientes primero. Cada llamada creada encola un trabajo; filtrar por `llamada_id` para seguir el de una llamada."
+)
+async def obtener_trabajos_clasificacion_endpoint(
+    llamada_id: Optional[int] = None,
+    estado: Optional[Literal["pendiente", "en_proceso", "reintentando", "completado", "fallido"]] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Lista trabajos de clasificación automática."""
+    return COLA_CLASIFICACION.obtener_trabajos(llamada_id=llamada_id, estado=estado, limit=limit)
+
+
+@router.get(
+    "/trabajos/{trabajo_id}",
+    response_model=TrabajoClasificacionResponse,
+    summary="Estado de un trabajo de clasificación automática",
+    description="Obtiene el estado de un trabajo de la cola. El ID se recibe en la cabecera X-Trabajo-Clasificacion al crear la llamada."
+)
+async def obtener_trabajo_clasificacion_endpoint(
+    trabajo_id: int,
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Obtiene el estado de un trabajo de clasificación automática."""
+    trabajo = COLA_CLASIFICACION.obtener_trabajo(trabajo_id)
+    if not trabajo:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Trabajo de clasificación con ID {trabajo_id} no encontrado"
+        )
+    return trabajo
 
 
 @router.get(
@@ -153,13 +317,13 @@ def obtener_clasificaciones_ia_endpoint(
     summary="Obtener una clasificación IA por ID",
     description="Obtiene los detalles de una clasificación IA específica por su ID."
 )
-def obtener_clasificacion_ia_endpoint(
+async def obtener_clasificacion_ia_endpoint(
     clasificacion_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una clasificación IA por su ID."""
-    clasificacion = obtener_clasificacion_ia(db, clasificacion_id)
+    clasificacion = await obtener_clasificacion_ia_async(db, clasificacion_id)
     if not clasificacion:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -174,13 +338,13 @@ def obtener_clasificacion_ia_endpoint(
     summary="Obtener clasificación IA de una llamada",
     description="Obtiene la clasificación IA asociada a una llamada específica."
 )
-def obtener_clasificacion_ia_por_llamada_endpoint(
+async def obtener_clasificacion_ia_por_llamada_endpoint(
     llamada_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene la clasificación IA de una llamada."""
-    clasificacion = obtener_clasificacion_ia_por_llamada(db, llamada_id)
+    clasificacion = await obtener_clasificacion_ia_por_llamada_async(db, llamada_id)
     if not clasificacion:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -195,15 +359,15 @@ def obtener_clasificacion_ia_por_llamada_endpoint(
     summary="Actualizar una clasificación IA",
     description="Actualiza los datos de una clasificación IA existente. Solo se actualizan los campos proporcionados."
 )
-def actualizar_clasificacion_ia_endpoint(
+async def actualizar_clasificacion_ia_endpoint(
     clasificacion_id: int,
     clasificacion_update: ClasificacionIAUpdate,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Actualiza una clasificación IA."""
     try:
-        clasificacion = actualizar_clasificacion_ia(db, clasificacion_id, clasificacion_update)
+        clasificacion = await actualizar_clasificacion_ia_async(db, clasificacion_id, clasificacion_update)
         if not clasificacion:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -223,13 +387,13 @@ def actualizar_clasificacion_ia_endpoint(
     summary="Eliminar una clasificación IA",
     description="Elimina una clasificación IA del sistema."
 )
-def eliminar_clasificacion_ia_endpoint(
+async def eliminar_clasificacion_ia_endpoint(
     clasificacion_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Elimina una clasificación IA."""
-    eliminada = eliminar_clasificacion_ia(db, clasificacion_id)
+    eliminada = await eliminar_clasificacion_ia_async(db, clasificacion_id)
     if not eliminada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
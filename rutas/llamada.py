@@ -2,89 +2,249 @@
 Endpoints para el modelo Llamada.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from modelos import get_async_db, get_async_read_db, AsyncReadSessionLocal, Usuario
 from esquemas import (
     LlamadaCreate,
     LlamadaUpdate,
     LlamadaResponse,
+    LlamadaLoteCreate,
+    LlamadaLoteResponse,
 )
 from crud import (
-    crear_llamada,
-    obtener_llamada,
-    obtener_llamadas,
-    obtener_llamadas_por_usuario,
-    actualizar_llamada,
-    eliminar_llamada,
+    crear_llamada_async,
+    crear_llamadas_lote_async,
+    obtener_llamada_async,
+    obtener_llamadas_async,
+    obtener_llamadas_por_usuario_async,
+    actualizar_llamada_async,
+    eliminar_llamada_async,
+    cursor_siguiente_llamadas,
+    exportar_llamadas_async,
 )
-from auth import obtener_usuario_actual
+from crud.llamada import COLUMNAS_EXPORTACION, FILAS_POR_BLOQUE_EXPORTACION
+from crud.fechas import fecha_hora_a_epoch
+from crud.paginacion import CABECERA_CURSOR
+from auth import obtener_usuario_actual_async
+from servicios.cola_clasificacion import CABECERA_TRABAJO, encolar_clasificacion
 
 router = APIRouter()
 
+# Tipo de contenido de cada formato de exportación
+TIPOS_EXPORTACION = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
 
 @router.post(
     "/",
     response_model=LlamadaResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Crear una nueva llamada",
-    description="Registra una nueva llamada en el sistema. Valida que el usuario_id exista."
+    description="Registra una nueva llamada en el sistema. Valida que el usuario_id exista. La clasificación IA se encola en segundo plano; el ID del trabajo se devuelve en la cabecera X-Trabajo-Clasificacion."
 )
-def crear_llamada_endpoint(
+async def crear_llamada_endpoint(
     llamada: LlamadaCreate,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Crea una nueva llamada."""
     try:
-        return crear_llamada(db, llamada)
+        db_llamada = await crear_llamada_async(db, llamada)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    
+    trabajo = encolar_clasificacion(db_llamada.id)
+    if trabajo:
+        response.headers[CABECERA_TRABAJO] = str(trabajo["id"])
+    return db_llamada
+
+
+@router.post(
+    "/lote",
+    response_model=LlamadaLoteResponse,
+    summary="Registrar llamadas en lote",
+    description="Registra muchas llamadas en una sola transacción. Cada elemento se valida por separado y la respuesta indica, por posición, si se creó o por qué se rechazó. Las llamadas creadas se encolan para clasificación IA en segundo plano (ver GET /api/clasificaciones-ia/trabajos)."
+)
+async def crear_llamadas_lote_endpoint(
+    lote: LlamadaLoteCreate,
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Registra un lote de llamadas."""
+    resultados = [None] * len(lote.llamadas)
+    validas = []
+    indices_validas = []
+    
+    for indice, datos in enumerate(lote.llamadas):
+        try:
+            validas.append(LlamadaCreate.model_validate(datos))
+            indices_validas.append(indice)
+        except ValidationError as e:
+            # Campo con el error (los validadores del modelo completo no tienen loc)
+            errores = "; ".join(
+                f'{".".join(map(str, error["loc"]))}: {error["msg"]}' if error["loc"] else error["msg"]
+                for error in e.errors()
+            )
+            resultados[indice] = {"indice": indice, "ok": False, "id": None, "error": errores}
+    
+    if validas:
+        for indice, resultado in zip(indices_validas, await crear_llamadas_lote_async(db, validas)):
+            resultados[indice] = {**resultado, "indice": indice}
+            if resultado["ok"]:
+                encolar_clasificacion(resultado["id"])
+    
+    creadas = sum(1 for resultado in resultados if resultado["ok"])
+    return LlamadaLoteResponse(
+        total=len(resultados),
+        creadas=creadas,
+        fallidas=len(resultados) - creadas,
+        resultados=resultados
+    )
 
 
 @router.get(
     "/",
     response_model=List[LlamadaResponse],
     summary="Obtener lista de llamadas",
-    description="Obtiene una lista de llamadas con opciones de paginación y filtrado."
+    description="Obtiene una lista de llamadas con opciones de paginación y filtrado. `fecha_desde` y `fecha_hasta` aceptan fechas ISO 8601 con o sin zona horaria (si `fecha_hasta` es solo un día, se incluye completo). Para paginar por cursor, enviar en `cursor` el valor de la cabecera X-Next-Cursor de la página anterior."
 )
-def obtener_llamadas_endpoint(
+async def obtener_llamadas_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     usuario_id: Optional[int] = None,
     tipo: Optional[str] = None,
     resultado: Optional[str] = None,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una lista de llamadas."""
-    return obtener_llamadas(
-        db,
-        skip=skip,
-        limit=limit,
-        usuario_id=usuario_id,
-        tipo=tipo,
-        resultado=resultado
+    try:
+        llamadas = await obtener_llamadas_async(
+            db,
+            skip=skip,
+            limit=limit,
+            usuario_id=usuario_id,
+            tipo=tipo,
+            resultado=resultado,
+            cursor=cursor,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    siguiente = cursor_siguiente_llamadas(llamadas, limit)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return llamadas
+
+
+@router.get(
+    "/export",
+    summary="Exportar llamadas",
+    description="Exporta las llamadas en NDJSON (una llamada JSON por línea) o CSV, en orden cronológico. Admite los mismos filtros que el listado más un rango de fechas. Las filas se envían a medida que se leen de la base, sin paginar."
+)
+async def exportar_llamadas_endpoint(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    usuario_id: Optional[int] = None,
+    tipo: Optional[str] = None,
+    resultado: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
+):
+    """Exporta las llamadas filtradas como un flujo NDJSON o CSV."""
+    # Validar las fechas antes de empezar a responder: una vez enviado el
+    # estado 200 ya no se puede devolver un 400
+    try:
+        for fecha in (fecha_desde, fecha_hasta):
+            if fecha:
+                fecha_hora_a_epoch(fecha)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filtros = {
+        "usuario_id": usuario_id,
+        "tipo": tipo,
+        "resultado": resultado,
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta,
+    }
+    return StreamingResponse(
+        _generar_exportacion(formato, filtros),
+        media_type=TIPOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="llamadas.{formato}"'}
     )
 
 
+async def _generar_exportacion(formato: str, filtros: dict) -> AsyncIterator[str]:
+    """
+    Produce el cuerpo de la exportación por bloques de filas.
+    
+    Usa su propia sesión de solo lectura porque el flujo se sigue consumiendo
+    después de que el endpoint retorna.
+    """
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n") if formato == "csv" else None
+    if escritor:
+        escritor.writerow(COLUMNAS_EXPORTACION)
+    filas_en_buffer = 0
+    
+    async with AsyncReadSessionLocal() as db:
+        async for fila in exportar_llamadas_async(db, **filtros):
+            if escritor:
+                escritor.writerow(fila.values())
+            else:
+                buffer.write(json.dumps(fila, ensure_ascii=False))
+                buffer.write("\n")
+            filas_en_buffer += 1
+            
+            if filas_en_buffer >= FILAS_POR_BLOQUE_EXPORTACION:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                filas_en_buffer = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
 @router.get(
     "/{llamada_id}",
     response_model=LlamadaResponse,
     summary="Obtener una llamada por ID",
     description="Obtiene los detalles de una llamada específica por su ID."
 )
-def obtener_llamada_endpoint(
+async def obtener_llamada_endpoint(
     llamada_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una llamada por su ID."""
-    llamada = obtener_llamada(db, llamada_id)
+    llamada = await obtener_llamada_async(db, llamada_id)
     if not llamada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,17 +257,32 @@ def obtener_llamada_endpoint(
     "/usuario/{usuario_id}",
     response_model=List[LlamadaResponse],
     summary="Obtener llamadas de un usuario",
-    description="Obtiene todas las llamadas atendidas por un usuario específico."
+    description="Obtiene todas las llamadas atendidas por un usuario específico. Admite paginación por cursor (cabecera X-Next-Cursor)."
 )
-def obtener_llamadas_por_usuario_endpoint(
+async def obtener_llamadas_por_usuario_endpoint(
     usuario_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene todas las llamadas de un usuario."""
-    return obtener_llamadas_por_usuario(db, usuario_id, skip=skip, limit=limit)
+    try:
+        llamadas = await obtener_llamadas_por_usuario_async(
+            db, usuario_id, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    siguiente = cursor_siguiente_llamadas(llamadas, limit)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return llamadas
 
 
 @router.put(
@@ -116,15 +291,15 @@ def obtener_llamadas_por_usuario_endpoint(
     summary="Actualizar una llamada",
     description="Actualiza los datos de una llamada existente. Solo se actualizan los campos proporcionados."
 )
-def actualizar_llamada_endpoint(
+async def actualizar_llamada_endpoint(
     llamada_id: int,
     llamada_update: LlamadaUpdate,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Actualiza una llamada."""
     try:
-        llamada = actualizar_llamada(db, llamada_id, llamada_update)
+        llamada = await actualizar_llamada_async(db, llamada_id, llamada_update)
         if not llamada:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -144,13 +319,13 @@ def actualizar_llamada_endpoint(
     summary="Eliminar una llamada",
     description="Elimina una llamada del sistema."
 )
-def eliminar_llamada_endpoint(
+async def eliminar_llamada_endpoint(
     llamada_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Elimina una llamada."""
-    eliminada = eliminar_llamada(db, llamada_id)
+    eliminada = await eliminar_llamada_async(db, llamada_id)
     if not eliminada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
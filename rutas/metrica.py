@@ -4,22 +4,22 @@ Endpoints para el modelo Metrica.
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+from sqlalchemy.ext.asyncio import AsyncSession
+from modelos import get_async_db, get_async_read_db, Usuario
 from esquemas import (
     MetricaCreate,
     MetricaUpdate,
     MetricaResponse,
 )
 from crud import (
-    crear_metrica,
-    obtener_metrica,
-    obtener_metrica_por_fecha,
-    obtener_metricas,
-    actualizar_metrica,
-    eliminar_metrica,
+    crear_metrica_async,
+    obtener_metrica_async,
+    obtener_metrica_por_fecha_async,
+    obtener_metricas_async,
+    actualizar_metrica_async,
+    eliminar_metrica_async,
 )
-from auth import obtener_usuario_actual
+from auth import obtener_usuario_actual_async
 
 router = APIRouter()
 
@@ -31,14 +31,14 @@ router = APIRouter()
     summary="Crear una nueva métrica",
     description="Crea una nueva métrica diaria. Valida que no exista ya una métrica para esa fecha."
 )
-def crear_metrica_endpoint(
+async def crear_metrica_endpoint(
     metrica: MetricaCreate,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Crea una nueva métrica."""
     try:
-        return crear_metrica(db, metrica)
+        return await crear_metrica_async(db, metrica)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,16 +52,16 @@ def crear_metrica_endpoint(
     summary="Obtener lista de métricas",
     description="Obtiene una lista de métricas con opciones de paginación y filtrado por rango de fechas."
 )
-def obtener_metricas_endpoint(
+async def obtener_metricas_endpoint(
     skip: int = 0,
     limit: int = 100,
     fecha_desde: Optional[str] = None,
     fecha_hasta: Optional[str] = None,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una lista de métricas."""
-    return obtener_metricas(
+    return await obtener_metricas_async(
         db,
         skip=skip,
         limit=limit,
@@ -76,13 +76,13 @@ def obtener_metricas_endpoint(
     summary="Obtener una métrica por ID",
     description="Obtiene los detalles de una métrica específica por su ID."
 )
-def obtener_metrica_endpoint(
+async def obtener_metrica_endpoint(
     metrica_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una métrica por su ID."""
-    metrica = obtener_metrica(db, metrica_id)
+    metrica = await obtener_metrica_async(db, metrica_id)
     if not metrica:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,13 +97,13 @@ def obtener_metrica_endpoint(
     summary="Obtener una métrica por fecha",
     description="Obtiene la métrica de una fecha específica (formato: YYYY-MM-DD)."
 )
-def obtener_metrica_por_fecha_endpoint(
+async def obtener_metrica_por_fecha_endpoint(
     fecha: str,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_read_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Obtiene una métrica por su fecha."""
-    metrica = obtener_metrica_por_fecha(db, fecha)
+    metrica = await obtener_metrica_por_fecha_async(db, fecha)
     if not metrica:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -118,15 +118,15 @@ def obtener_metrica_por_fecha_endpoint(
     summary="Actualizar una métrica",
     description="Actualiza los datos de una métrica existente. Solo se actualizan los campos proporcionados."
 )
-def actualizar_metrica_endpoint(
+async def actualizar_metrica_endpoint(
     metrica_id: int,
     metrica_update: MetricaUpdate,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Actualiza una métrica."""
     try:
-        metrica = actualizar_metrica(db, metrica_id, metrica_update)
+        metrica = await actualizar_metrica_async(db, metrica_id, metrica_update)
         if not metrica:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -146,13 +146,13 @@ def actualizar_metrica_endpoint(
     summary="Eliminar una métrica",
     description="Elimina una métrica del sistema."
 )
-def eliminar_metrica_endpoint(
+async def eliminar_metrica_endpoint(
     metrica_id: int,
-    db: Session = Depends(get_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    db: AsyncSession = Depends(get_async_db),
+    usuario_actual: Usuario = Depends(obtener_usuario_actual_async)
 ):
     """Elimina una métrica."""
-    eliminada = eliminar_metrica(db, metrica_id)
+    eliminada = await eliminar_metrica_async(db, metrica_id)
     if not eliminada:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
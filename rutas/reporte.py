@@ -3,9 +3,9 @@ Endpoints para el modelo Reporte.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+from modelos import get_db, get_read_db, Usuario
 from esquemas import (
     ReporteCreate,
     ReporteUpdate,
@@ -18,7 +18,9 @@ from crud import (
     obtener_reportes_por_usuario,
     actualizar_reporte,
     eliminar_reporte,
+    cursor_siguiente_reportes,
 )
+from crud.paginacion import CABECERA_CURSOR
 from auth import obtener_usuario_actual
 
 router = APIRouter()
@@ -50,26 +52,40 @@ def crear_reporte_endpoint(
     "/",
     response_model=List[ReporteResponse],
     summary="Obtener lista de reportes",
-    description="Obtiene una lista de reportes con opciones de paginación y filtrado."
+    description="Obtiene una lista de reportes con opciones de paginación y filtrado. Para paginar por cursor, enviar en `cursor` el valor de la cabecera X-Next-Cursor de la página anterior."
 )
 def obtener_reportes_endpoint(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     generado_por: Optional[int] = None,
     fecha_desde: Optional[str] = None,
     fecha_hasta: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene una lista de reportes."""
-    return obtener_reportes(
-        db,
-        skip=skip,
-        limit=limit,
-        generado_por=generado_por,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta
-    )
+    try:
+        reportes = obtener_reportes(
+            db,
+            skip=skip,
+            limit=limit,
+            generado_por=generado_por,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    siguiente = cursor_siguiente_reportes(reportes, limit)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return reportes
 
 
 @router.get(
@@ -80,7 +96,7 @@ def obtener_reportes_endpoint(
 )
 def obtener_reporte_endpoint(
     reporte_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene un reporte por su ID."""
@@ -97,17 +113,30 @@ def obtener_reporte_endpoint(
     "/usuario/{usuario_id}",
     response_model=List[ReporteResponse],
     summary="Obtener reportes de un usuario",
-    description="Obtiene todos los reportes generados por un usuario específico."
+    description="Obtiene todos los reportes generados por un usuario específico. Admite paginación por cursor (cabecera X-Next-Cursor)."
 )
 def obtener_reportes_por_usuario_endpoint(
     usuario_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene todos los reportes de un usuario."""
-    return obtener_reportes_por_usuario(db, usuario_id, skip=skip, limit=limit)
+    try:
+        reportes = obtener_reportes_por_usuario(db, usuario_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    siguiente = cursor_siguiente_reportes(reportes, limit)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return reportes
 
 
 @router.put(
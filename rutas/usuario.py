@@ -6,7 +6,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from modelos import get_db, Usuario
+from modelos import get_db, get_read_db, Usuario
 from esquemas import (
     UsuarioCreate,
     UsuarioUpdate,
@@ -62,7 +62,7 @@ def obtener_usuarios_endpoint(
     skip: int = 0,
     limit: int = 100,
     rol: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene una lista de usuarios."""
@@ -77,7 +77,7 @@ def obtener_usuarios_endpoint(
 )
 def obtener_usuario_endpoint(
     usuario_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene un usuario por su ID."""
@@ -98,7 +98,7 @@ def obtener_usuario_endpoint(
 )
 def obtener_usuario_por_email_endpoint(
     email: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     usuario_actual: Usuario = Depends(obtener_usuario_actual)
 ):
     """Obtiene un usuario por su email."""
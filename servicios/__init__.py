@@ -2,16 +2,32 @@
 Servicios para funcionalidades avanzadas del sistema.
 """
 
+from servicios.cache import CacheLRU
+from servicios.cache_persistente import CachePersistente
+from servicios.coalescencia import VueloUnico
+from servicios.llm import estadisticas_llm
 from servicios.clasificacion_ia import (
     clasificar_llamada_con_ia,
+    clasificar_llamada_con_ia_async,
+    clasificar_llamadas_lote_async,
     clasificar_texto_llamada,
+    clasificar_texto_llamada_async,
+    estadisticas_clasificacion,
     generar_recomendacion,
     generar_recomendacion_generica,
 )
 
 __all__ = [
+    "CacheLRU",
+    "CachePersistente",
+    "VueloUnico",
+    "estadisticas_llm",
     "clasificar_llamada_con_ia",
+    "clasificar_llamada_con_ia_async",
+    "clasificar_llamadas_lote_async",
     "clasificar_texto_llamada",
+    "clasificar_texto_llamada_async",
+    "estadisticas_clasificacion",
     "generar_recomendacion",
     "generar_recomendacion_generica",
 ]
@@ -0,0 +1,110 @@
+"""
+Caché en memoria acotada (LRU) con expiración por tiempo (TTL).
+
+Es local a cada proceso: con varios workers cada uno tiene su propia copia,
+y el TTL acota cuánto puede tardar en verse un cambio hecho por otro proceso.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheLRU:
+    """
+    Diccionario con tamaño máximo y TTL, seguro entre hilos.
+
+    Al superar max_entradas se descarta la entrada usada hace más tiempo.
+    Cuenta aciertos y fallos para poder medir su efectividad.
+    """
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: Optional[float] = 60.0):
+        """
+        Args:
+            max_entradas: Número máximo de entradas guardadas
+            ttl_segundos: Segundos que vive cada entrada (None = sin expiración)
+        """
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave: Hashable, defecto: Any = None) -> Any:
+        """
+        Retorna el valor guardado para la clave, o `defecto` si no está o expiró.
+
+        Args:
+            clave: Clave a buscar
+            defecto: Valor a retornar en caso de fallo
+
+        Returns:
+            Valor guardado o `defecto`
+        """
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                valor, expira = entrada
+                if expira is None or expira > time.monotonic():
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return valor
+                del self._entradas[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        """
+        Guarda un valor, descartando la entrada menos usada si se llenó.
+
+        Args:
+            clave: Clave
+            valor: Valor a guardar
+        """
+        expira = time.monotonic() + self.ttl_segundos if self.ttl_segundos is not None else None
+        with self._candado:
+            self._entradas[clave] = (valor, expira)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, clave: Hashable) -> None:
+        """
+        Elimina una entrada (no hace nada si no existe).
+
+        Args:
+            clave: Clave a eliminar
+        """
+        with self._candado:
+            self._entradas.pop(clave, None)
+
+    def limpiar(self) -> None:
+        """Elimina todas las entradas y reinicia los contadores."""
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Contadores de uso de la caché.
+
+        Returns:
+            Diccionario con aciertos, fallos, tasa_aciertos, entradas,
+            max_entradas y ttl_segundos
+        """
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
@@ -0,0 +1,263 @@
+"""
+Caché de clasificaciones en un archivo SQLite propio, que sobrevive a los
+reinicios y se comparte entre los workers de la misma máquina.
+
+Cada entrada se guarda bajo el SHA-256 de la operación, los modelos del
+pool de servidores, la versión de prompt y la descripción normalizada, así
+que cambiar los modelos configurados (OPENAI_MODEL o LLM_BACKENDS) o el
+prompt deja de encontrar las anteriores sin borrarlas. Al superar
+max_entradas se descartan las usadas hace más tiempo; la revisión se hace
+cada REVISAR_CADA escrituras, por lo que el archivo puede pasarse de ese
+límite en otras tantas entradas.
+
+Un error de SQLite (archivo bloqueado, disco lleno) no interrumpe la
+clasificación: la consulta cuenta como fallo, la escritura se omite y el
+error se suma en las estadísticas.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from modelos.database import crear_motor
+
+# Archivo SQLite de la caché; vacío para desactivarla
+ARCHIVO_CACHE = os.getenv("CLASIFICACION_CACHE_PERSISTENTE_ARCHIVO", "data/cache_clasificacion.db")
+
+# Clasificaciones guardadas como máximo
+MAX_ENTRADAS = int(os.getenv("CLASIFICACION_CACHE_PERSISTENTE_MAX", "100000"))
+
+# Escrituras entre revisiones del límite de entradas
+REVISAR_CADA = 64
+
+# Errores que no interrumpen la clasificación (SQLite o el archivo)
+_ERRORES_CACHE = (SQLAlchemyError, OSError)
+
+_ESQUEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache_clasificacion (
+        clave TEXT PRIMARY KEY,
+        categoria TEXT NOT NULL,
+        confianza REAL NOT NULL,
+        recomendacion_agente TEXT,
+        creado REAL NOT NULL,
+        usado REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_cache_clasificacion_usado ON cache_clasificacion (usado)",
+)
+
+
+class CachePersistente:
+    """
+    Clasificaciones (categoria, confianza, recomendacion_agente) guardadas
+    en SQLite, seguras entre hilos y procesos.
+
+    Uso:
+        clave = CachePersistente.clave("texto", MODELOS_POOL, VERSION_PROMPT, texto)
+        resultado = CACHE_PERSISTENTE.obtener(clave)
+        CACHE_PERSISTENTE.guardar(clave, resultado)
+
+    obtener_async y guardar_async hacen lo mismo en un hilo, sin bloquear
+    el event loop mientras SQLite espera un bloqueo.
+    """
+
+    def __init__(self, archivo: str = ARCHIVO_CACHE, max_entradas: int = MAX_ENTRADAS):
+        """
+        Args:
+            archivo: Archivo SQLite (vacío para desactivar la caché)
+            max_entradas: Número máximo de clasificaciones guardadas
+        """
+        self.archivo = archivo
+        self.max_entradas = max_entradas
+        self._motor = None
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+        self.descartadas = 0
+        self.errores = 0
+
+    @property
+    def activa(self) -> bool:
+        return bool(self.archivo)
+
+    @staticmethod
+    def clave(*partes: str) -> str:
+        """
+        Clave de una clasificación: SHA-256 de las partes (operación,
+        modelos del pool, versión de prompt, descripción normalizada).
+        """
+        return hashlib.sha256("\x1f".join(partes).encode("utf-8")).hexdigest()
+
+    def _conectar(self):
+        """Crea el archivo, la tabla y el motor en el primer uso."""
+        with self._candado:
+            if self._motor is None:
+                directorio = os.path.dirname(self.archivo)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                motor = crear_motor(f"sqlite:///{self.archivo}")
+                with motor.begin() as conexion:
+                    for sentencia in _ESQUEMA:
+                        conexion.execute(text(sentencia))
+                self._motor = motor
+            return self._motor
+
+    def obtener(self, clave: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna la clasificación guardada y marca la entrada como usada.
+
+        Args:
+            clave: Clave de CachePersistente.clave
+
+        Returns:
+            Diccionario con categoria, confianza y recomendacion_agente, o
+            None si no está, la caché está desactivada o SQLite falló
+        """
+        if not self.activa:
+            return None
+        try:
+            with self._conectar().begin() as conexion:
+                fila = conexion.execute(
+                    text(
+                        "SELECT categoria, confianza, recomendacion_agente"
+                        " FROM cache_clasificacion WHERE clave = :clave"
+                    ),
+                    {"clave": clave},
+                ).first()
+                if fila is not None:
+                    conexion.execute(
+                        text("UPDATE cache_clasificacion SET usado = :usado WHERE clave = :clave"),
+                        {"clave": clave, "usado": time.time()},
+                    )
+        except _ERRORES_CACHE:
+            with self._candado:
+                self.errores += 1
+                self.fallos += 1
+            return None
+
+        with self._candado:
+            if fila is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+        return {
+            "categoria": fila.categoria,
+            "confianza": fila.confianza,
+            "recomendacion_agente": fila.recomendacion_agente,
+        }
+
+    def guardar(self, clave: str, resultado: Dict[str, Any]) -> None:
+        """
+        Guarda (o reemplaza) una clasificación.
+
+        Args:
+            clave: Clave de CachePersistente.clave
+            resultado: Diccionario con categoria, confianza y recomendacion_agente
+        """
+        if not self.activa:
+            return
+        ahora = time.time()
+        try:
+            with self._conectar().begin() as conexion:
+                conexion.execute(
+                    text(
+                        "INSERT INTO cache_clasificacion"
+                        " (clave, categoria, confianza, recomendacion_agente, creado, usado)"
+                        " VALUES (:clave, :categoria, :confianza, :recomendacion_agente, :ahora, :ahora)"
+                        " ON CONFLICT(clave) DO UPDATE SET"
+                        " categoria = excluded.categoria, confianza = excluded.confianza,"
+                        " recomendacion_agente = excluded.recomendacion_agente, usado = excluded.usado"
+                    ),
+                    {
+                        "clave": clave,
+                        "categoria": resultado["categoria"],
+                        "confianza": resultado["confianza"],
+                        "recomendacion_agente": resultado.get("recomendacion_agente"),
+                        "ahora": ahora,
+                    },
+                )
+                with self._candado:
+                    self.escrituras += 1
+                    revisar = (self.escrituras - 1) % REVISAR_CADA == 0
+                if revisar:
+                    self._descartar_antiguas(conexion)
+        except _ERRORES_CACHE:
+            with self._candado:
+                self.errores += 1
+
+    def _descartar_antiguas(self, conexion) -> None:
+        """Elimina las entradas que exceden max_entradas, las usadas hace más tiempo primero."""
+        descartadas = conexion.execute(
+            text(
+                "DELETE FROM cache_clasificacion WHERE usado <= ("
+                " SELECT usado FROM cache_clasificacion ORDER BY usado DESC LIMIT 1 OFFSET :max_entradas)"
+            ),
+            {"max_entradas": self.max_entradas},
+        ).rowcount
+        with self._candado:
+            self.descartadas += descartadas
+
+    async def obtener_async(self, clave: str) -> Optional[Dict[str, Any]]:
+        """Versión asíncrona de obtener."""
+        if not self.activa:
+            return None
+        return await asyncio.to_thread(self.obtener, clave)
+
+    async def guardar_async(self, clave: str, resultado: Dict[str, Any]) -> None:
+        """Versión asíncrona de guardar."""
+        if self.activa:
+            await asyncio.to_thread(self.guardar, clave, resultado)
+
+    def limpiar(self) -> None:
+        """Elimina todas las clasificaciones guardadas y reinicia los contadores."""
+        if self.activa:
+            with self._conectar().begin() as conexion:
+                conexion.execute(text("DELETE FROM cache_clasificacion"))
+        with self._candado:
+            self.aciertos = 0
+            self.fallos = 0
+            self.escrituras = 0
+            self.descartadas = 0
+            self.errores = 0
+
+    def entradas(self) -> int:
+        """Número de clasificaciones guardadas (0 si está desactivada o SQLite falló)."""
+        if not self.activa:
+            return 0
+        try:
+            with self._conectar().connect() as conexion:
+                return conexion.execute(text("SELECT COUNT(*) FROM cache_clasificacion")).scalar_one()
+        except _ERRORES_CACHE:
+            return 0
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con archivo, aciertos, fallos, tasa_aciertos,
+            escrituras, descartadas, errores, entradas y max_entradas
+        """
+        entradas = self.entradas()
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "archivo": self.archivo or None,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "escrituras": self.escrituras,
+                "descartadas": self.descartadas,
+                "errores": self.errores,
+                "entradas": entradas,
+                "max_entradas": self.max_entradas,
+            }
+
+
+CACHE_PERSISTENTE = CachePersistente()
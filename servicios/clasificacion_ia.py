@@ -2,69 +2,120 @@
 Servicio para clasificación automática de llamadas usando IA.
 """
 
-from openai import OpenAI
+import asyncio
 import json
 import os
-from typing import Dict
-
-# Configuración del cliente OpenAI (LM Studio)
-CLIENT = OpenAI(
-    base_url=os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:1234/v1"),
-    api_key=os.getenv("OPENAI_API_KEY", "lmstudio")
+import random
+import re
+from typing import Any, Dict, List, Tuple
+from servicios.cache import CacheLRU
+from servicios.cache_persistente import CACHE_PERSISTENTE, CachePersistente
+from servicios.coalescencia import VueloUnico
+from servicios.metricas_llm import METRICAS_LLM, RegistroLLM
+from servicios.llm import (
+    MODELOS_POOL,
+    completar_chat,
+    completar_chat_async,
+    completar_chat_stream,
+    completar_chat_stream_async,
+    estadisticas_llm,
+)
+from servicios.reglas_clasificacion import (
+    CONFIANZA_REGLAS,
+    ESTADISTICAS_REGLAS,
+    MUESTREO_VERIFICACION,
+    PALABRAS_CLAVE,
+    clasificar_por_reglas,
+    normalizar_texto,
 )
+from servicios.prompts import PLANTILLA_CLASIFICACION, PLANTILLA_LOTE
+from servicios.clasificador_vecinos import INDICE_VECINOS, aprender_texto
 
-MODELO = os.getenv("OPENAI_MODEL", "openai/gpt-oss-20b")
+CATEGORIAS = ["venta", "soporte", "reclamo"]
 
-# Prompt del sistema para clasificación
-PROMPT_SISTEMA = """Eres un clasificador de llamadas. Tu única tarea es responder con un objeto JSON válido.
+# Salida restringida con response_format (JSON schema con las CATEGORIAS).
+# "0" para servidores que no soportan json_schema.
+RESPUESTA_JSON_SCHEMA = os.getenv("LLM_RESPUESTA_JSON_SCHEMA", "1") == "1"
 
-FORMATO OBLIGATORIO (responde SOLO esto, sin texto adicional):
-{
-  "clasificacion": "venta"
-}
+# Tokens máximos de la respuesta: {"clasificacion": "soporte"} ocupa unos 10
+MAX_TOKENS_CLASIFICACION = int(os.getenv("LLM_MAX_TOKENS_CLASIFICACION", "32"))
 
-O:
-{
-  "clasificacion": "soporte"
-}
+# Motor de clasificar_texto_llamada para los textos que no resuelven las reglas:
+#   "llm": siempre el LLM
+#   "vecinos": primero el índice de vecinos más cercanos (servicios/clasificador_vecinos.py);
+#              si no está seguro, el LLM, y su respuesta se agrega al índice
+MOTOR_TEXTO = os.getenv("CLASIFICACION_TEXTO_MOTOR", "llm")
+if MOTOR_TEXTO == "vecinos":
+    INDICE_VECINOS.cargar()
 
-O:
-{
-  "clasificacion": "reclamo"
-}
+# Leer las clasificaciones en streaming y cortar en cuanto llega la categoría
+STREAMING_CLASIFICACION = os.getenv("LLM_STREAMING_CLASIFICACION", "0") == "1"
 
-Categorías:
-- "venta": ofertas, descuentos, cerrar ventas, promociones, enlaces de pago, planes premium
-- "soporte": problemas técnicos, guías, verificación de servicios, reiniciar equipos, capturas de pantalla
-- "reclamo": quejas, escalación a supervisor, registro de PQR, tono alterado, problemas formales
+# Tokens por llamada en un prompt de lote ({"id": 12, "clasificacion": "soporte"})
+MAX_TOKENS_POR_LLAMADA_LOTE = 16
 
-NO agregues explicaciones. NO uses markdown. Solo el JSON puro."""
+ESQUEMA_CLASIFICACION = {
+    "type": "object",
+    "properties": {
+        "clasificacion": {"type": "string", "enum": CATEGORIAS},
+    },
+    "required": ["clasificacion"],
+    "additionalProperties": False,
+}
 
-PROMPT_CLASIFICACION = """Eres un sistema experto en clasificación de llamadas de call center.
+# Los esquemas estrictos exigen un objeto en la raíz: el arreglo va en "clasificaciones"
+ESQUEMA_CLASIFICACION_LOTE = {
+    "type": "object",
+    "properties": {
+        "clasificaciones": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "clasificacion": {"type": "string", "enum": CATEGORIAS},
+                },
+                "required": ["id", "clasificacion"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["clasificaciones"],
+    "additionalProperties": False,
+}
 
-Tu tarea es clasificar cada llamada en una de estas tres categorías:
-- "venta": Cuando la llamada involucra ofrecer productos, cerrar ventas, promociones, descuentos, ofertas comerciales
-- "soporte": Cuando la llamada involucra resolver problemas técnicos, guiar al cliente, verificar servicios, solicitar información técnica
-- "reclamo": Cuando la llamada involucra quejas, escalación a supervisor, registro de PQR, problemas que requieren seguimiento formal
+# Llamadas que se envían juntas en un mismo prompt en clasificar_llamadas_lote_async
+LLAMADAS_POR_PROMPT = int(os.getenv("LLM_LLAMADAS_POR_PROMPT", "20"))
 
-IMPORTANTE: Debes responder ÚNICAMENTE con un objeto JSON válido en este formato exacto:
-{
-  "clasificacion": "venta"
-}
+# Versión de los prompts (LLM_VERSION_PROMPT, ver servicios/prompts.py).
+# Forma parte de la clave de caché: cambiarla descarta lo ya memorizado.
+VERSION_PROMPT = PLANTILLA_CLASIFICACION.version
 
-O:
-{
-  "clasificacion": "soporte"
-}
+# Versión del prompt de varias llamadas (LLM_VERSION_PROMPT_LOTE). Los
+# resultados de clasificar_llamadas_lote_async se memorizan con ella.
+VERSION_PROMPT_LOTE = PLANTILLA_LOTE.version
 
-O:
-{
-  "clasificacion": "reclamo"
-}
+# Resultados de clasificar_llamada_con_ia por (modelos del pool, versión de
+# prompt, tipo, resultado, duración). Los fallbacks por error no se guardan.
+CACHE_CLASIFICACION = CacheLRU(
+    max_entradas=int(os.getenv("CLASIFICACION_CACHE_MAX", "4096")),
+    ttl_segundos=float(os.getenv("CLASIFICACION_CACHE_TTL_SEGUNDOS", "3600")),
+)
 
-NO agregues texto adicional, explicaciones, ni nada más. Solo el JSON.
+# Resultados de clasificar_texto_llamada respondidos por el LLM, por texto
+# normalizado (clave de _clave_texto), delante de CACHE_PERSISTENTE
+CACHE_TEXTOS = CacheLRU(
+    max_entradas=int(os.getenv("CLASIFICACION_CACHE_TEXTOS_MAX", "4096")),
+    ttl_segundos=float(os.getenv("CLASIFICACION_CACHE_TTL_SEGUNDOS", "3600")),
+)
 
-Clasifica la siguiente llamada:"""
+# CACHE_PERSISTENTE (servicios/cache_persistente.py) guarda además en SQLite
+# las clasificaciones de llamadas y de textos respondidas por el LLM, para
+# no volver a consultarlas después de reiniciar
+
+# Peticiones idénticas en curso (misma llamada o mismo texto normalizado)
+# comparten una sola consulta al LLM
+VUELOS_CLASIFICACION = VueloUnico()
 
 
 def clasificar_llamada_con_ia(
@@ -89,91 +140,179 @@ def clasificar_llamada_con_ia(
             "confianza": 0.0-1.0,
             "recomendacion_agente": "texto opcional"
         }
+        
+    Las combinaciones ya clasificadas se responden desde CACHE_CLASIFICACION
+    o, tras un reinicio, desde CACHE_PERSISTENTE sin consultar al LLM, y las
+    que ya se están consultando esperan esa misma consulta
+    (VUELOS_CLASIFICACION).
     """
-    # Construir descripción de la llamada para el LLM
-    descripcion = f"Tipo de llamada: {tipo_llamada}. Resultado: {resultado_llamada}"
-    if duracion_segundos > 0:
-        descripcion += f". Duración: {duracion_segundos} segundos"
+    clave = _clave_llamada(tipo_llamada, resultado_llamada, duracion_segundos)
+    en_cache = CACHE_CLASIFICACION.obtener(clave)
+    if en_cache is not None:
+        return dict(en_cache)
+    clave_persistente = _clave_persistente_llamada(clave)
+    en_cache = CACHE_PERSISTENTE.obtener(clave_persistente)
+    if en_cache is not None:
+        CACHE_CLASIFICACION.guardar(clave, en_cache)
+        return dict(en_cache)
     
-    mensaje_completo = f"{PROMPT_CLASIFICACION}\n\n{descripcion}"
+    def consultar() -> Dict[str, any]:
+        categoria = _clasificar_descripcion(_describir_llamada(*clave[2:]), "llamada")
+        resultado = _resultado_llamada(categoria, tipo_llamada, resultado_llamada)
+        CACHE_CLASIFICACION.guardar(clave, resultado)
+        CACHE_PERSISTENTE.guardar(clave_persistente, resultado)
+        return resultado
     
     try:
-        response = CLIENT.chat.completions.create(
-            model=MODELO,
-            messages=[
-                {
-                    "role": "system",
-                    "content": PROMPT_SISTEMA
-                },
-                {
-                    "role": "user",
-                    "content": mensaje_completo
-                }
-            ],
-            temperature=0.1  # Baja temperatura para respuestas más consistentes
-        )
-        
-        respuesta = response.choices[0].message.content.strip()
-        
-        # Limpiar y parsear el JSON
-        if "```json" in respuesta:
-            respuesta = respuesta.split("```json")[1].split("```")[0].strip()
-        elif "```" in respuesta:
-            respuesta = respuesta.split("```")[1].split("```")[0].strip()
-        
-        resultado = json.loads(respuesta)
-        
-        # Validar estructura
-        if "clasificacion" not in resultado:
-            raise ValueError("El JSON no contiene 'clasificacion'")
-        
-        # Validar y normalizar categoría
-        categoria = resultado["clasificacion"].lower()
-        if categoria not in ["venta", "soporte", "reclamo"]:
-            raise ValueError(f"Categoría inválida: {categoria}")
-        
-        # Calcular confianza basada en qué tan bien coincide con el tipo original
-        confianza = 0.85  # Confianza base
-        if categoria == tipo_llamada.lower():
-            confianza = 0.95  # Alta confianza si coincide
-        elif resultado_llamada.lower() == "escalada":
-            if categoria == "reclamo":
-                confianza = 0.90
-        elif resultado_llamada.lower() == "resuelta":
-            if categoria == "soporte":
-                confianza = 0.90
-        
-        # Generar recomendación basada en la clasificación
-        recomendacion = generar_recomendacion(categoria, resultado_llamada)
-        
-        return {
-            "categoria": categoria,
-            "confianza": round(confianza, 2),
-            "recomendacion_agente": recomendacion
-        }
+        resultado = VUELOS_CLASIFICACION.ejecutar(clave, consultar)
+    except Exception as e:
+        return _fallback_llamada(tipo_llamada, e)
+    return dict(resultado)
+
+
+async def clasificar_llamada_con_ia_async(
+    tipo_llamada: str,
+    resultado_llamada: str,
+    numero_cliente: str = "",
+    duracion_segundos: int = 0,
+    con_fallback: bool = True
+) -> Dict[str, any]:
+    """
+    Versión asíncrona de clasificar_llamada_con_ia (AsyncOpenAI, sin hilos).
+    
+    Con con_fallback=False los errores del LLM se propagan en lugar de
+    retornar el fallback, para que quien llama pueda reintentar.
+    """
+    clave = _clave_llamada(tipo_llamada, resultado_llamada, duracion_segundos)
+    en_cache = CACHE_CLASIFICACION.obtener(clave)
+    if en_cache is not None:
+        return dict(en_cache)
+    clave_persistente = _clave_persistente_llamada(clave)
+    en_cache = await CACHE_PERSISTENTE.obtener_async(clave_persistente)
+    if en_cache is not None:
+        CACHE_CLASIFICACION.guardar(clave, en_cache)
+        return dict(en_cache)
+    
+    async def consultar() -> Dict[str, any]:
+        categoria = await _clasificar_descripcion_async(_describir_llamada(*clave[2:]), "llamada")
+        resultado = _resultado_llamada(categoria, tipo_llamada, resultado_llamada)
+        CACHE_CLASIFICACION.guardar(clave, resultado)
+        await CACHE_PERSISTENTE.guardar_async(clave_persistente, resultado)
+        return resultado
+    
+    try:
+        resultado = await VUELOS_CLASIFICACION.ejecutar_async(clave, consultar)
+    except Exception as e:
+        if not con_fallback:
+            raise
+        return _fallback_llamada(tipo_llamada, e)
+    return dict(resultado)
+
+
+async def clasificar_llamadas_lote_async(llamadas: List[Dict[str, Any]]) -> List[Dict[str, any]]:
+    """
+    Clasifica varias llamadas enviando sus descripciones juntas al LLM.
+    
+    Las instrucciones del prompt se envían una vez por cada bloque de
+    LLAMADAS_POR_PROMPT llamadas en lugar de una vez por llamada. Las
+    combinaciones repetidas o ya memorizadas en CACHE_CLASIFICACION o
+    CACHE_PERSISTENTE (con la versión VERSION_PROMPT_LOTE) no se envían.
+    Los bloques se procesan en paralelo (limitados por LIMITADOR_LLM).
+    
+    Si el LLM omite o devuelve inválida alguna fila del arreglo, esa llamada
+    se clasifica por separado con clasificar_llamada_con_ia_async. Si la
+    petición del bloque falla por completo, sus llamadas reciben el fallback.
+    
+    Args:
+        llamadas: Diccionarios con tipo_llamada, resultado_llamada y
+            duracion_segundos (opcional)
         
-    except json.JSONDecodeError as e:
-        # Si falla el parsing, usar el tipo de llamada como fallback
-        categoria_fallback = tipo_llamada.lower() if tipo_llamada.lower() in ["venta", "soporte", "reclamo"] else "soporte"
-        return {
-            "categoria": categoria_fallback,
-            "confianza": 0.70,
-            "recomendacion_agente": f"Clasificación automática falló. Usando tipo de llamada: {categoria_fallback}"
-        }
+    Returns:
+        Un resultado por llamada, en el mismo orden, con el formato de
+        clasificar_llamada_con_ia
+    """
+    claves = [
+        _clave_llamada(
+            llamada["tipo_llamada"],
+            llamada["resultado_llamada"],
+            llamada.get("duracion_segundos", 0),
+            version=VERSION_PROMPT_LOTE
+        )
+        for llamada in llamadas
+    ]
+    
+    resultados: Dict[Tuple, Dict[str, any]] = {}
+    pendientes = []
+    for clave in dict.fromkeys(claves):
+        en_cache = CACHE_CLASIFICACION.obtener(clave)
+        if en_cache is None:
+            en_cache = await CACHE_PERSISTENTE.obtener_async(_clave_persistente_llamada(clave))
+            if en_cache is not None:
+                CACHE_CLASIFICACION.guardar(clave, en_cache)
+        if en_cache is not None:
+            resultados[clave] = en_cache
+        else:
+            pendientes.append(clave)
+    
+    bloques = [
+        pendientes[inicio:inicio + LLAMADAS_POR_PROMPT]
+        for inicio in range(0, len(pendientes), LLAMADAS_POR_PROMPT)
+    ]
+    for resultados_bloque in await asyncio.gather(*(_clasificar_bloque_async(bloque) for bloque in bloques)):
+        resultados.update(resultados_bloque)
+    
+    return [dict(resultados[clave]) for clave in claves]
+
+
+async def _clasificar_bloque_async(claves: List[Tuple]) -> Dict[Tuple, Dict[str, any]]:
+    """Clasifica un bloque de llamadas (claves de _clave_llamada) con un solo prompt."""
+    descripciones = [_describir_llamada(*clave[2:]) for clave in claves]
+    registro = RegistroLLM("lote")
+    try:
+        respuesta = await completar_chat_async(
+            _mensajes_lote(descripciones), registro, **_opciones_lote(len(claves))
+        )
     except Exception as e:
-        # Error general, usar fallback
-        categoria_fallback = tipo_llamada.lower() if tipo_llamada.lower() in ["venta", "soporte", "reclamo"] else "soporte"
-        return {
-            "categoria": categoria_fallback,
-            "confianza": 0.60,
-            "recomendacion_agente": f"Error en clasificación IA: {str(e)}"
-        }
+        METRICAS_LLM.registrar(registro, "fallback")
+        return {clave: _fallback_llamada(clave[2], e) for clave in claves}
+    try:
+        categorias = _parsear_clasificaciones_lote(respuesta, len(claves))
+    except Exception as e:
+        METRICAS_LLM.registrar(registro, "json_error")
+        return {clave: _fallback_llamada(clave[2], e) for clave in claves}
+    METRICAS_LLM.registrar(registro, "ok")
+    
+    resultados = {}
+    individuales = []
+    for numero, clave in enumerate(claves, 1):
+        if numero in categorias:
+            resultado = _resultado_llamada(categorias[numero], clave[2], clave[3])
+            CACHE_CLASIFICACION.guardar(clave, resultado)
+            await CACHE_PERSISTENTE.guardar_async(_clave_persistente_llamada(clave), resultado)
+            resultados[clave] = resultado
+        else:
+            individuales.append(clave)
+    
+    # Filas ausentes o inválidas en el arreglo: una petición por llamada
+    respuestas_individuales = await asyncio.gather(*(
+        clasificar_llamada_con_ia_async(clave[2], clave[3], duracion_segundos=clave[4])
+        for clave in individuales
+    ))
+    resultados.update(zip(individuales, respuestas_individuales))
+    return resultados
 
 
 def clasificar_texto_llamada(descripcion_textual: str) -> Dict[str, any]:
     """
     Clasifica una llamada basándose únicamente en su descripción textual.
     
+    Si las palabras clave de una categoría dominan el texto (ver
+    servicios/reglas_clasificacion.py) se responde sin consultar al LLM.
+    Los textos que el LLM ya clasificó se responden desde CACHE_TEXTOS o,
+    tras un reinicio, desde CACHE_PERSISTENTE, y los iguales (una vez
+    normalizados) que llegan mientras otro se está consultando esperan esa
+    misma consulta (VUELOS_CLASIFICACION).
+    
     Args:
         descripcion_textual: Descripción textual de la llamada a clasificar
         
@@ -185,85 +324,447 @@ def clasificar_texto_llamada(descripcion_textual: str) -> Dict[str, any]:
             "recomendacion_agente": "texto opcional"
         }
     """
-    mensaje_completo = f"{PROMPT_CLASIFICACION}\n\n{descripcion_textual}"
+    candidata, decisiva = clasificar_por_reglas(descripcion_textual)
+    if decisiva:
+        if _verificar_reglas():
+            try:
+                categoria_llm = _clasificar_descripcion(descripcion_textual, "verificacion")
+            except Exception:
+                categoria_llm = None
+            ESTADISTICAS_REGLAS.registrar_verificacion(candidata, categoria_llm)
+        else:
+            ESTADISTICAS_REGLAS.registrar_reglas()
+        return _resultado_reglas(candidata)
+    
+    clave = _clave_texto(descripcion_textual)
+    en_cache = CACHE_TEXTOS.obtener(clave)
+    if en_cache is None:
+        en_cache = CACHE_PERSISTENTE.obtener(_clave_persistente_texto(clave))
+        if en_cache is not None:
+            CACHE_TEXTOS.guardar(clave, en_cache)
+    if en_cache is not None:
+        ESTADISTICAS_REGLAS.registrar_cache()
+        return dict(en_cache)
+    
+    if MOTOR_TEXTO == "vecinos":
+        vecino = INDICE_VECINOS.clasificar(descripcion_textual)
+        if vecino is not None:
+            return _resultado_vecinos(vecino)
     
     try:
-        response = CLIENT.chat.completions.create(
-            model=MODELO,
-            messages=[
-                {
-                    "role": "system",
-                    "content": PROMPT_SISTEMA
-                },
-                {
-                    "role": "user",
-                    "content": mensaje_completo
-                }
-            ],
-            temperature=0.1  # Baja temperatura para respuestas más consistentes
+        resultado = VUELOS_CLASIFICACION.ejecutar(clave, lambda: _clasificar_texto_llm(descripcion_textual, clave))
+    except Exception as e:
+        ESTADISTICAS_REGLAS.registrar_llm(candidata, None)
+        return _fallback_texto(e)
+    ESTADISTICAS_REGLAS.registrar_llm(candidata, resultado["categoria"])
+    return dict(resultado)
+
+
+async def clasificar_texto_llamada_async(descripcion_textual: str) -> Dict[str, any]:
+    """
+    Versión asíncrona de clasificar_texto_llamada (AsyncOpenAI, sin hilos).
+    """
+    candidata, decisiva = clasificar_por_reglas(descripcion_textual)
+    if decisiva:
+        if _verificar_reglas():
+            try:
+                categoria_llm = await _clasificar_descripcion_async(descripcion_textual, "verificacion")
+            except Exception:
+                categoria_llm = None
+            ESTADISTICAS_REGLAS.registrar_verificacion(candidata, categoria_llm)
+        else:
+            ESTADISTICAS_REGLAS.registrar_reglas()
+        return _resultado_reglas(candidata)
+    
+    clave = _clave_texto(descripcion_textual)
+    en_cache = CACHE_TEXTOS.obtener(clave)
+    if en_cache is None:
+        en_cache = await CACHE_PERSISTENTE.obtener_async(_clave_persistente_texto(clave))
+        if en_cache is not None:
+            CACHE_TEXTOS.guardar(clave, en_cache)
+    if en_cache is not None:
+        ESTADISTICAS_REGLAS.registrar_cache()
+        return dict(en_cache)
+    
+    if MOTOR_TEXTO == "vecinos":
+        vecino = INDICE_VECINOS.clasificar(descripcion_textual)
+        if vecino is not None:
+            return _resultado_vecinos(vecino)
+    
+    try:
+        resultado = await VUELOS_CLASIFICACION.ejecutar_async(
+            clave, lambda: _clasificar_texto_llm_async(descripcion_textual, clave)
         )
-        
-        respuesta = response.choices[0].message.content.strip()
-        
-        # Limpiar y parsear el JSON
-        if "```json" in respuesta:
-            respuesta = respuesta.split("```json")[1].split("```")[0].strip()
-        elif "```" in respuesta:
-            respuesta = respuesta.split("```")[1].split("```")[0].strip()
-        
-        resultado = json.loads(respuesta)
-        
-        # Validar estructura
-        if "clasificacion" not in resultado:
-            raise ValueError("El JSON no contiene 'clasificacion'")
-        
-        # Validar y normalizar categoría
-        categoria = resultado["clasificacion"].lower()
-        if categoria not in ["venta", "soporte", "reclamo"]:
-            raise ValueError(f"Categoría inválida: {categoria}")
-        
-        # Calcular confianza (base alta para clasificación por texto)
-        confianza = 0.80
-        
-        # Ajustar confianza según palabras clave en la descripción
-        descripcion_lower = descripcion_textual.lower()
-        
-        if categoria == "venta":
-            palabras_venta = ["oferta", "descuento", "plan", "premium", "venta", "promoción", "pago", "comprar"]
-            if any(palabra in descripcion_lower for palabra in palabras_venta):
-                confianza = 0.90
-        elif categoria == "soporte":
-            palabras_soporte = ["reiniciar", "módem", "error", "problema", "técnico", "verificar", "cobertura", "solicitar"]
-            if any(palabra in descripcion_lower for palabra in palabras_soporte):
-                confianza = 0.90
-        elif categoria == "reclamo":
-            palabras_reclamo = ["escalar", "supervisor", "pqr", "queja", "reclamo", "tono alterado", "radicado"]
-            if any(palabra in descripcion_lower for palabra in palabras_reclamo):
-                confianza = 0.90
-        
-        # Generar recomendación genérica basada en la categoría
-        recomendacion = generar_recomendacion_generica(categoria)
-        
-        return {
-            "categoria": categoria,
-            "confianza": round(confianza, 2),
-            "recomendacion_agente": recomendacion
+    except Exception as e:
+        ESTADISTICAS_REGLAS.registrar_llm(candidata, None)
+        return _fallback_texto(e)
+    ESTADISTICAS_REGLAS.registrar_llm(candidata, resultado["categoria"])
+    return dict(resultado)
+
+
+def _clasificar_texto_llm(descripcion_textual: str, clave: Tuple) -> Dict[str, any]:
+    """
+    Clasifica un texto con el LLM y guarda el resultado en CACHE_TEXTOS y
+    CACHE_PERSISTENTE; con el motor de vecinos agrega además la categoría al
+    índice.
+    """
+    categoria = _clasificar_descripcion(descripcion_textual, "texto")
+    if MOTOR_TEXTO == "vecinos":
+        aprender_texto(descripcion_textual, categoria)
+    resultado = _resultado_texto(categoria, descripcion_textual)
+    CACHE_TEXTOS.guardar(clave, resultado)
+    CACHE_PERSISTENTE.guardar(_clave_persistente_texto(clave), resultado)
+    return resultado
+
+
+async def _clasificar_texto_llm_async(descripcion_textual: str, clave: Tuple) -> Dict[str, any]:
+    """Versión asíncrona de _clasificar_texto_llm."""
+    categoria = await _clasificar_descripcion_async(descripcion_textual, "texto")
+    if MOTOR_TEXTO == "vecinos":
+        aprender_texto(descripcion_textual, categoria)
+    resultado = _resultado_texto(categoria, descripcion_textual)
+    CACHE_TEXTOS.guardar(clave, resultado)
+    await CACHE_PERSISTENTE.guardar_async(_clave_persistente_texto(clave), resultado)
+    return resultado
+
+
+def _clave_llamada(
+    tipo_llamada: str,
+    resultado_llamada: str,
+    duracion_segundos: int,
+    version: str = VERSION_PROMPT
+) -> Tuple:
+    """
+    Clave de caché de una llamada: modelos del pool (MODELOS_POOL), versión
+    de prompt (VERSION_PROMPT, o VERSION_PROMPT_LOTE para las respuestas del
+    prompt de varias llamadas) y las entradas normalizadas que se envían al
+    LLM (numero_cliente no influye).
+    """
+    return (
+        MODELOS_POOL,
+        version,
+        tipo_llamada.strip().lower(),
+        resultado_llamada.strip().lower(),
+        max(int(duracion_segundos or 0), 0),
+    )
+
+
+def _clave_texto(descripcion_textual: str) -> Tuple:
+    """
+    Clave de un texto para agrupar consultas: modelos del pool, versión de
+    prompt y el texto sin mayúsculas, tildes ni espacios repetidos.
+    """
+    return ("texto", MODELOS_POOL, VERSION_PROMPT, " ".join(normalizar_texto(descripcion_textual).split()))
+
+
+def _clave_persistente_llamada(clave: Tuple) -> str:
+    """Clave en CACHE_PERSISTENTE de una llamada (clave de _clave_llamada)."""
+    return CachePersistente.clave("llamada", clave[0], clave[1], _describir_llamada(*clave[2:]))
+
+
+def _clave_persistente_texto(clave: Tuple) -> str:
+    """Clave en CACHE_PERSISTENTE de un texto (clave de _clave_texto)."""
+    return CachePersistente.clave(*clave)
+
+
+def estadisticas_clasificacion() -> Dict[str, Any]:
+    """
+    Métricas del servicio de clasificación de este proceso.
+    
+    Returns:
+        Métricas del acceso al LLM (ver estadisticas_llm), las de
+        CACHE_CLASIFICACION en "cache_llamadas", las de CACHE_TEXTOS en
+        "cache_textos", las de CACHE_PERSISTENTE en "cache_persistente",
+        las de la clasificación de textos por reglas en "reglas_texto", las
+        del índice de vecinos en "vecinos_texto", las consultas agrupadas en
+        "coalescencia" y los tokens, tiempos y resultados por petición en
+        "peticiones_llm" (ver servicios/metricas_llm.py)
+    """
+    return {
+        **estadisticas_llm(),
+        "cache_llamadas": CACHE_CLASIFICACION.estadisticas(),
+        "cache_textos": CACHE_TEXTOS.estadisticas(),
+        "cache_persistente": CACHE_PERSISTENTE.estadisticas(),
+        "reglas_texto": ESTADISTICAS_REGLAS.estadisticas(),
+        "vecinos_texto": {"motor": MOTOR_TEXTO, **INDICE_VECINOS.estadisticas()},
+        "coalescencia": VUELOS_CLASIFICACION.estadisticas(),
+        "peticiones_llm": METRICAS_LLM.estadisticas(),
+    }
+
+
+def _describir_llamada(tipo_llamada: str, resultado_llamada: str, duracion_segundos: int) -> str:
+    """Descripción de la llamada que se envía al LLM."""
+    descripcion = f"Tipo de llamada: {tipo_llamada}. Resultado: {resultado_llamada}"
+    if duracion_segundos > 0:
+        descripcion += f". Duración: {duracion_segundos} segundos"
+    return descripcion
+
+
+def _mensajes_clasificacion(descripcion: str) -> List[Dict[str, str]]:
+    """Mensajes de chat para clasificar una descripción (plantilla VERSION_PROMPT)."""
+    return PLANTILLA_CLASIFICACION.mensajes(descripcion)
+
+
+def _mensajes_lote(descripciones: List[str]) -> List[Dict[str, str]]:
+    """
+    Mensajes de chat para clasificar varias descripciones numeradas desde 1
+    (plantilla VERSION_PROMPT_LOTE).
+    """
+    lista = "\n".join(f"{numero}. {descripcion}" for numero, descripcion in enumerate(descripciones, 1))
+    return PLANTILLA_LOTE.mensajes(lista)
+
+
+def _clasificar_descripcion(descripcion: str, operacion: str) -> str:
+    """
+    Categoría de una descripción según el LLM, registrando la petición en
+    METRICAS_LLM (ok, json_error si la respuesta no se pudo interpretar,
+    fallback si no hubo respuesta).
+    
+    Raises:
+        Exception: El error de la petición o de _parsear_clasificacion
+    """
+    registro = RegistroLLM(operacion)
+    try:
+        respuesta = _consultar_clasificacion(descripcion, registro)
+    except Exception:
+        METRICAS_LLM.registrar(registro, "fallback")
+        raise
+    return _interpretar_clasificacion(respuesta, registro)
+
+
+async def _clasificar_descripcion_async(descripcion: str, operacion: str) -> str:
+    """Versión asíncrona de _clasificar_descripcion."""
+    registro = RegistroLLM(operacion)
+    try:
+        respuesta = await _consultar_clasificacion_async(descripcion, registro)
+    except Exception:
+        METRICAS_LLM.registrar(registro, "fallback")
+        raise
+    return _interpretar_clasificacion(respuesta, registro)
+
+
+def _interpretar_clasificacion(respuesta: str, registro: RegistroLLM) -> str:
+    """_parsear_clasificacion que registra la petición como ok o json_error."""
+    try:
+        categoria = _parsear_clasificacion(respuesta)
+    except Exception:
+        METRICAS_LLM.registrar(registro, "json_error")
+        raise
+    METRICAS_LLM.registrar(registro, "ok")
+    return categoria
+
+
+def _consultar_clasificacion(descripcion: str, registro: RegistroLLM) -> str:
+    """Pide al LLM la clasificación de una descripción (en streaming si está activo)."""
+    if STREAMING_CLASIFICACION:
+        return completar_chat_stream(
+            _mensajes_clasificacion(descripcion),
+            _clasificacion_leida,
+            registro,
+            **_opciones_clasificacion()
+        )
+    return completar_chat(_mensajes_clasificacion(descripcion), registro, **_opciones_clasificacion())
+
+
+async def _consultar_clasificacion_async(descripcion: str, registro: RegistroLLM) -> str:
+    """Versión asíncrona de _consultar_clasificacion."""
+    if STREAMING_CLASIFICACION:
+        return await completar_chat_stream_async(
+            _mensajes_clasificacion(descripcion),
+            _clasificacion_leida,
+            registro,
+            **_opciones_clasificacion()
+        )
+    return await completar_chat_async(_mensajes_clasificacion(descripcion), registro, **_opciones_clasificacion())
+
+
+def _clasificacion_leida(texto: str) -> bool:
+    """Indica si el texto recibido ya trae una categoría válida completa."""
+    coincidencia = _PATRON_CLASIFICACION.search(texto)
+    return coincidencia is not None and coincidencia.group(1).strip().lower() in CATEGORIAS
+
+
+def _opciones_clasificacion() -> Dict[str, Any]:
+    """Parámetros de chat.completions.create para clasificar una descripción."""
+    opciones = {"max_tokens": MAX_TOKENS_CLASIFICACION}
+    if RESPUESTA_JSON_SCHEMA:
+        opciones["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "clasificacion", "strict": True, "schema": ESQUEMA_CLASIFICACION},
         }
+    return opciones
+
+
+def _opciones_lote(cantidad: int) -> Dict[str, Any]:
+    """Parámetros de chat.completions.create para clasificar `cantidad` descripciones."""
+    opciones = {"max_tokens": MAX_TOKENS_POR_LLAMADA_LOTE * cantidad + MAX_TOKENS_CLASIFICACION}
+    if RESPUESTA_JSON_SCHEMA:
+        opciones["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "clasificaciones", "strict": True, "schema": ESQUEMA_CLASIFICACION_LOTE},
+        }
+    return opciones
+
+
+def _limpiar_markdown(respuesta: str) -> str:
+    """Quita el bloque de código markdown que algunos modelos agregan al JSON."""
+    if "```json" in respuesta:
+        return respuesta.split("```json")[1].split("```")[0].strip()
+    if "```" in respuesta:
+        return respuesta.split("```")[1].split("```")[0].strip()
+    return respuesta
+
+
+def _parsear_clasificaciones_lote(respuesta: str, cantidad: int) -> Dict[int, str]:
+    """
+    Extrae las categorías de la respuesta a un prompt de lote.
+    
+    Returns:
+        {número de llamada: categoría} solo para las filas válidas
         
-    except json.JSONDecodeError as e:
-        # Si falla el parsing, usar fallback
+    Raises:
+        json.JSONDecodeError: Si la respuesta no contiene JSON válido
+        ValueError: Si el JSON no es un arreglo
+    """
+    datos = json.loads(_limpiar_markdown(respuesta))
+    # Algunos modelos envuelven el arreglo en un objeto
+    if isinstance(datos, dict):
+        datos = next((valor for valor in datos.values() if isinstance(valor, list)), None)
+    if not isinstance(datos, list):
+        raise ValueError("La respuesta no es un arreglo JSON")
+    
+    categorias = {}
+    for posicion, fila in enumerate(datos, 1):
+        if not isinstance(fila, dict):
+            continue
+        numero = fila.get("id", posicion)
+        categoria = fila.get("clasificacion")
+        if (
+            isinstance(numero, int) and 1 <= numero <= cantidad
+            and isinstance(categoria, str) and categoria.lower() in CATEGORIAS
+        ):
+            categorias[numero] = categoria.lower()
+    return categorias
+
+
+# "clasificacion": "<valor>" en cualquier parte de la respuesta
+_PATRON_CLASIFICACION = re.compile(r'"clasificacion"\s*:\s*"([^"]*)"')
+
+
+def _parsear_clasificacion(respuesta: str) -> str:
+    """
+    Extrae la categoría de la respuesta del LLM.
+    
+    Una sola búsqueda con expresión regular, sin decodificar el JSON: sirve
+    igual para la salida restringida por esquema, para JSON dentro de un
+    bloque markdown y para respuestas con texto adicional.
+    
+    Raises:
+        json.JSONDecodeError: Si la respuesta no contiene "clasificacion"
+        ValueError: Si la categoría no es válida
+    """
+    coincidencia = _PATRON_CLASIFICACION.search(respuesta)
+    if coincidencia is None:
+        raise json.JSONDecodeError("La respuesta no contiene 'clasificacion'", respuesta, 0)
+    
+    # Validar y normalizar categoría
+    categoria = coincidencia.group(1).strip().lower()
+    if categoria not in CATEGORIAS:
+        raise ValueError(f"Categoría inválida: {categoria}")
+    return categoria
+
+
+def _resultado_llamada(categoria: str, tipo_llamada: str, resultado_llamada: str) -> Dict[str, any]:
+    """Arma el resultado de clasificar_llamada_con_ia a partir de la categoría."""
+    # Calcular confianza basada en qué tan bien coincide con el tipo original
+    confianza = 0.85  # Confianza base
+    if categoria == tipo_llamada.lower():
+        confianza = 0.95  # Alta confianza si coincide
+    elif resultado_llamada.lower() == "escalada":
+        if categoria == "reclamo":
+            confianza = 0.90
+    elif resultado_llamada.lower() == "resuelta":
+        if categoria == "soporte":
+            confianza = 0.90
+    
+    return {
+        "categoria": categoria,
+        "confianza": round(confianza, 2),
+        "recomendacion_agente": generar_recomendacion(categoria, resultado_llamada)
+    }
+
+
+def _fallback_llamada(tipo_llamada: str, error: Exception) -> Dict[str, any]:
+    """Resultado cuando el LLM falla: se usa el tipo de la llamada."""
+    categoria_fallback = tipo_llamada.lower() if tipo_llamada.lower() in CATEGORIAS else "soporte"
+    if isinstance(error, json.JSONDecodeError):
         return {
-            "categoria": "soporte",
+            "categoria": categoria_fallback,
             "confianza": 0.70,
-            "recomendacion_agente": "Error al parsear respuesta de IA. Clasificación por defecto: soporte"
+            "recomendacion_agente": f"Clasificación automática falló. Usando tipo de llamada: {categoria_fallback}"
         }
-    except Exception as e:
-        # Error general, usar fallback
+    return {
+        "categoria": categoria_fallback,
+        "confianza": 0.60,
+        "recomendacion_agente": f"Error en clasificación IA: {str(error)}"
+    }
+
+
+def _resultado_texto(categoria: str, descripcion_textual: str) -> Dict[str, any]:
+    """Arma el resultado de clasificar_texto_llamada a partir de la categoría."""
+    # Calcular confianza (base alta para clasificación por texto)
+    confianza = 0.80
+    
+    # Ajustar confianza según palabras clave en la descripción
+    descripcion_lower = descripcion_textual.lower()
+    
+    if any(palabra in descripcion_lower for palabra in PALABRAS_CLAVE.get(categoria, [])):
+        confianza = 0.90
+    
+    return {
+        "categoria": categoria,
+        "confianza": round(confianza, 2),
+        "recomendacion_agente": generar_recomendacion_generica(categoria)
+    }
+
+
+def _resultado_reglas(categoria: str) -> Dict[str, any]:
+    """Resultado de clasificar_texto_llamada cuando responden las reglas."""
+    return {
+        "categoria": categoria,
+        "confianza": CONFIANZA_REGLAS,
+        "recomendacion_agente": generar_recomendacion_generica(categoria)
+    }
+
+
+def _resultado_vecinos(vecino: Dict[str, Any]) -> Dict[str, any]:
+    """Resultado de clasificar_texto_llamada cuando responde el índice de vecinos."""
+    return {
+        "categoria": vecino["categoria"],
+        # El voto de los vecinos, acotado a la confianza de una respuesta del LLM
+        "confianza": min(vecino["confianza"], 0.90),
+        "recomendacion_agente": generar_recomendacion_generica(vecino["categoria"])
+    }
+
+
+def _verificar_reglas() -> bool:
+    """Indica si esta respuesta por reglas se contrasta también con el LLM."""
+    return MUESTREO_VERIFICACION > 0 and random.random() < MUESTREO_VERIFICACION
+
+
+def _fallback_texto(error: Exception) -> Dict[str, any]:
+    """Resultado cuando el LLM falla al clasificar un texto."""
+    if isinstance(error, json.JSONDecodeError):
         return {
             "categoria": "soporte",
-            "confianza": 0.60,
-            "recomendacion_agente": f"Error en clasificación IA: {str(e)}"
+            "confianza": 0.70,
+            "recomendacion_agente": "Error al parsear respuesta de IA. Clasificación por defecto: soporte"
         }
+    return {
+        "categoria": "soporte",
+        "confianza": 0.60,
+        "recomendacion_agente": f"Error en clasificación IA: {str(error)}"
+    }
 
 
 def generar_recomendacion_generica(categoria: str) -> str:
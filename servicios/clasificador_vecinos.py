@@ -0,0 +1,311 @@
+"""
+Clasificación de textos por vecinos más cercanos, sin LLM.
+
+Cada descripción se convierte en un vector con un "hashing" de bolsa de
+palabras (palabras y pares de palabras seguidas, cada una a una posición
+fija del vector por su hash), normalizado a longitud 1. Los ejemplos ya
+clasificados se guardan como columnas de una matriz NumPy; para clasificar un
+texto se calcula la similitud coseno contra todos los ejemplos con un solo
+producto vector-matriz y votan los k más parecidos. Como un texto corto solo
+ocupa unas decenas de posiciones del vector, el producto solo lee esas filas
+de la matriz y no la matriz completa.
+
+El índice crece con cada texto que clasifica el LLM (agregar) y se guarda
+en disco como dos archivos .npy que al cargarse se abren con mmap, así
+arrancar no copia la matriz a memoria.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from servicios.reglas_clasificacion import normalizar_texto
+
+CATEGORIAS = ("venta", "soporte", "reclamo")
+
+# Dimensión de los vectores (posiciones del hashing)
+DIMENSION = int(os.getenv("VECINOS_DIMENSION", "1024"))
+
+# Vecinos que votan y similitud mínima del más cercano para responder sin LLM
+K_VECINOS = int(os.getenv("VECINOS_K", "5"))
+SIMILITUD_MINIMA = float(os.getenv("VECINOS_SIMILITUD_MINIMA", "0.6"))
+
+# Fracción mínima del voto (ponderado por similitud) de la categoría ganadora
+VOTO_MINIMO = float(os.getenv("VECINOS_VOTO_MINIMO", "0.6"))
+
+# Directorio del índice en disco y cada cuántos ejemplos nuevos se guarda
+DIRECTORIO_INDICE = os.getenv("VECINOS_DIRECTORIO", os.path.join("data", "indice_vecinos"))
+GUARDAR_CADA = int(os.getenv("VECINOS_GUARDAR_CADA", "100"))
+
+_PATRON_PALABRA = re.compile(r"\w+")
+
+
+def vectorizar(texto: str, dimension: int = DIMENSION) -> np.ndarray:
+    """
+    Vector normalizado (float32) de un texto por hashing de bolsa de palabras.
+
+    Args:
+        texto: Descripción de la llamada
+        dimension: Longitud del vector
+
+    Returns:
+        Vector de norma 1 (o de ceros si el texto no tiene palabras)
+    """
+    palabras = _PATRON_PALABRA.findall(normalizar_texto(texto))
+    terminos = palabras + [f"{a} {b}" for a, b in zip(palabras, palabras[1:])]
+    vector = np.zeros(dimension, dtype=np.float32)
+    for termino in terminos:
+        valor_hash = zlib.crc32(termino.encode())
+        # El bit alto decide el signo, así las colisiones tienden a anularse
+        vector[valor_hash % dimension] += 1.0 if valor_hash & 0x80000000 else -1.0
+    norma = np.linalg.norm(vector)
+    if norma > 0:
+        vector /= norma
+    return vector
+
+
+class IndiceVecinos:
+    """
+    Matriz de ejemplos etiquetados con búsqueda por similitud coseno.
+
+    La matriz tiene forma (dimensión, ejemplos): cada fila es una posición
+    del vector, contigua en memoria para todos los ejemplos. Se guarda con
+    capacidad de sobra que se duplica al llenarse, así agregar un ejemplo no
+    copia toda la matriz.
+    """
+
+    def __init__(self, dimension: int = DIMENSION):
+        """
+        Args:
+            dimension: Longitud de los vectores
+        """
+        self.dimension = dimension
+        self._candado = threading.Lock()
+        self._vectores = np.zeros((dimension, 0), dtype=np.float32)
+        self._etiquetas = np.zeros(0, dtype=np.int8)
+        self._cantidad = 0
+        self.pendientes_guardar = 0
+        self._guardando = threading.Lock()
+        self.consultas = 0
+        self.respuestas = 0
+        self.tiempo_total_segundos = 0.0
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def agregar(self, textos: Sequence[str], categorias: Sequence[str]) -> None:
+        """
+        Agrega ejemplos etiquetados al índice.
+
+        Args:
+            textos: Descripciones
+            categorias: Categoría de cada descripción (venta, soporte o reclamo)
+
+        Raises:
+            ValueError: Si alguna categoría no es válida
+        """
+        if not len(textos):
+            return
+        etiquetas = np.array([CATEGORIAS.index(categoria) for categoria in categorias], dtype=np.int8)
+        vectores = np.column_stack([vectorizar(texto, self.dimension) for texto in textos])
+        with self._candado:
+            necesarios = self._cantidad + len(etiquetas)
+            if necesarios > len(self._etiquetas) or not self._vectores.flags.writeable:
+                capacidad = max(necesarios, 2 * len(self._etiquetas), 64)
+                nuevos_vectores = np.zeros((self.dimension, capacidad), dtype=np.float32)
+                nuevas_etiquetas = np.zeros(capacidad, dtype=np.int8)
+                nuevos_vectores[:, :self._cantidad] = self._vectores[:, :self._cantidad]
+                nuevas_etiquetas[:self._cantidad] = self._etiquetas[:self._cantidad]
+                self._vectores, self._etiquetas = nuevos_vectores, nuevas_etiquetas
+            self._vectores[:, self._cantidad:necesarios] = vectores
+            self._etiquetas[self._cantidad:necesarios] = etiquetas
+            self._cantidad = necesarios
+            self.pendientes_guardar += len(etiquetas)
+
+    def vecinos(self, texto: str, k: int = K_VECINOS) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Los k ejemplos más parecidos a un texto.
+
+        Args:
+            texto: Descripción a buscar
+            k: Cantidad de vecinos
+
+        Returns:
+            (similitudes, etiquetas) de los vecinos, de mayor a menor similitud
+        """
+        with self._candado:
+            vectores = self._vectores[:, :self._cantidad]
+            etiquetas = self._etiquetas[:self._cantidad]
+        if not len(etiquetas):
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int8)
+        consulta = vectorizar(texto, self.dimension)
+        # Solo las posiciones que usa el texto aportan al producto
+        posiciones = np.flatnonzero(consulta)
+        similitudes = consulta[posiciones] @ vectores[posiciones]
+        k = min(k, len(similitudes))
+        mejores = np.argpartition(-similitudes, k - 1)[:k]
+        mejores = mejores[np.argsort(-similitudes[mejores])]
+        return similitudes[mejores], etiquetas[mejores]
+
+    def clasificar(self, texto: str) -> Optional[Dict[str, Any]]:
+        """
+        Clasifica un texto por votación de sus vecinos más cercanos.
+
+        Cada vecino vota por su categoría con un peso igual a su similitud.
+        Solo se responde si el vecino más cercano supera SIMILITUD_MINIMA y
+        la categoría ganadora reúne al menos VOTO_MINIMO del voto.
+
+        Args:
+            texto: Descripción de la llamada
+
+        Returns:
+            {"categoria", "confianza", "similitud"} o None si el índice no
+            está seguro (el texto debe ir al LLM)
+        """
+        inicio = time.perf_counter()
+        similitudes, etiquetas = self.vecinos(texto)
+        resultado = None
+        if len(similitudes) and similitudes[0] >= SIMILITUD_MINIMA:
+            pesos = np.clip(similitudes, 0.0, None)
+            votos = np.bincount(etiquetas, weights=pesos, minlength=len(CATEGORIAS))
+            ganadora = int(np.argmax(votos))
+            voto = float(votos[ganadora] / votos.sum())
+            if voto >= VOTO_MINIMO:
+                resultado = {
+                    "categoria": CATEGORIAS[ganadora],
+                    "confianza": round(voto, 2),
+                    "similitud": round(float(similitudes[0]), 4),
+                }
+        with self._candado:
+            self.consultas += 1
+            self.respuestas += resultado is not None
+            self.tiempo_total_segundos += time.perf_counter() - inicio
+        return resultado
+
+    def guardar(self, directorio: str = DIRECTORIO_INDICE) -> None:
+        """
+        Guarda el índice como vectores.npy y etiquetas.npy.
+
+        Escribe en archivos temporales y los renombra, así un proceso que
+        lea a la vez nunca ve un archivo a medio escribir.
+
+        Args:
+            directorio: Directorio destino (se crea si no existe)
+        """
+        os.makedirs(directorio, exist_ok=True)
+        with self._guardando:
+            with self._candado:
+                vectores = np.array(self._vectores[:, :self._cantidad])
+                etiquetas = np.array(self._etiquetas[:self._cantidad])
+                self.pendientes_guardar = 0
+            for nombre, datos in (("vectores", vectores), ("etiquetas", etiquetas)):
+                temporal = os.path.join(directorio, f"{nombre}.tmp.npy")
+                np.save(temporal, datos)
+                os.replace(temporal, os.path.join(directorio, f"{nombre}.npy"))
+
+    def guardar_en_segundo_plano(self, directorio: str = DIRECTORIO_INDICE) -> None:
+        """Como guardar, en un hilo aparte; no hace nada si ya se está guardando."""
+        if self._guardando.locked():
+            return
+        threading.Thread(target=self.guardar, args=(directorio,), daemon=True).start()
+
+    def cargar(self, directorio: str = DIRECTORIO_INDICE) -> bool:
+        """
+        Carga un índice guardado, abriendo la matriz con mmap (solo lectura).
+
+        El primer agregar() posterior copia la matriz a memoria.
+
+        Args:
+            directorio: Directorio con vectores.npy y etiquetas.npy
+
+        Returns:
+            True si había un índice compatible que cargar
+        """
+        ruta_vectores = os.path.join(directorio, "vectores.npy")
+        ruta_etiquetas = os.path.join(directorio, "etiquetas.npy")
+        if not (os.path.exists(ruta_vectores) and os.path.exists(ruta_etiquetas)):
+            return False
+        vectores = np.load(ruta_vectores, mmap_mode="r")
+        etiquetas = np.load(ruta_etiquetas)
+        if vectores.ndim != 2 or vectores.shape != (self.dimension, len(etiquetas)):
+            return False
+        with self._candado:
+            self._vectores = vectores
+            self._etiquetas = etiquetas
+            self._cantidad = len(etiquetas)
+            self.pendientes_guardar = 0
+        return True
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con ejemplos, consultas, respuestas (sin LLM),
+            tasa_respuestas y tiempo promedio por consulta en microsegundos
+        """
+        with self._candado:
+            return {
+                "ejemplos": self._cantidad,
+                "dimension": self.dimension,
+                "consultas": self.consultas,
+                "respuestas": self.respuestas,
+                "tasa_respuestas": self.respuestas / self.consultas if self.consultas else 0.0,
+                "tiempo_promedio_us": round(
+                    self.tiempo_total_segundos / self.consultas * 1e6, 1
+                ) if self.consultas else 0.0,
+                "pendientes_guardar": self.pendientes_guardar,
+            }
+
+
+INDICE_VECINOS = IndiceVecinos()
+
+
+def aprender_texto(texto: str, categoria: str) -> None:
+    """
+    Agrega al índice un texto ya clasificado y lo guarda en disco (en otro
+    hilo) cada GUARDAR_CADA ejemplos nuevos.
+
+    Args:
+        texto: Descripción clasificada
+        categoria: Categoría asignada
+    """
+    INDICE_VECINOS.agregar([texto], [categoria])
+    if INDICE_VECINOS.pendientes_guardar >= GUARDAR_CADA:
+        INDICE_VECINOS.guardar_en_segundo_plano()
+
+
+def ejemplos_en_disco(directorio: str = DIRECTORIO_INDICE) -> int:
+    """Cantidad de ejemplos del índice guardado en `directorio` (0 si no hay)."""
+    indice = IndiceVecinos(INDICE_VECINOS.dimension)
+    return len(indice) if indice.cargar(directorio) else 0
+
+
+def construir_indice(
+    ejemplos: List[Tuple[str, str]],
+    directorio: str = DIRECTORIO_INDICE,
+    agregar: bool = False
+) -> int:
+    """
+    Guarda un índice con los ejemplos dados.
+
+    Args:
+        ejemplos: Pares (descripción, categoría)
+        directorio: Directorio destino
+        agregar: Conservar los ejemplos del índice guardado en `directorio`
+            (p. ej. los aprendidos con aprender_texto) y sumar los nuevos;
+            si es False el índice se reemplaza
+
+    Returns:
+        Cantidad de ejemplos en el índice
+    """
+    indice = IndiceVecinos(INDICE_VECINOS.dimension)
+    if agregar:
+        indice.cargar(directorio)
+    for inicio in range(0, len(ejemplos), 1000):
+        bloque = ejemplos[inicio:inicio + 1000]
+        indice.agregar([texto for texto, _ in bloque], [categoria for _, categoria in bloque])
+    indice.guardar(directorio)
+    INDICE_VECINOS.cargar(directorio)
+    return len(indice)
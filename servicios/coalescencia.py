@@ -0,0 +1,123 @@
+"""
+Agrupación de peticiones idénticas en curso ("single flight").
+
+Si llega una petición con la misma clave que otra que todavía está en
+curso, no se ejecuta de nuevo: espera el resultado de la primera (o su
+excepción). Al terminar la primera la clave se libera, así que no guarda
+resultados; para eso está CacheLRU.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class VueloUnico:
+    """
+    Ejecuta una sola vez cada clave a la vez, seguro entre hilos.
+
+    Uso:
+        valor = vuelos.ejecutar(clave, lambda: consultar(...))
+        valor = await vuelos.ejecutar_async(clave, lambda: consultar_async(...))
+
+    Las versiones síncrona y asíncrona llevan sus propias peticiones en
+    curso: una petición síncrona no espera a una asíncrona ni al revés.
+    Las asíncronas solo se agrupan dentro del mismo event loop.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._en_curso: Dict[Hashable, Future] = {}
+        self._en_curso_async: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.ejecutadas = 0
+        self.agrupadas = 0
+
+    def ejecutar(self, clave: Hashable, funcion: Callable[[], Any]) -> Any:
+        """
+        Ejecuta funcion(), o espera el resultado de la ejecución en curso
+        con la misma clave.
+
+        Args:
+            clave: Identifica peticiones equivalentes
+            funcion: Función sin argumentos que calcula el valor
+
+        Returns:
+            Valor retornado por funcion()
+
+        Raises:
+            Exception: La excepción de funcion(), en todas las peticiones agrupadas
+        """
+        with self._candado:
+            futuro = self._en_curso.get(clave)
+            propio = futuro is None
+            if propio:
+                futuro = Future()
+                self._en_curso[clave] = futuro
+                self.ejecutadas += 1
+            else:
+                self.agrupadas += 1
+        if not propio:
+            return futuro.result()
+
+        try:
+            futuro.set_result(funcion())
+        except BaseException as e:
+            futuro.set_exception(e)
+        finally:
+            with self._candado:
+                del self._en_curso[clave]
+        return futuro.result()
+
+    async def ejecutar_async(self, clave: Hashable, corutina: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Versión asíncrona de ejecutar.
+
+        La ejecución corre en una tarea propia: si se cancela una de las
+        peticiones agrupadas (p. ej. el cliente cerró la conexión), las
+        demás siguen esperando el resultado.
+
+        Args:
+            clave: Identifica peticiones equivalentes
+            corutina: Función sin argumentos que retorna la corrutina a ejecutar
+
+        Returns:
+            Valor retornado por la corrutina
+
+        Raises:
+            Exception: La excepción de la corrutina, en todas las peticiones agrupadas
+        """
+        clave_loop = (id(asyncio.get_running_loop()), clave)
+        with self._candado:
+            tarea = self._en_curso_async.get(clave_loop)
+            if tarea is not None:
+                self.agrupadas += 1
+            else:
+                tarea = asyncio.ensure_future(corutina())
+                self._en_curso_async[clave_loop] = tarea
+                self.ejecutadas += 1
+                tarea.add_done_callback(lambda terminada: self._liberar_async(clave_loop, terminada))
+        return await asyncio.shield(tarea)
+
+    def _liberar_async(self, clave_loop: Tuple[int, Hashable], tarea: asyncio.Task) -> None:
+        with self._candado:
+            if self._en_curso_async.get(clave_loop) is tarea:
+                del self._en_curso_async[clave_loop]
+        # Marca la excepción como leída aunque todas las peticiones se hayan cancelado
+        if not tarea.cancelled():
+            tarea.exception()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con ejecutadas, agrupadas (peticiones que esperaron
+            una ejecución ajena), en_curso y tasa_agrupadas
+        """
+        with self._candado:
+            total = self.ejecutadas + self.agrupadas
+            return {
+                "ejecutadas": self.ejecutadas,
+                "agrupadas": self.agrupadas,
+                "en_curso": len(self._en_curso) + len(self._en_curso_async),
+                "tasa_agrupadas": self.agrupadas / total if total else 0.0,
+            }
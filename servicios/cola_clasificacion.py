@@ -0,0 +1,322 @@
+"""
+Cola de clasificación automática de llamadas nuevas.
+
+Registrar una llamada no espera al LLM: el endpoint encola un trabajo y
+responde de inmediato. Un grupo de trabajadores (tareas asyncio del mismo
+event loop) toma los trabajos, lee la llamada, la clasifica con
+clasificar_llamada_con_ia_async y guarda la ClasificacionIA. La llamada se
+lee en cada intento, así que se clasifica con sus datos actuales; si se
+eliminó, el trabajo termina como "fallido" sin reintentarse. Si el LLM
+falla, el trabajo se reintenta con espera exponencial; agotados los
+intentos queda como "fallido".
+
+La cola vive en memoria del proceso: los trabajos pendientes se pierden si
+el proceso se reinicia (las llamadas quedan sin clasificar y pueden
+clasificarse con POST /api/clasificaciones-ia/ o /lote).
+
+Estados de un trabajo: pendiente -> en_proceso -> completado | fallido
+(reintentando entre intentos fallidos).
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from esquemas import ClasificacionIACreate
+from modelos import AsyncSessionLocal
+from crud import crear_clasificacion_ia_async, obtener_llamada_async
+from servicios.clasificacion_ia import clasificar_llamada_con_ia_async
+
+# Clasificar automáticamente las llamadas nuevas ("0" para desactivar)
+CLASIFICACION_AUTOMATICA = os.getenv("CLASIFICACION_AUTOMATICA", "1") == "1"
+
+# Trabajadores que clasifican en paralelo (además limitados por LIMITADOR_LLM)
+TRABAJADORES_CLASIFICACION = int(os.getenv("CLASIFICACION_TRABAJADORES", "2"))
+
+# Intentos por trabajo y espera antes del primer reintento (se duplica en cada uno)
+MAX_INTENTOS_CLASIFICACION = int(os.getenv("CLASIFICACION_MAX_INTENTOS", "3"))
+ESPERA_REINTENTO_SEGUNDOS = float(os.getenv("CLASIFICACION_ESPERA_REINTENTO_SEGUNDOS", "1.0"))
+
+# Trabajos en cola como máximo; al superarlo los nuevos se marcan fallidos
+MAX_EN_COLA = int(os.getenv("CLASIFICACION_MAX_EN_COLA", "10000"))
+
+# Trabajos terminados que se conservan para consultar su estado
+MAX_TRABAJOS_GUARDADOS = int(os.getenv("CLASIFICACION_MAX_TRABAJOS_GUARDADOS", "10000"))
+
+ESTADOS_TERMINADOS = ("completado", "fallido")
+
+# Cabecera con el ID del trabajo encolado al crear una llamada
+CABECERA_TRABAJO = "X-Trabajo-Clasificacion"
+
+
+class ColaClasificacion:
+    """
+    Cola en memoria con un grupo de trabajadores asyncio.
+
+    Uso:
+        trabajo = COLA_CLASIFICACION.encolar(llamada.id)
+        # (desde código async)
+        COLA_CLASIFICACION.obtener_trabajo(trabajo["id"])
+
+    Los trabajadores se crean en el event loop que encola por primera vez (o
+    al llamar iniciar()) y se recrean si cambia el loop, como ocurre entre
+    clientes de prueba.
+    """
+
+    def __init__(
+        self,
+        trabajadores: int,
+        max_intentos: int,
+        espera_reintento_segundos: float,
+        max_en_cola: int,
+        max_trabajos_guardados: int
+    ):
+        """
+        Args:
+            trabajadores: Trabajos que se procesan a la vez
+            max_intentos: Intentos por trabajo antes de marcarlo fallido
+            espera_reintento_segundos: Espera antes del primer reintento
+            max_en_cola: Trabajos pendientes como máximo
+            max_trabajos_guardados: Trabajos terminados que se conservan
+        """
+        self.trabajadores = trabajadores
+        self.max_intentos = max_intentos
+        self.espera_reintento_segundos = espera_reintento_segundos
+        self.max_en_cola = max_en_cola
+        self.max_trabajos_guardados = max_trabajos_guardados
+        self._cola: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tareas: List[asyncio.Task] = []
+        self._trabajos: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._candado = threading.Lock()
+        self.contadores = {
+            "encolados": 0,
+            "completados": 0,
+            "fallidos": 0,
+            "reintentos": 0,
+        }
+
+    def iniciar(self) -> None:
+        """Crea la cola y los trabajadores en el event loop actual (si no existen)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._cola = asyncio.Queue()
+        self._loop = loop
+        self._tareas = [
+            loop.create_task(self._trabajador(), name=f"clasificacion-{numero}")
+            for numero in range(self.trabajadores)
+        ]
+
+    async def detener(self) -> None:
+        """Cancela los trabajadores. Los trabajos pendientes quedan sin procesar."""
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas = []
+        self._cola = None
+        self._loop = None
+
+    def encolar(self, llamada_id: int) -> Dict[str, Any]:
+        """
+        Encola la clasificación de una llamada recién creada.
+
+        Debe llamarse desde el event loop (endpoints async). El trabajo solo
+        guarda el ID: la llamada se lee al procesarlo.
+
+        Args:
+            llamada_id: ID de la llamada
+
+        Returns:
+            Copia del trabajo creado (ver obtener_trabajo)
+        """
+        self.iniciar()
+        ahora = time.time()
+        trabajo = {
+            "id": next(self._ids),
+            "llamada_id": llamada_id,
+            "estado": "pendiente",
+            "intentos": 0,
+            "error": None,
+            "clasificacion_id": None,
+            "creado": ahora,
+            "actualizado": ahora,
+        }
+        with self._candado:
+            self._trabajos[trabajo["id"]] = trabajo
+            self.contadores["encolados"] += 1
+        if self._cola.qsize() >= self.max_en_cola:
+            self._terminar(trabajo, "fallido", error="La cola de clasificación está llena")
+        else:
+            self._cola.put_nowait(trabajo)
+        return dict(trabajo)
+
+    def obtener_trabajo(self, trabajo_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Estado de un trabajo.
+
+        Args:
+            trabajo_id: ID del trabajo
+
+        Returns:
+            Copia del trabajo (id, llamada_id, estado, intentos, error,
+            clasificacion_id, creado, actualizado) o None si no existe o ya
+            se descartó
+        """
+        with self._candado:
+            trabajo = self._trabajos.get(trabajo_id)
+            return dict(trabajo) if trabajo is not None else None
+
+    def obtener_trabajos(
+        self,
+        llamada_id: Optional[int] = None,
+        estado: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Trabajos más recientes primero, con filtros opcionales.
+
+        Args:
+            llamada_id: Solo los de esta llamada
+            estado: Solo los que están en este estado
+            limit: Número máximo de trabajos a retornar
+
+        Returns:
+            Lista de copias de trabajos
+        """
+        with self._candado:
+            trabajos = []
+            for trabajo in reversed(self._trabajos.values()):
+                if llamada_id is not None and trabajo["llamada_id"] != llamada_id:
+                    continue
+                if estado is not None and trabajo["estado"] != estado:
+                    continue
+                trabajos.append(dict(trabajo))
+                if len(trabajos) >= limit:
+                    break
+            return trabajos
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Estado de la cola.
+
+        Returns:
+            Diccionario con la configuración, los trabajos en cola y en
+            proceso, y los contadores acumulados
+        """
+        with self._candado:
+            en_proceso = sum(1 for trabajo in self._trabajos.values() if trabajo["estado"] == "en_proceso")
+            return {
+                "activa": CLASIFICACION_AUTOMATICA,
+                "trabajadores": self.trabajadores,
+                "max_intentos": self.max_intentos,
+                "en_cola": self._cola.qsize() if self._cola is not None else 0,
+                "en_proceso": en_proceso,
+                **self.contadores,
+            }
+
+    async def _trabajador(self) -> None:
+        """Toma trabajos de la cola hasta ser cancelado."""
+        while True:
+            trabajo = await self._cola.get()
+            try:
+                await self._procesar(trabajo)
+            except Exception as e:
+                self._terminar(trabajo, "fallido", error=str(e))
+            finally:
+                self._cola.task_done()
+
+    async def _procesar(self, trabajo: Dict[str, Any]) -> None:
+        """Lee la llamada, la clasifica y guarda; reprograma el trabajo si el LLM falla."""
+        self._actualizar(trabajo, estado="en_proceso", intentos=trabajo["intentos"] + 1)
+        # La sesión se cierra antes de esperar al LLM
+        async with AsyncSessionLocal() as db:
+            llamada = await obtener_llamada_async(db, trabajo["llamada_id"])
+        if llamada is None:
+            self._terminar(trabajo, "fallido", error=f"La llamada con ID {trabajo['llamada_id']} no existe")
+            return
+
+        try:
+            resultado = await clasificar_llamada_con_ia_async(
+                llamada.tipo,
+                llamada.resultado,
+                numero_cliente=llamada.numero_cliente,
+                duracion_segundos=llamada.duracion_segundos,
+                con_fallback=False
+            )
+        except Exception as e:
+            if trabajo["intentos"] >= self.max_intentos:
+                self._terminar(trabajo, "fallido", error=f"Error en clasificación IA: {e}")
+                return
+            # La espera no ocupa al trabajador: el trabajo vuelve a la cola después
+            espera = self.espera_reintento_segundos * 2 ** (trabajo["intentos"] - 1)
+            self._actualizar(trabajo, estado="reintentando", error=f"Error en clasificación IA: {e}")
+            with self._candado:
+                self.contadores["reintentos"] += 1
+            asyncio.get_running_loop().call_later(espera, self._reencolar, self._cola, trabajo)
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                clasificacion = await crear_clasificacion_ia_async(
+                    db,
+                    ClasificacionIACreate(llamada_id=trabajo["llamada_id"], **resultado)
+                )
+        except ValueError as e:
+            # La llamada se eliminó o ya fue clasificada: no tiene sentido reintentar
+            self._terminar(trabajo, "fallido", error=str(e))
+            return
+        self._terminar(trabajo, "completado", clasificacion_id=clasificacion.id)
+
+    def _reencolar(self, cola: asyncio.Queue, trabajo: Dict[str, Any]) -> None:
+        # Si la cola se reinició mientras tanto, el trabajo no puede continuar
+        if cola is not self._cola:
+            self._terminar(trabajo, "fallido", error="La cola de clasificación se detuvo")
+            return
+        self._actualizar(trabajo, estado="pendiente")
+        cola.put_nowait(trabajo)
+
+    def _actualizar(self, trabajo: Dict[str, Any], **cambios) -> None:
+        with self._candado:
+            trabajo.update(cambios, actualizado=time.time())
+
+    def _terminar(self, trabajo: Dict[str, Any], estado: str, **cambios) -> None:
+        """Marca el trabajo terminado y descarta los terminados más antiguos."""
+        with self._candado:
+            trabajo.update(cambios, estado=estado, actualizado=time.time())
+            self.contadores["completados" if estado == "completado" else "fallidos"] += 1
+            sobrantes = len(self._trabajos) - self.max_trabajos_guardados
+            if sobrantes > 0:
+                for trabajo_id in [
+                    trabajo_id for trabajo_id, guardado in self._trabajos.items()
+                    if guardado["estado"] in ESTADOS_TERMINADOS
+                ][:sobrantes]:
+                    del self._trabajos[trabajo_id]
+
+
+COLA_CLASIFICACION = ColaClasificacion(
+    trabajadores=TRABAJADORES_CLASIFICACION,
+    max_intentos=MAX_INTENTOS_CLASIFICACION,
+    espera_reintento_segundos=ESPERA_REINTENTO_SEGUNDOS,
+    max_en_cola=MAX_EN_COLA,
+    max_trabajos_guardados=MAX_TRABAJOS_GUARDADOS,
+)
+
+
+def encolar_clasificacion(llamada_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Encola la clasificación automática de una llamada nueva en COLA_CLASIFICACION.
+
+    Args:
+        llamada_id: ID de la llamada
+
+    Returns:
+        Trabajo creado, o None si CLASIFICACION_AUTOMATICA está desactivada
+    """
+    if not CLASIFICACION_AUTOMATICA:
+        return None
+    return COLA_CLASIFICACION.encolar(llamada_id)
@@ -0,0 +1,675 @@
+"""
+Acceso al LLM (servidor compatible con OpenAI, p. ej. LM Studio).
+
+Concentra los clientes y el control de concurrencia para que los servicios
+solo construyan mensajes e interpreten respuestas:
+  - completar_chat: cliente síncrono, para scripts y código síncrono
+  - completar_chat_async: cliente AsyncOpenAI, para los endpoints async.
+    Limita las peticiones simultáneas a cada servidor con su propio
+    LimitadorConcurrencia (LLM_MAX_CONCURRENCIA), con LIMITADOR_LLM como
+    turno de entrada al pool, y mide cuánto espera cada petición en la cola
+    antes de ser enviada.
+  - completar_chat_stream(_async): piden la respuesta con stream=True y
+    cierran la conexión en cuanto la respuesta leída hasta el momento es
+    suficiente, sin esperar el texto que el modelo agregue después.
+
+TIEMPOS_RESPUESTA registra, por petición, el tiempo hasta tener la
+respuesta junto a la latencia de la respuesta completa. Si quien llama pasa
+un RegistroLLM (servicios/metricas_llm.py), se completa con el servidor,
+el modelo, los tokens y el tiempo total de la petición.
+
+Las peticiones se reparten entre los servidores de POOL_LLM
+(servicios/pool_llm.py, configurado con LLM_BACKENDS): cada una va al
+servidor disponible con menos peticiones en curso.
+
+Cada intento tiene un tiempo máximo (LLM_TIMEOUT_SEGUNDOS) y el cliente
+reintenta una cantidad acotada de veces los errores de conexión, de tiempo
+y 5xx (LLM_MAX_REINTENTOS). Si un servidor sigue fallando, la petición pasa
+al siguiente servidor disponible y el circuito de ese servidor se abre: deja
+de recibir peticiones hasta que una petición de prueba vuelva a funcionar.
+Sin servidores disponibles las peticiones fallan de inmediato con
+CircuitoAbiertoError (los servicios responden con su fallback).
+
+Reintentos y failover comparten además un plazo total por petición
+(LLM_TIMEOUT_TOTAL_SEGUNDOS): cada intento recibe como tiempo máximo lo que
+queda del plazo, repartido entre los reintentos del cliente, y agotado el
+plazo la petición falla con TiempoAgotadoError. En las versiones async el
+plazo incluye la espera de turno y se impone con asyncio.timeout.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from servicios.pool_llm import Backend, PoolBackends, es_fallo_servidor, leer_backends
+from servicios.metricas_llm import RegistroLLM
+
+# Configuración del cliente OpenAI (LM Studio)
+BASE_URL = os.getenv("OPENAI_BASE_URL", "http://127.0.0.1:1234/v1")
+API_KEY = os.getenv("OPENAI_API_KEY", "lmstudio")
+MODELO = os.getenv("OPENAI_MODEL", "openai/gpt-oss-20b")
+
+# Servidores del pool: "url|modelo,url,..." (sin modelo: OPENAI_MODEL); por defecto OPENAI_BASE_URL
+BACKENDS = leer_backends(os.getenv("LLM_BACKENDS", BASE_URL), MODELO)
+
+# Modelos del pool, para las claves de caché: cualquiera de ellos puede haber
+# dado una respuesta guardada, y cambiarlos deja de encontrar las anteriores
+MODELOS_POOL = ",".join(sorted({modelo for _, modelo in BACKENDS}))
+
+# Segundos entre sondeos de salud de los servidores (0 desactiva) y tiempo máximo de cada sondeo
+SONDEO_SEGUNDOS = float(os.getenv("LLM_SONDEO_SEGUNDOS", "10"))
+TIMEOUT_SONDEO_SEGUNDOS = float(os.getenv("LLM_TIMEOUT_SONDEO_SEGUNDOS", "2"))
+
+# Tiempo máximo por intento (y para abrir la conexión) y reintentos por petición
+TIMEOUT_SEGUNDOS = float(os.getenv("LLM_TIMEOUT_SEGUNDOS", "30"))
+TIMEOUT_CONEXION_SEGUNDOS = float(os.getenv("LLM_TIMEOUT_CONEXION_SEGUNDOS", "3"))
+MAX_REINTENTOS = int(os.getenv("LLM_MAX_REINTENTOS", "1"))
+
+# Tiempo máximo de una petición completa, con sus reintentos y failover
+TIMEOUT_TOTAL_SEGUNDOS = float(os.getenv("LLM_TIMEOUT_TOTAL_SEGUNDOS", "45"))
+
+TIMEOUT = httpx.Timeout(TIMEOUT_SEGUNDOS, connect=TIMEOUT_CONEXION_SEGUNDOS)
+
+# Fallos seguidos que abren el circuito de un servidor y segundos hasta la petición de prueba
+FALLOS_APERTURA = int(os.getenv("LLM_CIRCUITO_FALLOS", "5"))
+ESPERA_APERTURA_SEGUNDOS = float(os.getenv("LLM_CIRCUITO_ESPERA_SEGUNDOS", "30"))
+
+# Peticiones simultáneas por servidor desde este proceso (las demás esperan turno)
+MAX_CONCURRENCIA_LLM = int(os.getenv("LLM_MAX_CONCURRENCIA", "4"))
+
+# Baja temperatura para respuestas más consistentes
+TEMPERATURA = 0.1
+
+
+class LimitadorConcurrencia:
+    """
+    Semáforo asíncrono con métricas de espera.
+
+    Uso:
+        async with LIMITADOR_LLM:
+            ...
+
+    El semáforo se crea en el event loop que lo usa por primera vez (y se
+    recrea si cambia el loop, como ocurre entre clientes de prueba).
+    """
+
+    def __init__(self, maximo: int):
+        """
+        Args:
+            maximo: Número máximo de tareas dentro del bloque a la vez
+        """
+        self.maximo = maximo
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._candado = threading.Lock()
+        self.en_espera = 0
+        self.en_curso = 0
+        self.atendidas = 0
+        self.espera_total_segundos = 0.0
+        self.espera_maxima_segundos = 0.0
+
+    def _obtener_semaforo(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaforo = asyncio.Semaphore(self.maximo)
+            self._loop = loop
+        return self._semaforo
+
+    async def __aenter__(self):
+        semaforo = self._obtener_semaforo()
+        inicio = time.perf_counter()
+        with self._candado:
+            self.en_espera += 1
+        try:
+            await semaforo.acquire()
+        finally:
+            with self._candado:
+                self.en_espera -= 1
+        espera = time.perf_counter() - inicio
+        with self._candado:
+            self.en_curso += 1
+            self.atendidas += 1
+            self.espera_total_segundos += espera
+            self.espera_maxima_segundos = max(self.espera_maxima_segundos, espera)
+        return self
+
+    async def __aexit__(self, *excepcion):
+        with self._candado:
+            self.en_curso -= 1
+        self._semaforo.release()
+        return False
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Estado y métricas de espera del limitador.
+
+        Returns:
+            Diccionario con maximo, en_curso, en_espera, atendidas y los
+            tiempos de espera en cola (total, promedio y máximo, en segundos)
+        """
+        with self._candado:
+            return {
+                "maximo": self.maximo,
+                "en_curso": self.en_curso,
+                "en_espera": self.en_espera,
+                "atendidas": self.atendidas,
+                "espera_total_segundos": round(self.espera_total_segundos, 6),
+                "espera_promedio_segundos": round(
+                    self.espera_total_segundos / self.atendidas, 6
+                ) if self.atendidas else 0.0,
+                "espera_maxima_segundos": round(self.espera_maxima_segundos, 6),
+            }
+
+
+# Turno de entrada al pool: tantas plazas como la suma de los límites de los
+# servidores. El servidor se elige al obtener turno, con las respuestas ya
+# recibidas, y su propio limitador impide que uno lento ocupe más de
+# LLM_MAX_CONCURRENCIA plazas.
+LIMITADOR_LLM = LimitadorConcurrencia(MAX_CONCURRENCIA_LLM * len(BACKENDS))
+
+
+class CircuitoAbiertoError(Exception):
+    """El circuito del LLM está abierto: la petición no se envió."""
+
+
+class TiempoAgotadoError(Exception):
+    """La petición al LLM superó LLM_TIMEOUT_TOTAL_SEGUNDOS."""
+
+
+class InterruptorCircuito:
+    """
+    Circuit breaker para un servidor remoto.
+
+    Estados:
+      - cerrado: las peticiones pasan; `fallos_apertura` fallos seguidos lo abren
+      - abierto: las peticiones se rechazan sin enviarse durante
+        `espera_segundos`; luego pasa a semiabierto
+      - semiabierto: deja pasar una sola petición de prueba; si funciona se
+        cierra, si falla vuelve a abrirse
+
+    Uso:
+        if not interruptor.permitir():
+            raise CircuitoAbiertoError(...)
+        ... petición ...
+        interruptor.registrar_exito()  # o registrar_fallo()
+    """
+
+    def __init__(self, fallos_apertura: int, espera_segundos: float):
+        """
+        Args:
+            fallos_apertura: Fallos seguidos que abren el circuito
+            espera_segundos: Segundos abierto antes de la petición de prueba
+        """
+        self.fallos_apertura = fallos_apertura
+        self.espera_segundos = espera_segundos
+        self._candado = threading.Lock()
+        self.estado = "cerrado"
+        self.fallos_seguidos = 0
+        self.abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self.aperturas = 0
+        self.rechazadas = 0
+        self.exitos = 0
+        self.fallos = 0
+
+    def disponible(self) -> bool:
+        """Como permitir, pero sin reservar la petición de prueba ni contar rechazos."""
+        with self._candado:
+            if self.estado == "abierto":
+                return time.monotonic() - self.abierto_desde >= self.espera_segundos
+            return self.estado == "cerrado" or not self._prueba_en_curso
+
+    def permitir(self) -> bool:
+        """
+        Indica si una petición puede enviarse (y la cuenta como prueba si
+        el circuito está semiabierto).
+
+        Returns:
+            False si el circuito está abierto o ya hay una prueba en curso
+        """
+        with self._candado:
+            if self.estado == "abierto" and time.monotonic() - self.abierto_desde >= self.espera_segundos:
+                self.estado = "semiabierto"
+            if self.estado == "cerrado":
+                return True
+            if self.estado == "semiabierto" and not self._prueba_en_curso:
+                self._prueba_en_curso = True
+                return True
+            self.rechazadas += 1
+            return False
+
+    def registrar_exito(self) -> None:
+        """El servidor respondió: cierra el circuito."""
+        with self._candado:
+            self.exitos += 1
+            self.fallos_seguidos = 0
+            self.estado = "cerrado"
+            self._prueba_en_curso = False
+
+    def registrar_fallo(self) -> None:
+        """El servidor no respondió: abre el circuito si corresponde."""
+        with self._candado:
+            self.fallos += 1
+            self.fallos_seguidos += 1
+            if self.estado == "semiabierto" or (
+                self.estado == "cerrado" and self.fallos_seguidos >= self.fallos_apertura
+            ):
+                self.estado = "abierto"
+                self.abierto_desde = time.monotonic()
+                self.aperturas += 1
+            self._prueba_en_curso = False
+
+    def liberar_prueba(self) -> None:
+        """La petición se canceló sin resultado: permite otra prueba."""
+        with self._candado:
+            self._prueba_en_curso = False
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con estado, fallos_seguidos, segundos_para_prueba
+            (si está abierto) y los contadores acumulados
+        """
+        with self._candado:
+            return {
+                "estado": self.estado,
+                "fallos_seguidos": self.fallos_seguidos,
+                "fallos_apertura": self.fallos_apertura,
+                "segundos_para_prueba": round(max(
+                    self.espera_segundos - (time.monotonic() - self.abierto_desde), 0.0
+                ), 3) if self.estado == "abierto" else None,
+                "aperturas": self.aperturas,
+                "rechazadas": self.rechazadas,
+                "exitos": self.exitos,
+                "fallos": self.fallos,
+            }
+
+
+class TiemposRespuesta:
+    """
+    Tiempo hasta tener la respuesta y latencia de la respuesta completa.
+
+    Sin streaming ambos coinciden. Con streaming la respuesta está lista
+    antes de que termine la generación; si la conexión se cierra en ese
+    momento la petición cuenta como cortada y no aporta latencia completa.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.peticiones = 0
+        self.cortadas = 0
+        self.completas = 0
+        self.tiempo_respuesta_total = 0.0
+        self.latencia_completa_total = 0.0
+
+    def registrar(self, tiempo_respuesta: float, latencia_completa: Optional[float]) -> None:
+        """
+        Args:
+            tiempo_respuesta: Segundos hasta tener la respuesta
+            latencia_completa: Segundos hasta el final de la respuesta, o
+                None si se cortó antes
+        """
+        with self._candado:
+            self.peticiones += 1
+            self.tiempo_respuesta_total += tiempo_respuesta
+            if latencia_completa is None:
+                self.cortadas += 1
+            else:
+                self.completas += 1
+                self.latencia_completa_total += latencia_completa
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con peticiones, cortadas, completas y los promedios
+            de tiempo hasta la respuesta y de latencia completa (segundos)
+        """
+        with self._candado:
+            return {
+                "peticiones": self.peticiones,
+                "cortadas": self.cortadas,
+                "completas": self.completas,
+                "tiempo_respuesta_promedio_segundos": round(
+                    self.tiempo_respuesta_total / self.peticiones, 6
+                ) if self.peticiones else 0.0,
+                "latencia_completa_promedio_segundos": round(
+                    self.latencia_completa_total / self.completas, 6
+                ) if self.completas else 0.0,
+            }
+
+
+TIEMPOS_RESPUESTA = TiemposRespuesta()
+
+
+POOL_LLM = PoolBackends(
+    [
+        Backend(
+            url,
+            modelo,
+            API_KEY,
+            TIMEOUT,
+            MAX_REINTENTOS,
+            InterruptorCircuito(FALLOS_APERTURA, ESPERA_APERTURA_SEGUNDOS),
+            LimitadorConcurrencia(MAX_CONCURRENCIA_LLM),
+        )
+        for url, modelo in BACKENDS
+    ],
+    timeout_sondeo=TIMEOUT_SONDEO_SEGUNDOS,
+)
+
+# Cliente del primer servidor, para scripts que consultan un servidor directamente
+CLIENT = POOL_LLM.backends[0].cliente
+
+
+def _verificar_disponibles() -> None:
+    """Lanza CircuitoAbiertoError si ningún servidor puede recibir peticiones."""
+    if not POOL_LLM.disponibles():
+        raise CircuitoAbiertoError("LLM no disponible (ningún servidor disponible)")
+
+
+def _elegir_backend(intentados: List[Backend]) -> Backend:
+    """Reserva un servidor no intentado, o lanza CircuitoAbiertoError."""
+    backend = POOL_LLM.elegir(excluir=intentados)
+    if backend is None:
+        raise CircuitoAbiertoError("LLM no disponible (ningún servidor disponible)")
+    intentados.append(backend)
+    return backend
+
+
+def _verificar_plazo(limite: float) -> None:
+    """Lanza TiempoAgotadoError si ya pasó `limite` (según time.monotonic)."""
+    if time.monotonic() >= limite:
+        raise TiempoAgotadoError(f"LLM sin respuesta en {TIMEOUT_TOTAL_SEGUNDOS:g} s")
+
+
+def _timeout_intento(limite: float) -> httpx.Timeout:
+    """
+    Tiempo máximo del próximo intento: lo que queda hasta `limite` (según
+    time.monotonic), repartido entre los reintentos del cliente y sin pasar
+    de TIMEOUT.
+    """
+    por_intento = max(limite - time.monotonic(), 0.001) / (MAX_REINTENTOS + 1)
+    return httpx.Timeout(
+        min(TIMEOUT_SEGUNDOS, por_intento), connect=min(TIMEOUT_CONEXION_SEGUNDOS, por_intento)
+    )
+
+
+def _reintentar_en_otro(error: BaseException, intentados: List[Backend]) -> bool:
+    """Indica si una petición fallida debe repetirse en otro servidor."""
+    return es_fallo_servidor(error) and bool(POOL_LLM.disponibles(excluir=intentados))
+
+
+def _ejecutar(
+    peticion: Callable[[Backend, httpx.Timeout], Tuple[str, bool]],
+    registro: RegistroLLM
+) -> str:
+    """
+    Ejecuta una petición síncrona en el pool, pasando al siguiente servidor
+    si el elegido no responde, dentro de TIMEOUT_TOTAL_SEGUNDOS.
+
+    Args:
+        peticion: Recibe el servidor y el tiempo máximo del intento, y
+            retorna (texto, cortada)
+        registro: Se completa con el último servidor intentado, su modelo
+            y el tiempo total
+
+    Returns:
+        Texto de la respuesta, sin espacios al inicio ni al final
+
+    Raises:
+        TiempoAgotadoError: Si el plazo se cumple antes de un nuevo intento
+    """
+    inicio_total = time.perf_counter()
+    limite = time.monotonic() + TIMEOUT_TOTAL_SEGUNDOS
+    intentados: List[Backend] = []
+    try:
+        while True:
+            _verificar_plazo(limite)
+            backend = _elegir_backend(intentados)
+            registro.backend, registro.modelo = backend.url, backend.modelo
+            inicio = time.perf_counter()
+            try:
+                texto, cortada = peticion(backend, _timeout_intento(limite))
+            except BaseException as e:
+                POOL_LLM.terminar(backend, e)
+                if _reintentar_en_otro(e, intentados):
+                    continue
+                raise
+            tiempo = time.perf_counter() - inicio
+            POOL_LLM.terminar(backend, None, tiempo)
+            TIEMPOS_RESPUESTA.registrar(tiempo, None if cortada else tiempo)
+            return texto.strip()
+    finally:
+        registro.segundos = time.perf_counter() - inicio_total
+
+
+async def _ejecutar_async(
+    peticion: Callable[[Backend, httpx.Timeout], Awaitable[Tuple[str, bool]]],
+    registro: RegistroLLM
+) -> str:
+    """
+    Versión asíncrona de _ejecutar. Espera turno en LIMITADOR_LLM, elige
+    el servidor con menos peticiones en curso y espera además turno en el
+    limitador de ese servidor, así que ninguno atiende más de
+    LLM_MAX_CONCURRENCIA peticiones a la vez. Sin servidores disponibles
+    falla sin esperar turno.
+
+    El plazo TIMEOUT_TOTAL_SEGUNDOS cubre las esperas de turno, los
+    reintentos del cliente y el failover: al cumplirse se cancela el intento
+    en curso y se lanza TiempoAgotadoError.
+    """
+    inicio_total = time.perf_counter()
+    limite = time.monotonic() + TIMEOUT_TOTAL_SEGUNDOS
+    try:
+        _verificar_disponibles()
+        intentados: List[Backend] = []
+        async with asyncio.timeout(TIMEOUT_TOTAL_SEGUNDOS), LIMITADOR_LLM:
+            while True:
+                backend = _elegir_backend(intentados)
+                registro.backend, registro.modelo = backend.url, backend.modelo
+                try:
+                    async with backend.limitador:
+                        inicio = time.perf_counter()
+                        texto, cortada = await peticion(backend, _timeout_intento(limite))
+                except BaseException as e:
+                    POOL_LLM.terminar(backend, e)
+                    if _reintentar_en_otro(e, intentados):
+                        continue
+                    raise
+                tiempo = time.perf_counter() - inicio
+                POOL_LLM.terminar(backend, None, tiempo)
+                TIEMPOS_RESPUESTA.registrar(tiempo, None if cortada else tiempo)
+                return texto.strip()
+    except TimeoutError as e:
+        raise TiempoAgotadoError(f"LLM sin respuesta en {TIMEOUT_TOTAL_SEGUNDOS:g} s") from e
+    finally:
+        registro.segundos = time.perf_counter() - inicio_total
+
+
+def _registrar_uso(registro: RegistroLLM, usage) -> None:
+    """Copia los tokens de `usage` (si el servidor los informó) al registro."""
+    if usage is not None:
+        registro.tokens_prompt = usage.prompt_tokens
+        registro.tokens_respuesta = usage.completion_tokens
+
+
+def completar_chat(
+    mensajes: List[Dict[str, str]],
+    registro: Optional[RegistroLLM] = None,
+    **opciones
+) -> str:
+    """
+    Envía los mensajes al LLM con el cliente síncrono.
+
+    Args:
+        mensajes: Mensajes en formato chat de OpenAI
+        registro: Se completa con servidor, modelo, tokens y tiempo (opcional)
+        **opciones: Parámetros adicionales para chat.completions.create
+
+    Returns:
+        Contenido de texto de la respuesta, sin espacios al inicio ni al final
+
+    Raises:
+        CircuitoAbiertoError: Si ningún servidor está disponible (no se envía nada)
+        TiempoAgotadoError: Si no hay respuesta en LLM_TIMEOUT_TOTAL_SEGUNDOS
+    """
+    registro = registro or RegistroLLM("otra")
+
+    def peticion(backend: Backend, timeout: httpx.Timeout) -> Tuple[str, bool]:
+        response = backend.cliente.chat.completions.create(
+            model=backend.modelo,
+            messages=mensajes,
+            temperature=TEMPERATURA,
+            timeout=timeout,
+            **opciones
+        )
+        _registrar_uso(registro, response.usage)
+        return response.choices[0].message.content or "", False
+
+    return _ejecutar(peticion, registro)
+
+
+async def completar_chat_async(
+    mensajes: List[Dict[str, str]],
+    registro: Optional[RegistroLLM] = None,
+    **opciones
+) -> str:
+    """
+    Versión asíncrona de completar_chat, limitada por LIMITADOR_LLM y por
+    el limitador de cada servidor.
+
+    No ocupa hilos del threadpool: mientras el LLM responde, el event loop
+    sigue atendiendo otras peticiones. Sin servidores disponibles falla sin
+    esperar turno en el limitador.
+
+    Args:
+        mensajes: Mensajes en formato chat de OpenAI
+        registro: Se completa con servidor, modelo, tokens y tiempo (opcional)
+        **opciones: Parámetros adicionales para chat.completions.create
+
+    Returns:
+        Contenido de texto de la respuesta, sin espacios al inicio ni al final
+
+    Raises:
+        CircuitoAbiertoError: Si ningún servidor está disponible (no se envía nada)
+        TiempoAgotadoError: Si no hay respuesta en LLM_TIMEOUT_TOTAL_SEGUNDOS
+    """
+    registro = registro or RegistroLLM("otra")
+
+    async def peticion(backend: Backend, timeout: httpx.Timeout) -> Tuple[str, bool]:
+        response = await backend.cliente_async.chat.completions.create(
+            model=backend.modelo,
+            messages=mensajes,
+            temperature=TEMPERATURA,
+            timeout=timeout,
+            **opciones
+        )
+        _registrar_uso(registro, response.usage)
+        return response.choices[0].message.content or "", False
+
+    return await _ejecutar_async(peticion, registro)
+
+
+def completar_chat_stream(
+    mensajes: List[Dict[str, str]],
+    respuesta_lista: Callable[[str], bool],
+    registro: Optional[RegistroLLM] = None,
+    **opciones
+) -> str:
+    """
+    Como completar_chat, pero lee la respuesta en streaming y la corta en
+    cuanto respuesta_lista(texto_leido) retorna True.
+
+    Args:
+        mensajes: Mensajes en formato chat de OpenAI
+        respuesta_lista: Recibe el texto acumulado tras cada fragmento
+        registro: Se completa con servidor, modelo, tiempo y, como tokens de
+            respuesta, los fragmentos recibidos (opcional)
+        **opciones: Parámetros adicionales para chat.completions.create
+
+    Returns:
+        Texto leído hasta cortar (o completo), sin espacios al inicio ni al final
+
+    Raises:
+        CircuitoAbiertoError: Si ningún servidor está disponible (no se envía nada)
+        TiempoAgotadoError: Si no hay respuesta en LLM_TIMEOUT_TOTAL_SEGUNDOS
+    """
+    registro = registro or RegistroLLM("otra")
+
+    def peticion(backend: Backend, timeout: httpx.Timeout) -> Tuple[str, bool]:
+        stream = backend.cliente.chat.completions.create(
+            model=backend.modelo,
+            messages=mensajes,
+            temperature=TEMPERATURA,
+            stream=True,
+            timeout=timeout,
+            **opciones
+        )
+        fragmentos = []
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    fragmentos.append(chunk.choices[0].delta.content)
+                    registro.tokens_respuesta = len(fragmentos)
+                    if respuesta_lista("".join(fragmentos)):
+                        return "".join(fragmentos), True
+        finally:
+            stream.close()
+        return "".join(fragmentos), False
+
+    return _ejecutar(peticion, registro)
+
+
+async def completar_chat_stream_async(
+    mensajes: List[Dict[str, str]],
+    respuesta_lista: Callable[[str], bool],
+    registro: Optional[RegistroLLM] = None,
+    **opciones
+) -> str:
+    """
+    Versión asíncrona de completar_chat_stream, limitada por LIMITADOR_LLM
+    y por el limitador de cada servidor.
+    """
+    registro = registro or RegistroLLM("otra")
+
+    async def peticion(backend: Backend, timeout: httpx.Timeout) -> Tuple[str, bool]:
+        stream = await backend.cliente_async.chat.completions.create(
+            model=backend.modelo,
+            messages=mensajes,
+            temperature=TEMPERATURA,
+            stream=True,
+            timeout=timeout,
+            **opciones
+        )
+        fragmentos = []
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    fragmentos.append(chunk.choices[0].delta.content)
+                    registro.tokens_respuesta = len(fragmentos)
+                    if respuesta_lista("".join(fragmentos)):
+                        return "".join(fragmentos), True
+        finally:
+            await stream.close()
+        return "".join(fragmentos), False
+
+    return await _ejecutar_async(peticion, registro)
+
+
+def estadisticas_llm() -> Dict[str, Any]:
+    """
+    Métricas del acceso al LLM de este proceso.
+
+    Returns:
+        Diccionario con el modelo configurado, el turno de entrada al
+        pool, los tiempos de respuesta y, por servidor del pool, su
+        disponibilidad, latencias, circuito y limitador
+    """
+    return {
+        "modelo": MODELO,
+        "concurrencia": LIMITADOR_LLM.estadisticas(),
+        "tiempos": TIEMPOS_RESPUESTA.estadisticas(),
+        "backends": POOL_LLM.estadisticas(),
+    }
@@ -0,0 +1,196 @@
+"""
+Métricas por petición al LLM: tokens, tiempo, servidor, modelo y resultado.
+
+Cada petición de clasificación lleva un RegistroLLM que completar_chat*
+llena con el servidor que respondió, el modelo, los tokens informados en
+`usage` y el tiempo total (incluye la espera en el limitador y los
+reintentos en otro servidor). El servicio de clasificación lo entrega a
+METRICAS_LLM con el resultado:
+  - ok: la respuesta se interpretó
+  - json_error: hubo respuesta pero no se pudo interpretar
+  - fallback: no hubo respuesta (error del servidor, tiempo agotado o
+    ningún servidor disponible)
+Con json_error y fallback el servicio responde su clasificación de respaldo.
+
+METRICAS_LLM acumula contadores por (operación, servidor, modelo,
+resultado) e histogramas de latencia y tokens. Con LLM_TRAZA_ARCHIVO cada
+petición se agrega además como una línea JSON a ese archivo.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence
+
+# Archivo de traza (una línea JSON por petición); vacío para no escribirla
+ARCHIVO_TRAZA = os.getenv("LLM_TRAZA_ARCHIVO", "")
+
+LIMITES_LATENCIA_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITES_TOKENS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+
+class RegistroLLM:
+    """
+    Datos de una petición al LLM.
+
+    completar_chat* llenan backend, modelo, tokens y segundos; quien hace
+    la petición indica la operación y, al registrarla, el resultado.
+    """
+
+    def __init__(self, operacion: str):
+        """
+        Args:
+            operacion: Qué se pidió (llamada, texto, lote, verificacion)
+        """
+        self.operacion = operacion
+        self.backend: Optional[str] = None
+        self.modelo: Optional[str] = None
+        self.tokens_prompt: Optional[int] = None
+        self.tokens_respuesta: Optional[int] = None
+        self.segundos = 0.0
+
+
+class Histograma:
+    """Conteos por intervalo con límites fijos; el último intervalo no tiene límite."""
+
+    def __init__(self, limites: Sequence[float]):
+        """
+        Args:
+            limites: Límites superiores de los intervalos, de menor a mayor
+        """
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.total = 0
+        self.suma = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.conteos[bisect.bisect_left(self.limites, valor)] += 1
+        self.total += 1
+        self.suma += valor
+
+    def percentil(self, porcentaje: float) -> Optional[float]:
+        """Límite superior del intervalo que contiene el percentil (None si no hay límite)."""
+        if not self.total:
+            return 0.0
+        objetivo = porcentaje / 100 * self.total
+        acumulado = 0
+        for indice, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return self.limites[indice] if indice < len(self.limites) else None
+        return None
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con limites, conteos (uno más que límites), total,
+            suma, promedio y p50/p95/p99 (como límite superior del intervalo)
+        """
+        return {
+            "limites": list(self.limites),
+            "conteos": list(self.conteos),
+            "total": self.total,
+            "suma": round(self.suma, 6),
+            "promedio": round(self.suma / self.total, 6) if self.total else 0.0,
+            "p50": self.percentil(50),
+            "p95": self.percentil(95),
+            "p99": self.percentil(99),
+        }
+
+
+class MetricasLLM:
+    """Contadores e histogramas de las peticiones al LLM, seguros entre hilos."""
+
+    def __init__(self, archivo_traza: str = ""):
+        """
+        Args:
+            archivo_traza: Archivo donde agregar una línea JSON por petición
+                (vacío para no escribir traza)
+        """
+        self.archivo_traza = archivo_traza
+        self._candado = threading.Lock()
+        self._traza = open(archivo_traza, "a", encoding="utf-8", buffering=1) if archivo_traza else None
+        self.limpiar()
+
+    def limpiar(self) -> None:
+        """Reinicia contadores e histogramas."""
+        with self._candado:
+            self._contadores: Dict[tuple, Dict[str, Any]] = defaultdict(
+                lambda: {"peticiones": 0, "tokens_prompt": 0, "tokens_respuesta": 0, "segundos": 0.0}
+            )
+            self._latencia = defaultdict(lambda: Histograma(LIMITES_LATENCIA_SEGUNDOS))
+            self._tokens_prompt = Histograma(LIMITES_TOKENS)
+            self._tokens_respuesta = Histograma(LIMITES_TOKENS)
+
+    def registrar(self, registro: RegistroLLM, resultado: str) -> None:
+        """
+        Suma una petición.
+
+        Args:
+            registro: Datos de la petición
+            resultado: ok, json_error o fallback
+        """
+        clave = (registro.operacion, registro.backend, registro.modelo, resultado)
+        with self._candado:
+            contador = self._contadores[clave]
+            contador["peticiones"] += 1
+            contador["tokens_prompt"] += registro.tokens_prompt or 0
+            contador["tokens_respuesta"] += registro.tokens_respuesta or 0
+            contador["segundos"] += registro.segundos
+            self._latencia[resultado].observar(registro.segundos)
+            if registro.tokens_prompt is not None:
+                self._tokens_prompt.observar(registro.tokens_prompt)
+            if registro.tokens_respuesta is not None:
+                self._tokens_respuesta.observar(registro.tokens_respuesta)
+            if self._traza is not None:
+                self._traza.write(json.dumps({
+                    "fecha": time.time(),
+                    "operacion": registro.operacion,
+                    "backend": registro.backend,
+                    "modelo": registro.modelo,
+                    "resultado": resultado,
+                    "tokens_prompt": registro.tokens_prompt,
+                    "tokens_respuesta": registro.tokens_respuesta,
+                    "segundos": round(registro.segundos, 6),
+                }) + "\n")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con el total de peticiones, los totales por
+            resultado, los contadores por (operacion, backend, modelo,
+            resultado) con sus tokens y segundos, y los histogramas de
+            latencia (por resultado) y de tokens
+        """
+        with self._candado:
+            por_resultado: Dict[str, int] = defaultdict(int)
+            contadores = []
+            for (operacion, backend, modelo, resultado), contador in sorted(
+                self._contadores.items(), key=lambda item: tuple(str(parte) for parte in item[0])
+            ):
+                por_resultado[resultado] += contador["peticiones"]
+                contadores.append({
+                    "operacion": operacion,
+                    "backend": backend,
+                    "modelo": modelo,
+                    "resultado": resultado,
+                    **contador,
+                    "segundos": round(contador["segundos"], 6),
+                })
+            return {
+                "peticiones": sum(por_resultado.values()),
+                "por_resultado": dict(por_resultado),
+                "contadores": contadores,
+                "latencia_segundos": {
+                    resultado: histograma.estadisticas() for resultado, histograma in self._latencia.items()
+                },
+                "tokens_prompt": self._tokens_prompt.estadisticas(),
+                "tokens_respuesta": self._tokens_respuesta.estadisticas(),
+                "traza": self.archivo_traza or None,
+            }
+
+
+METRICAS_LLM = MetricasLLM(ARCHIVO_TRAZA)
@@ -0,0 +1,292 @@
+"""
+Pool de servidores LLM compatibles con OpenAI.
+
+Cada petición va al servidor disponible con menos peticiones en curso
+(empates: el de menor latencia reciente). Un servidor deja de recibir
+peticiones (queda expulsado) mientras:
+  - su interruptor de circuito esté abierto (fallos seguidos de peticiones
+    reales), o
+  - el último sondeo de salud (GET /models, en un hilo aparte cada
+    LLM_SONDEO_SEGUNDOS) haya fallado.
+Vuelve a recibir peticiones cuando el circuito deja pasar la petición de
+prueba o un sondeo responde.
+
+Configuración (LLM_BACKENDS): servidores separados por comas, cada uno
+como `url` o `url|modelo`; sin modelo se usa OPENAI_MODEL. Sin
+LLM_BACKENDS el pool tiene un solo servidor, OPENAI_BASE_URL.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI
+
+# Peso de la última petición en la latencia reciente (media móvil exponencial)
+PESO_LATENCIA_RECIENTE = 0.2
+
+
+def es_fallo_servidor(error: Optional[BaseException]) -> bool:
+    """
+    Indica si un error significa que el servidor no respondió.
+
+    Solo cuentan los errores de conexión, tiempo agotado (APIConnectionError)
+    y 5xx; un 4xx significa que el servidor respondió.
+    """
+    return isinstance(error, APIConnectionError) or (
+        isinstance(error, APIStatusError) and error.status_code >= 500
+    )
+
+
+def leer_backends(configuracion: str, modelo_defecto: str) -> List[Tuple[str, str]]:
+    """
+    Interpreta LLM_BACKENDS.
+
+    Args:
+        configuracion: Texto "url|modelo,url,..."
+        modelo_defecto: Modelo de los servidores sin "|modelo"
+
+    Returns:
+        Lista de pares (url, modelo)
+    """
+    backends = []
+    for entrada in configuracion.split(","):
+        entrada = entrada.strip()
+        if not entrada:
+            continue
+        url, _, modelo = entrada.partition("|")
+        backends.append((url.strip(), modelo.strip() or modelo_defecto))
+    return backends
+
+
+class Backend:
+    """
+    Un servidor del pool: sus clientes, su circuito, su limitador de
+    concurrencia y sus métricas.
+
+    en_curso lo administra PoolBackends (elegir / terminar). Hay un
+    cliente asíncrono por event loop, porque sus conexiones quedan atadas
+    al loop que lo creó; cerrar_cliente_async lo cierra dentro de ese loop
+    (antes de que el loop termine, p. ej. al apagar la aplicación).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        modelo: str,
+        api_key: str,
+        timeout: httpx.Timeout,
+        max_reintentos: int,
+        interruptor,
+        limitador,
+    ):
+        """
+        Args:
+            url: URL base del servidor (.../v1)
+            modelo: Modelo que se pide a este servidor
+            api_key: Clave de la API
+            timeout: Tiempo máximo por intento
+            max_reintentos: Reintentos del cliente ante errores del servidor
+            interruptor: InterruptorCircuito propio de este servidor
+            limitador: LimitadorConcurrencia propio de este servidor
+        """
+        self.url = url
+        self.modelo = modelo
+        self._opciones_cliente = {
+            "base_url": url, "api_key": api_key, "timeout": timeout, "max_retries": max_reintentos
+        }
+        self.cliente = OpenAI(**self._opciones_cliente)
+        self._clientes_async: Dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
+        self.interruptor = interruptor
+        self.limitador = limitador
+        self.sano = True
+        self.error_sondeo: Optional[str] = None
+        self.sondeos_fallidos = 0
+        self.en_curso = 0
+        self.peticiones = 0
+        self.errores = 0
+        self.latencia_total = 0.0
+        self.latencia_maxima = 0.0
+        self.latencia_reciente = 0.0
+
+    @property
+    def cliente_async(self) -> AsyncOpenAI:
+        """Cliente AsyncOpenAI del event loop actual."""
+        loop = asyncio.get_running_loop()
+        cliente = self._clientes_async.get(loop)
+        if cliente is None:
+            cliente = self._clientes_async[loop] = AsyncOpenAI(**self._opciones_cliente)
+        return cliente
+
+    async def cerrar_cliente_async(self) -> None:
+        """Cierra el cliente asíncrono del event loop actual (si lo hay)."""
+        cliente = self._clientes_async.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.close()
+
+    def disponible(self) -> bool:
+        """Indica si el servidor puede recibir peticiones ahora."""
+        return self.sano and self.interruptor.disponible()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Diccionario con url, modelo, disponibilidad, peticiones en curso,
+            contadores, latencias (segundos), el estado de su circuito y el
+            de su limitador de concurrencia
+        """
+        exitosas = self.peticiones - self.errores - self.en_curso
+        return {
+            "url": self.url,
+            "modelo": self.modelo,
+            "disponible": self.disponible(),
+            "sano": self.sano,
+            "error_sondeo": self.error_sondeo,
+            "sondeos_fallidos": self.sondeos_fallidos,
+            "en_curso": self.en_curso,
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "latencia_promedio_segundos": round(self.latencia_total / exitosas, 6) if exitosas else 0.0,
+            "latencia_reciente_segundos": round(self.latencia_reciente, 6),
+            "latencia_maxima_segundos": round(self.latencia_maxima, 6),
+            "circuito": self.interruptor.estadisticas(),
+            "concurrencia": self.limitador.estadisticas(),
+        }
+
+
+class PoolBackends:
+    """
+    Reparte las peticiones entre varios Backend (menos peticiones en curso).
+
+    Uso:
+        backend = pool.elegir()          # None si no hay servidores disponibles
+        try:
+            ... petición con backend.cliente / backend.modelo ...
+        except BaseException as e:
+            pool.terminar(backend, e)
+            raise
+        pool.terminar(backend, None, latencia)
+    """
+
+    def __init__(self, backends: Sequence[Backend], timeout_sondeo: float = 2.0):
+        """
+        Args:
+            backends: Servidores del pool (al menos uno)
+            timeout_sondeo: Tiempo máximo de cada sondeo de salud
+        """
+        self.backends = list(backends)
+        self.timeout_sondeo = timeout_sondeo
+        self._candado = threading.Lock()
+        self._detener_sondeos = threading.Event()
+        self._hilo_sondeos: Optional[threading.Thread] = None
+
+    def disponibles(self, excluir: Sequence[Backend] = ()) -> List[Backend]:
+        """Servidores que pueden recibir peticiones, sin los de `excluir`."""
+        return [backend for backend in self.backends if backend not in excluir and backend.disponible()]
+
+    def elegir(self, excluir: Sequence[Backend] = ()) -> Optional[Backend]:
+        """
+        Reserva el servidor disponible con menos peticiones en curso.
+
+        Args:
+            excluir: Servidores que no deben elegirse (ya intentados)
+
+        Returns:
+            El servidor elegido (con la petición ya contada en en_curso), o
+            None si no hay ninguno disponible
+        """
+        with self._candado:
+            candidatos = sorted(
+                self.disponibles(excluir),
+                key=lambda backend: (backend.en_curso, backend.latencia_reciente),
+            )
+            for backend in candidatos:
+                # Con el circuito semiabierto solo pasa una petición de prueba
+                if backend.interruptor.permitir():
+                    backend.en_curso += 1
+                    backend.peticiones += 1
+                    return backend
+        return None
+
+    def terminar(self, backend: Backend, error: Optional[BaseException], latencia: float = 0.0) -> None:
+        """
+        Registra el resultado de una petición en el servidor y su circuito.
+
+        Una cancelación (asyncio.CancelledError) no cuenta como éxito ni
+        como fallo.
+
+        Args:
+            backend: Servidor que atendió la petición
+            error: Excepción de la petición (None si funcionó)
+            latencia: Segundos que tardó (si funcionó)
+        """
+        with self._candado:
+            backend.en_curso -= 1
+            if error is None:
+                backend.latencia_total += latencia
+                backend.latencia_maxima = max(backend.latencia_maxima, latencia)
+                backend.latencia_reciente = latencia if not backend.latencia_reciente else (
+                    PESO_LATENCIA_RECIENTE * latencia
+                    + (1 - PESO_LATENCIA_RECIENTE) * backend.latencia_reciente
+                )
+            else:
+                backend.errores += 1
+        if error is not None and not isinstance(error, Exception):
+            backend.interruptor.liberar_prueba()
+        elif es_fallo_servidor(error):
+            backend.interruptor.registrar_fallo()
+        else:
+            backend.interruptor.registrar_exito()
+
+    def sondear(self) -> None:
+        """Consulta GET /models en cada servidor y marca si está sano."""
+        for backend in self.backends:
+            try:
+                backend.cliente.with_options(timeout=self.timeout_sondeo, max_retries=0).models.list()
+            except Exception as e:
+                backend.sano = False
+                backend.error_sondeo = f"{type(e).__name__}: {e}"
+                backend.sondeos_fallidos += 1
+            else:
+                backend.sano = True
+                backend.error_sondeo = None
+
+    def iniciar_sondeos(self, intervalo_segundos: float) -> None:
+        """
+        Sondea los servidores cada `intervalo_segundos` en un hilo aparte.
+
+        Args:
+            intervalo_segundos: Segundos entre sondeos (0 o menos: no sondear)
+        """
+        if intervalo_segundos <= 0 or self._hilo_sondeos is not None:
+            return
+        self._detener_sondeos.clear()
+
+        def sondear_periodicamente():
+            while not self._detener_sondeos.is_set():
+                self.sondear()
+                self._detener_sondeos.wait(intervalo_segundos)
+
+        self._hilo_sondeos = threading.Thread(target=sondear_periodicamente, daemon=True)
+        self._hilo_sondeos.start()
+
+    def detener_sondeos(self) -> None:
+        """Detiene el hilo de sondeos (los servidores quedan como estaban)."""
+        if self._hilo_sondeos is None:
+            return
+        self._detener_sondeos.set()
+        self._hilo_sondeos.join(timeout=self.timeout_sondeo + 1)
+        self._hilo_sondeos = None
+
+    async def cerrar_clientes_async(self) -> None:
+        """Cierra los clientes asíncronos de todos los servidores en el event loop actual."""
+        for backend in self.backends:
+            await backend.cerrar_cliente_async()
+
+    def estadisticas(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            Estadísticas de cada servidor, en el orden de configuración
+        """
+        with self._candado:
+            return [backend.estadisticas() for backend in self.backends]
@@ -0,0 +1,189 @@
+"""
+Prompts de clasificación y registro de plantillas versionadas.
+
+Cada PlantillaPrompt arma los mensajes de chat con un prefijo fijo (mensaje
+del sistema y ejemplos) idéntico byte a byte entre peticiones, y agrega al
+final solo lo que cambia: la descripción de la llamada. Así los servidores
+que guardan el caché KV del prefijo (LM Studio, llama.cpp, vLLM) no vuelven a
+procesarlo en cada petición.
+
+Para cambiar un prompt se registra una versión nueva en PLANTILLAS en lugar
+de editar una existente: la versión forma parte de la clave de caché de las
+clasificaciones, así que cambiarla descarta lo memorizado con la anterior.
+Las plantillas que clasifican varias llamadas en una sola petición (lista
+numerada, respuesta en arreglo) se registran aparte en PLANTILLAS_LOTE, con
+versiones propias que forman parte de la clave de sus resultados.
+"""
+
+import os
+from typing import Dict, List, Sequence, Tuple
+
+# Versión 1 (formato original): prompt del sistema para clasificación
+PROMPT_SISTEMA = """Eres un clasificador de llamadas. Tu única tarea es responder con un objeto JSON válido.
+
+FORMATO OBLIGATORIO (responde SOLO esto, sin texto adicional):
+{
+  "clasificacion": "venta"
+}
+
+O:
+{
+  "clasificacion": "soporte"
+}
+
+O:
+{
+  "clasificacion": "reclamo"
+}
+
+Categorías:
+- "venta": ofertas, descuentos, cerrar ventas, promociones, enlaces de pago, planes premium
+- "soporte": problemas técnicos, guías, verificación de servicios, reiniciar equipos, capturas de pantalla
+- "reclamo": quejas, escalación a supervisor, registro de PQR, tono alterado, problemas formales
+
+NO agregues explicaciones. NO uses markdown. Solo el JSON puro."""
+
+PROMPT_CLASIFICACION = """Eres un sistema experto en clasificación de llamadas de call center.
+
+Tu tarea es clasificar cada llamada en una de estas tres categorías:
+- "venta": Cuando la llamada involucra ofrecer productos, cerrar ventas, promociones, descuentos, ofertas comerciales
+- "soporte": Cuando la llamada involucra resolver problemas técnicos, guiar al cliente, verificar servicios, solicitar información técnica
+- "reclamo": Cuando la llamada involucra quejas, escalación a supervisor, registro de PQR, problemas que requieren seguimiento formal
+
+IMPORTANTE: Debes responder ÚNICAMENTE con un objeto JSON válido en este formato exacto:
+{
+  "clasificacion": "venta"
+}
+
+O:
+{
+  "clasificacion": "soporte"
+}
+
+O:
+{
+  "clasificacion": "reclamo"
+}
+
+NO agregues texto adicional, explicaciones, ni nada más. Solo el JSON.
+
+Clasifica la siguiente llamada:"""
+
+# Prompts para clasificar varias llamadas en una sola petición al LLM
+PROMPT_SISTEMA_LOTE = """Eres un clasificador de llamadas. Tu única tarea es responder con un arreglo JSON válido.
+
+NO agregues explicaciones. NO uses markdown. Solo el JSON puro."""
+
+PROMPT_CLASIFICACION_LOTE = """Eres un sistema experto en clasificación de llamadas de call center.
+
+Clasifica CADA llamada de la lista en una de estas tres categorías:
+- "venta": Cuando la llamada involucra ofrecer productos, cerrar ventas, promociones, descuentos, ofertas comerciales
+- "soporte": Cuando la llamada involucra resolver problemas técnicos, guiar al cliente, verificar servicios, solicitar información técnica
+- "reclamo": Cuando la llamada involucra quejas, escalación a supervisor, registro de PQR, problemas que requieren seguimiento formal
+
+IMPORTANTE: Debes responder ÚNICAMENTE con un arreglo JSON con un objeto por llamada, usando el número de la llamada como "id":
+[
+  {"id": 1, "clasificacion": "venta"},
+  {"id": 2, "clasificacion": "reclamo"}
+]
+
+NO agregues texto adicional, explicaciones, ni nada más. Solo el JSON.
+
+Clasifica las siguientes llamadas:"""
+
+
+# Versión 2: instrucciones una sola vez en el sistema, ejemplos como turnos
+# previos y la descripción sola en el último mensaje
+PROMPT_SISTEMA_V2 = """Eres un clasificador de llamadas de call center. Clasifica cada llamada en una de estas categorías:
+- "venta": ofrecer productos, cerrar ventas, promociones, descuentos, ofertas comerciales, enlaces de pago, planes premium
+- "soporte": problemas técnicos, guiar al cliente, verificar servicios, reiniciar equipos, solicitar información técnica
+- "reclamo": quejas, escalación a supervisor, registro de PQR, tono alterado, problemas que requieren seguimiento formal
+
+Responde ÚNICAMENTE con un objeto JSON: {"clasificacion": "venta"}, {"clasificacion": "soporte"} o {"clasificacion": "reclamo"}. Sin explicaciones ni markdown."""
+
+EJEMPLOS_V2 = (
+    ("Ofrecer plan premium con descuento del 10%", "venta"),
+    ("Tipo de llamada: soporte. Resultado: resuelta. Duración: 240 segundos", "soporte"),
+    ("Escalar a supervisor por tono alterado", "reclamo"),
+)
+
+
+class PlantillaPrompt:
+    """
+    Plantilla de mensajes para clasificar una descripción.
+
+    El prefijo (sistema, ejemplos e instrucción previa a la descripción) se
+    construye una vez; mensajes() solo agrega la descripción.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        sistema: str,
+        ejemplos: Sequence[Tuple[str, str]] = (),
+        instruccion: str = ""
+    ):
+        """
+        Args:
+            version: Identificador de la versión (parte de la clave de caché)
+            sistema: Contenido del mensaje del sistema
+            ejemplos: Pares (descripción, categoría) enviados como turnos previos
+            instruccion: Texto que precede a la descripción en el último mensaje
+        """
+        self.version = version
+        self.instruccion = instruccion
+        prefijo = [{"role": "system", "content": sistema}]
+        for descripcion, categoria in ejemplos:
+            prefijo.append({"role": "user", "content": f"{instruccion}{descripcion}"})
+            prefijo.append({"role": "assistant", "content": f'{{"clasificacion": "{categoria}"}}'})
+        self.prefijo: Tuple[Dict[str, str], ...] = tuple(prefijo)
+
+    def mensajes(self, descripcion: str) -> List[Dict[str, str]]:
+        """
+        Mensajes de chat para clasificar una descripción.
+
+        Args:
+            descripcion: Descripción de la llamada
+
+        Returns:
+            Prefijo fijo seguido del mensaje con la descripción
+        """
+        return [*self.prefijo, {"role": "user", "content": f"{self.instruccion}{descripcion}"}]
+
+
+PLANTILLAS: Dict[str, PlantillaPrompt] = {
+    # Formato original: instrucciones repetidas en el sistema y en el mensaje
+    "v1": PlantillaPrompt("v1", PROMPT_SISTEMA, instruccion=f"{PROMPT_CLASIFICACION}\n\n"),
+    "v2": PlantillaPrompt("v2", PROMPT_SISTEMA_V2, ejemplos=EJEMPLOS_V2),
+}
+
+
+# Plantillas para varias llamadas por petición: la descripción es la lista
+# numerada de llamadas (ver clasificar_llamadas_lote_async)
+PLANTILLAS_LOTE: Dict[str, PlantillaPrompt] = {
+    "lote-v1": PlantillaPrompt("lote-v1", PROMPT_SISTEMA_LOTE, instruccion=f"{PROMPT_CLASIFICACION_LOTE}\n\n"),
+}
+
+
+def obtener_plantilla(version: str, plantillas: Dict[str, PlantillaPrompt] = PLANTILLAS) -> PlantillaPrompt:
+    """
+    Plantilla registrada para una versión.
+
+    Args:
+        version: Clave en el registro
+        plantillas: Registro donde buscarla (PLANTILLAS o PLANTILLAS_LOTE)
+
+    Returns:
+        PlantillaPrompt
+
+    Raises:
+        ValueError: Si la versión no está registrada
+    """
+    if version not in plantillas:
+        raise ValueError(f"Versión de prompt desconocida: {version} (disponibles: {', '.join(plantillas)})")
+    return plantillas[version]
+
+
+# Versiones usadas por el servicio de clasificación
+PLANTILLA_CLASIFICACION = obtener_plantilla(os.getenv("LLM_VERSION_PROMPT", "v2"))
+PLANTILLA_LOTE = obtener_plantilla(os.getenv("LLM_VERSION_PROMPT_LOTE", "lote-v1"), PLANTILLAS_LOTE)
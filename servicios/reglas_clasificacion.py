@@ -0,0 +1,217 @@
+"""
+Clasificación de textos por palabras clave, antes de consultar al LLM.
+
+Las palabras clave de cada categoría se compilan en una sola expresión
+regular (una alternativa por palabra), así cada texto se recorre una sola
+vez sin importar cuántas palabras haya. Si una categoría domina claramente
+el texto se responde sin LLM; los textos ambiguos o sin coincidencias
+siguen al LLM.
+
+Contadores (ESTADISTICAS_REGLAS):
+  - tasa_reglas: fracción de textos respondidos por reglas
+  - acuerdo_llm: en textos enviados al LLM donde las reglas tenían una
+    categoría candidata, fracción en que el LLM eligió la misma
+  - acuerdo_verificacion: en la muestra de textos resueltos por reglas que
+    también se envían al LLM (REGLAS_MUESTREO_VERIFICACION), fracción en
+    que coincidieron. La respuesta sigue siendo la de las reglas.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+# Palabras clave por categoría (también ajustan la confianza de las respuestas del LLM).
+# Se comparan como palabras completas, así que los plurales y las demás formas
+# que deban contar se listan explícitamente.
+PALABRAS_CLAVE = {
+    "venta": [
+        "oferta", "ofertas", "descuento", "descuentos", "plan", "planes", "premium",
+        "venta", "ventas", "promoción", "promociones", "pago", "pagos", "comprar", "compra",
+    ],
+    "soporte": [
+        "reiniciar", "reinicio", "módem", "modems", "error", "errores", "problema", "problemas",
+        "técnico", "técnicos", "técnica", "verificar", "cobertura", "solicitar",
+    ],
+    "reclamo": [
+        "escalar", "escalado", "supervisor", "pqr", "pqrs", "queja", "quejas",
+        "reclamo", "reclamos", "tono alterado", "radicado",
+    ],
+}
+
+# Responder por reglas ("0" para enviar siempre al LLM)
+REGLAS_ACTIVAS = os.getenv("REGLAS_CLASIFICACION", "1") == "1"
+
+# Coincidencias mínimas de la categoría ganadora. Con una sola palabra clave
+# no alcanza: puede ser incidental o estar negada ("no quiere ninguna oferta").
+MIN_COINCIDENCIAS = int(os.getenv("REGLAS_MIN_COINCIDENCIAS", "2"))
+
+# La categoría ganadora debe tener más de DOMINANCIA veces las coincidencias de la
+# segunda (sin segunda, siempre domina)
+DOMINANCIA = float(os.getenv("REGLAS_DOMINANCIA", "2.0"))
+
+# Fracción de respuestas por reglas que también se envían al LLM para medir acuerdo
+MUESTREO_VERIFICACION = float(os.getenv("REGLAS_MUESTREO_VERIFICACION", "0.0"))
+
+CONFIANZA_REGLAS = 0.85
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes, para comparar palabras sin importar cómo se escribieron."""
+    descompuesto = unicodedata.normalize("NFD", texto.lower())
+    return "".join(caracter for caracter in descompuesto if unicodedata.category(caracter) != "Mn")
+
+
+# Palabra normalizada -> categoría
+_CATEGORIA_POR_PALABRA = {
+    normalizar_texto(palabra): categoria
+    for categoria, palabras in PALABRAS_CLAVE.items()
+    for palabra in palabras
+}
+
+# Una sola expresión con todas las palabras; las más largas primero para que
+# ganen sobre sus prefijos. Se exige límite de palabra a ambos lados, así
+# "ventajas" no cuenta como "venta" ni "planta" como "plan".
+_PATRON_PALABRAS = re.compile(
+    r"\b(" + "|".join(
+        re.escape(palabra) for palabra in sorted(_CATEGORIA_POR_PALABRA, key=len, reverse=True)
+    ) + r")\b"
+)
+
+
+def puntajes_reglas(texto: str) -> Counter:
+    """
+    Cuenta las palabras clave de cada categoría presentes en el texto.
+
+    Args:
+        texto: Descripción de la llamada
+
+    Returns:
+        Counter {categoría: coincidencias}
+    """
+    return Counter(
+        _CATEGORIA_POR_PALABRA[coincidencia.group(1)]
+        for coincidencia in _PATRON_PALABRAS.finditer(normalizar_texto(texto))
+    )
+
+
+def clasificar_por_reglas(texto: str) -> Tuple[Optional[str], bool]:
+    """
+    Clasifica un texto por sus palabras clave.
+
+    Args:
+        texto: Descripción de la llamada
+
+    Returns:
+        (categoría candidata, decisiva). La candidata es la de más
+        coincidencias (None si no hay o hay empate). Es decisiva cuando tiene
+        al menos MIN_COINCIDENCIAS y más de DOMINANCIA veces las coincidencias
+        de la segunda.
+    """
+    puntajes = puntajes_reglas(texto).most_common(2)
+    if not puntajes:
+        return None, False
+    categoria, coincidencias = puntajes[0]
+    segunda = puntajes[1][1] if len(puntajes) > 1 else 0
+    if coincidencias == segunda:
+        return None, False
+    decisiva = (
+        REGLAS_ACTIVAS
+        and coincidencias >= MIN_COINCIDENCIAS
+        and coincidencias > DOMINANCIA * segunda
+    )
+    return categoria, decisiva
+
+
+class EstadisticasReglas:
+    """
+    Contadores de las rutas de un texto (reglas, caché de clasificaciones
+    anteriores y LLM), seguros entre hilos.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.limpiar()
+
+    def limpiar(self) -> None:
+        """Reinicia los contadores."""
+        with self._candado:
+            self.consultas = 0
+            self.respuestas_reglas = 0
+            self.respuestas_cache = 0
+            self.respuestas_llm = 0
+            self.comparadas_llm = 0
+            self.coincidencias_llm = 0
+            self.verificadas = 0
+            self.coincidencias_verificadas = 0
+
+    def registrar_reglas(self) -> None:
+        """Un texto respondido por reglas."""
+        with self._candado:
+            self.consultas += 1
+            self.respuestas_reglas += 1
+
+    def registrar_cache(self) -> None:
+        """Un texto respondido desde la caché (clasificado antes por el LLM)."""
+        with self._candado:
+            self.consultas += 1
+            self.respuestas_cache += 1
+
+    def registrar_llm(self, candidata: Optional[str], categoria_llm: Optional[str]) -> None:
+        """
+        Un texto enviado al LLM.
+
+        Args:
+            candidata: Categoría candidata de las reglas (None si no había)
+            categoria_llm: Categoría elegida por el LLM (None si falló)
+        """
+        with self._candado:
+            self.consultas += 1
+            self.respuestas_llm += 1
+            if candidata is not None and categoria_llm is not None:
+                self.comparadas_llm += 1
+                self.coincidencias_llm += candidata == categoria_llm
+
+    def registrar_verificacion(self, categoria_reglas: str, categoria_llm: Optional[str]) -> None:
+        """
+        Un texto respondido por reglas que también se envió al LLM (muestreo).
+
+        Args:
+            categoria_reglas: Categoría de las reglas
+            categoria_llm: Categoría elegida por el LLM (None si falló)
+        """
+        with self._candado:
+            self.consultas += 1
+            self.respuestas_reglas += 1
+            if categoria_llm is not None:
+                self.verificadas += 1
+                self.coincidencias_verificadas += categoria_reglas == categoria_llm
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Contadores y tasas.
+
+        Returns:
+            Diccionario con consultas, respuestas por cada ruta, tasa_reglas,
+            acuerdo_llm y acuerdo_verificacion (con sus totales)
+        """
+        with self._candado:
+            return {
+                "activas": REGLAS_ACTIVAS,
+                "consultas": self.consultas,
+                "respuestas_reglas": self.respuestas_reglas,
+                "respuestas_cache": self.respuestas_cache,
+                "respuestas_llm": self.respuestas_llm,
+                "tasa_reglas": self.respuestas_reglas / self.consultas if self.consultas else 0.0,
+                "comparadas_llm": self.comparadas_llm,
+                "acuerdo_llm": self.coincidencias_llm / self.comparadas_llm if self.comparadas_llm else None,
+                "verificadas": self.verificadas,
+                "acuerdo_verificacion": (
+                    self.coincidencias_verificadas / self.verificadas if self.verificadas else None
+                ),
+            }
+
+
+ESTADISTICAS_REGLAS = EstadisticasReglas()
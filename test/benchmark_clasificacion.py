@@ -0,0 +1,230 @@
+"""
+Benchmark reproducible del clasificador contra un LLM stub local.
+
+Arranca un servidor compatible con OpenAI (test/stub_openai.py) con la
+latencia, jitter y tasa de respuestas malformadas indicadas, y clasifica el
+corpus etiquetado (test/corpus_clasificacion.json) con
+clasificar_texto_llamada y clasificar_llamada_con_ia a cada nivel de
+concurrencia. Reporta por nivel:
+  - rendimiento (clasificaciones por segundo)
+  - latencia p50 / p95 / p99 por clasificación
+  - tasa de fallback (respuestas de respaldo porque el LLM falló)
+  - exactitud contra las etiquetas del corpus
+
+Antes de medir se abren las conexiones con peticiones de calentamiento, y
+las cachés de clasificaciones se vacían antes de cada nivel (la persistente
+usa un archivo temporal, no el de data/). Toda la
+configuración del clasificador (reglas, streaming, motor de textos, etc.)
+se toma de las variables de entorno de siempre, así que para medir una
+optimización se corre dos veces, con y sin ella:
+
+    python test/benchmark_clasificacion.py --guardar base.json
+    LLM_STREAMING_CLASIFICACION=1 python test/benchmark_clasificacion.py --comparar base.json
+
+No necesita LM Studio.
+
+Uso:
+    python test/benchmark_clasificacion.py [--concurrencias 1,4,16] [--repeticiones 1]
+        [--latencia 0.05] [--jitter 0.02] [--tasa-malformadas 0.05] [--semilla 7]
+        [--modo hilos|async] [--guardar resultados.json] [--comparar base.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_openai import iniciar_stub
+
+RUTA_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus_clasificacion.json")
+
+# Los resultados de respaldo (_fallback_llamada, _fallback_texto) tienen
+# confianza 0.60 o 0.70; los normales, 0.80 o más
+CONFIANZA_MAXIMA_FALLBACK = 0.70
+
+
+def argumentos():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrencias", default="1,4,16")
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--latencia", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--tasa-malformadas", type=float, default=0.05)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--modo", choices=("hilos", "async"), default="hilos")
+    parser.add_argument("--guardar", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="Resultados JSON de una corrida anterior")
+    return parser.parse_args()
+
+
+ARGS = argumentos()
+CONCURRENCIAS = [int(nivel) for nivel in ARGS.concurrencias.split(",")]
+STUB = iniciar_stub(
+    latencia=ARGS.latencia, jitter=ARGS.jitter, tasa_malformadas=ARGS.tasa_malformadas, semilla=ARGS.semilla
+)
+
+# El clasificador debe apuntar al stub antes de importarse
+os.environ["LLM_BACKENDS"] = STUB.url
+os.environ.setdefault("LLM_MAX_CONCURRENCIA", str(max(CONCURRENCIAS)))
+DIRECTORIO_TEMPORAL = tempfile.TemporaryDirectory()
+os.environ["CLASIFICACION_CACHE_PERSISTENTE_ARCHIVO"] = os.path.join(DIRECTORIO_TEMPORAL.name, "cache.db")
+
+from servicios.clasificacion_ia import (
+    CACHE_CLASIFICACION,
+    CACHE_PERSISTENTE,
+    CACHE_TEXTOS,
+    clasificar_llamada_con_ia,
+    clasificar_llamada_con_ia_async,
+    clasificar_texto_llamada,
+    clasificar_texto_llamada_async,
+)
+
+
+# Un solo event loop para todo el modo async, así los clientes y sus
+# conexiones se reutilizan entre niveles como en el servidor
+LOOP = asyncio.new_event_loop()
+
+
+def percentil(valores: list, porcentaje: float) -> float:
+    """Percentil por el método del rango más cercano (valores ya ordenados)."""
+    indice = max(int(round(porcentaje / 100 * len(valores))) - 1, 0)
+    return valores[min(indice, len(valores) - 1)]
+
+
+def cargas_de_trabajo(corpus: dict) -> dict:
+    """Por carga: lista de (función síncrona, función async, argumentos, etiqueta)."""
+    return {
+        "textos": [
+            (clasificar_texto_llamada, clasificar_texto_llamada_async, (ejemplo["texto"],), ejemplo["categoria"])
+            for ejemplo in corpus["textos"]
+        ],
+        "llamadas": [
+            (
+                clasificar_llamada_con_ia,
+                clasificar_llamada_con_ia_async,
+                (ejemplo["tipo"], ejemplo["resultado"], "", ejemplo["duracion_segundos"]),
+                ejemplo["categoria"],
+            )
+            for ejemplo in corpus["llamadas"]
+        ],
+    }
+
+
+def medir_una(funcion, argumentos_funcion: tuple) -> tuple:
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos_funcion)
+    return resultado, time.perf_counter() - inicio
+
+
+async def medir_una_async(funcion, argumentos_funcion: tuple, semaforo: asyncio.Semaphore) -> tuple:
+    async with semaforo:
+        inicio = time.perf_counter()
+        resultado = await funcion(*argumentos_funcion)
+        return resultado, time.perf_counter() - inicio
+
+
+async def correr_async(trabajos: list, concurrencia: int) -> list:
+    semaforo = asyncio.Semaphore(concurrencia)
+    return await asyncio.gather(
+        *(medir_una_async(funcion_async, argumentos_funcion, semaforo)
+          for _, funcion_async, argumentos_funcion, _ in trabajos)
+    )
+
+
+def medir(trabajos: list, concurrencia: int) -> dict:
+    """Clasifica todos los trabajos con `concurrencia` peticiones simultáneas."""
+    CACHE_CLASIFICACION.limpiar()
+    CACHE_TEXTOS.limpiar()
+    CACHE_PERSISTENTE.limpiar()
+    peticiones_antes = STUB.peticiones
+    inicio = time.perf_counter()
+    if ARGS.modo == "async":
+        medidas = LOOP.run_until_complete(correr_async(trabajos, concurrencia))
+    else:
+        with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+            medidas = list(ejecutor.map(
+                lambda trabajo: medir_una(trabajo[0], trabajo[2]), trabajos
+            ))
+    total = time.perf_counter() - inicio
+
+    latencias = sorted(latencia for _, latencia in medidas)
+    fallbacks = sum(resultado["confianza"] <= CONFIANZA_MAXIMA_FALLBACK for resultado, _ in medidas)
+    correctas = sum(
+        resultado["categoria"] == etiqueta for (resultado, _), (_, _, _, etiqueta) in zip(medidas, trabajos)
+    )
+    return {
+        "clasificaciones": len(medidas),
+        "peticiones_llm": STUB.peticiones - peticiones_antes,
+        "por_segundo": len(medidas) / total,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "tasa_fallback": fallbacks / len(medidas),
+        "exactitud": correctas / len(medidas),
+    }
+
+
+def calentar() -> None:
+    """Abre tantas conexiones con el stub como el nivel de concurrencia más alto."""
+    trabajos = [
+        (clasificar_texto_llamada, clasificar_texto_llamada_async, (f"calentamiento {numero}",), "soporte")
+        for numero in range(max(CONCURRENCIAS))
+    ]
+    medir(trabajos, max(CONCURRENCIAS))
+
+
+def imprimir(carga: str, concurrencia: int, resultado: dict, base: dict = None) -> None:
+    linea = (
+        f"{carga:9} c={concurrencia:<3d} {resultado['por_segundo']:8.1f}/s"
+        f"  p50 {resultado['p50_ms']:7.1f}  p95 {resultado['p95_ms']:7.1f}  p99 {resultado['p99_ms']:7.1f} ms"
+        f"  fallback {resultado['tasa_fallback']:6.1%}  exactitud {resultado['exactitud']:6.1%}"
+        f"  LLM {resultado['peticiones_llm']:4d}"
+    )
+    if base:
+        linea += (
+            f"  | Δ {resultado['por_segundo'] - base['por_segundo']:+.1f}/s"
+            f"  p95 {resultado['p95_ms'] - base['p95_ms']:+.1f} ms"
+            f"  exactitud {(resultado['exactitud'] - base['exactitud']) * 100:+.1f} pp"
+        )
+    print(linea)
+
+
+def main():
+    with open(RUTA_CORPUS, encoding="utf-8") as archivo:
+        cargas = cargas_de_trabajo(json.load(archivo))
+    base = {}
+    if ARGS.comparar:
+        with open(ARGS.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)["resultados"]
+
+    print("=" * 60)
+    print(
+        f"BENCHMARK CLASIFICADOR (stub: latencia {ARGS.latencia} s, jitter {ARGS.jitter} s,"
+        f" malformadas {ARGS.tasa_malformadas:.0%}, modo {ARGS.modo})"
+    )
+    print("=" * 60)
+
+    calentar()
+    resultados = {}
+    for carga, trabajos in cargas.items():
+        for concurrencia in CONCURRENCIAS:
+            clave = f"{carga}/{concurrencia}"
+            resultados[clave] = medir(trabajos * ARGS.repeticiones, concurrencia)
+            imprimir(carga, concurrencia, resultados[clave], base.get(clave))
+
+    if ARGS.guardar:
+        with open(ARGS.guardar, "w", encoding="utf-8") as archivo:
+            json.dump({"configuracion": vars(ARGS), "resultados": resultados}, archivo, indent=2)
+        print(f"\nResultados guardados en {ARGS.guardar}")
+    STUB.detener()
+
+
+if __name__ == "__main__":
+    main()
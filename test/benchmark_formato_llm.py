@@ -0,0 +1,105 @@
+"""
+Benchmark de respuestas del LLM: formato libre vs. restringido.
+
+Envía las mismas descripciones al servidor configurado (OPENAI_BASE_URL,
+OPENAI_MODEL) de dos formas:
+  - libre: como antes, sin response_format ni max_tokens
+  - restringido: con el JSON schema de las categorías y
+    LLM_MAX_TOKENS_CLASIFICACION (ver _opciones_clasificacion)
+
+Reporta tokens de respuesta, latencia y respuestas que no se pudieron
+interpretar. Requiere el LLM en ejecución (LM Studio).
+
+Uso:
+    python test/benchmark_formato_llm.py [--repeticiones 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicios.llm import CLIENT, MODELO, TEMPERATURA
+from servicios.clasificacion_ia import (
+    _mensajes_clasificacion,
+    _opciones_clasificacion,
+    _parsear_clasificacion,
+)
+
+DESCRIPCIONES = [
+    "Ofrecer plan premium con descuento del 10%",
+    "Guiar al cliente a reiniciar el módem de Claro",
+    "Escalar a supervisor por tono alterado",
+    "Enviar enlace de pago por WhatsApp",
+    "Verificar cobertura en zona rural de Pitalito",
+    "Registrar PQR y confirmar número de radicado",
+    "Cerrar venta con oferta 2x1 en datos",
+    "Solicitar captura de pantalla del error",
+]
+
+
+def medir(opciones: dict, repeticiones: int) -> dict:
+    """Clasifica todas las descripciones `repeticiones` veces con las opciones dadas."""
+    latencias = []
+    tokens_respuesta = []
+    invalidas = 0
+    for _ in range(repeticiones):
+        for descripcion in DESCRIPCIONES:
+            inicio = time.perf_counter()
+            response = CLIENT.chat.completions.create(
+                model=MODELO,
+                messages=_mensajes_clasificacion(descripcion),
+                temperature=TEMPERATURA,
+                **opciones
+            )
+            latencias.append(time.perf_counter() - inicio)
+            if response.usage is not None:
+                tokens_respuesta.append(response.usage.completion_tokens)
+            try:
+                _parsear_clasificacion(response.choices[0].message.content or "")
+            except ValueError:
+                invalidas += 1
+    return {
+        "latencia_promedio": statistics.mean(latencias),
+        "latencia_p95": sorted(latencias)[int(len(latencias) * 0.95) - 1],
+        "tokens_promedio": statistics.mean(tokens_respuesta) if tokens_respuesta else 0.0,
+        "invalidas": invalidas,
+        "total": len(latencias),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"BENCHMARK FORMATO DE RESPUESTA ({MODELO})")
+    print("=" * 60)
+
+    # Calentamiento: la primera petición abre la conexión
+    CLIENT.chat.completions.create(
+        model=MODELO, messages=_mensajes_clasificacion(DESCRIPCIONES[0]), max_tokens=1
+    )
+
+    libre = medir({}, args.repeticiones)
+    restringido = medir(_opciones_clasificacion(), args.repeticiones)
+
+    for nombre, resultado in (("Libre", libre), ("Restringido", restringido)):
+        print(
+            f"{nombre:12} latencia prom {resultado['latencia_promedio'] * 1000:8.1f} ms"
+            f"  p95 {resultado['latencia_p95'] * 1000:8.1f} ms"
+            f"  tokens resp {resultado['tokens_promedio']:6.1f}"
+            f"  inválidas {resultado['invalidas']}/{resultado['total']}"
+        )
+
+    print("-" * 60)
+    print(f"Tokens de respuesta ahorrados por llamada: {libre['tokens_promedio'] - restringido['tokens_promedio']:.1f}")
+    print(f"Latencia ahorrada por llamada: {(libre['latencia_promedio'] - restringido['latencia_promedio']) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
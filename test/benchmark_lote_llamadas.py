@@ -0,0 +1,91 @@
+"""
+Benchmark de registro de llamadas: una por una vs. en lote.
+
+Compara crear_llamada (consulta del usuario + INSERT + COMMIT + refresh por
+llamada) contra crear_llamadas_lote (una consulta IN + un executemany + un
+COMMIT) sobre una base SQLite temporal con PERFIL_SQLITE.
+
+Uso:
+    python test/benchmark_lote_llamadas.py [--llamadas 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+from modelos import Base, Usuario
+from modelos.database import crear_motor
+from esquemas import LlamadaCreate
+from crud.llamada import crear_llamada, crear_llamadas_lote
+
+
+def generar_llamadas(cantidad: int) -> list:
+    """Genera llamadas de prueba repartidas entre dos agentes."""
+    return [
+        LlamadaCreate(
+            usuario_id=1 + i % 2,
+            numero_cliente=f"300{i:07d}",
+            duracion_segundos=30 + i % 300,
+            tipo=("venta", "soporte", "reclamo")[i % 3],
+            resultado=("atendida", "resuelta", "escalada", "colgada")[i % 4],
+            fecha_hora=f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00",
+        )
+        for i in range(cantidad)
+    ]
+
+
+def nueva_base(directorio: str, nombre: str):
+    """Crea una base vacía con dos agentes y retorna su fábrica de sesiones."""
+    motor = crear_motor(f"sqlite:///{os.path.join(directorio, nombre)}")
+    Base.metadata.create_all(motor)
+    Sesion = sessionmaker(bind=motor, autoflush=False)
+    with Sesion() as db:
+        db.add_all([
+            Usuario(nombre="Agente 1", email="a1@example.com", password="x", rol="agente"),
+            Usuario(nombre="Agente 2", email="a2@example.com", password="x", rol="agente"),
+        ])
+        db.commit()
+    return motor, Sesion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llamadas", type=int, default=2000)
+    args = parser.parse_args()
+
+    llamadas = generar_llamadas(args.llamadas)
+
+    print("=" * 60)
+    print(f"BENCHMARK REGISTRO DE {args.llamadas} LLAMADAS")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        motor, Sesion = nueva_base(directorio, "por_fila.db")
+        inicio = time.perf_counter()
+        with Sesion() as db:
+            for llamada in llamadas:
+                crear_llamada(db, llamada)
+        por_fila = time.perf_counter() - inicio
+        motor.dispose()
+
+        motor, Sesion = nueva_base(directorio, "lote.db")
+        inicio = time.perf_counter()
+        with Sesion() as db:
+            resultados = crear_llamadas_lote(db, llamadas)
+        lote = time.perf_counter() - inicio
+        motor.dispose()
+
+    assert all(resultado["ok"] for resultado in resultados)
+
+    print(f"Una por una: {por_fila:8.3f}s  ({args.llamadas / por_fila:10.1f} llamadas/s)")
+    print(f"En lote:     {lote:8.3f}s  ({args.llamadas / lote:10.1f} llamadas/s)")
+    print(f"Aceleración: {por_fila / lote:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
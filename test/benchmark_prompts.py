@@ -0,0 +1,128 @@
+"""
+Benchmark de plantillas de prompt (servicios/prompts.py).
+
+Envía las mismas descripciones con cada versión registrada en PLANTILLAS y
+reporta tokens de prompt, tokens de prompt reutilizados del caché del
+servidor (usage.prompt_tokens_details.cached_tokens, si el servidor lo
+informa) y latencia. También verifica que el prefijo de cada plantilla sea
+idéntico byte a byte entre descripciones distintas.
+
+Las peticiones usan _opciones_clasificacion (salida restringida), así la
+diferencia de latencia viene del prompt. Requiere el LLM en ejecución.
+
+Uso:
+    python test/benchmark_prompts.py [--repeticiones 3]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicios.llm import CLIENT, MODELO, TEMPERATURA
+from servicios.prompts import PLANTILLAS
+from servicios.clasificacion_ia import _opciones_clasificacion, _parsear_clasificacion
+
+DESCRIPCIONES = [
+    "Ofrecer plan premium con descuento del 10%",
+    "Guiar al cliente a reiniciar el módem de Claro",
+    "Escalar a supervisor por tono alterado",
+    "Enviar enlace de pago por WhatsApp",
+    "Tipo de llamada: soporte. Resultado: escalada. Duración: 320 segundos",
+    "Registrar PQR y confirmar número de radicado",
+    "Tipo de llamada: venta. Resultado: atendida. Duración: 95 segundos",
+    "Solicitar captura de pantalla del error",
+]
+
+
+def prefijo_estable(plantilla) -> int:
+    """Bytes iniciales comunes a los mensajes de todas las descripciones."""
+    serializados = [
+        json.dumps(plantilla.mensajes(descripcion), ensure_ascii=False).encode()
+        for descripcion in DESCRIPCIONES
+    ]
+    # El prefijo de la plantilla (todo menos el último mensaje) no debe cambiar
+    assert all(
+        plantilla.mensajes(descripcion)[:-1] == list(plantilla.prefijo) for descripcion in DESCRIPCIONES
+    ), f"El prefijo de {plantilla.version} cambia entre peticiones"
+    return len(os.path.commonprefix(serializados))
+
+
+def medir(plantilla, repeticiones: int) -> dict:
+    """Clasifica todas las descripciones `repeticiones` veces con la plantilla."""
+    latencias = []
+    tokens_prompt = []
+    tokens_cache = []
+    invalidas = 0
+    for _ in range(repeticiones):
+        for descripcion in DESCRIPCIONES:
+            inicio = time.perf_counter()
+            response = CLIENT.chat.completions.create(
+                model=MODELO,
+                messages=plantilla.mensajes(descripcion),
+                temperature=TEMPERATURA,
+                **_opciones_clasificacion()
+            )
+            latencias.append(time.perf_counter() - inicio)
+            if response.usage is not None:
+                tokens_prompt.append(response.usage.prompt_tokens)
+                detalles = response.usage.prompt_tokens_details
+                tokens_cache.append((detalles.cached_tokens or 0) if detalles else 0)
+            try:
+                _parsear_clasificacion(response.choices[0].message.content or "")
+            except ValueError:
+                invalidas += 1
+    return {
+        "latencia_promedio": statistics.mean(latencias),
+        "tokens_prompt": statistics.mean(tokens_prompt) if tokens_prompt else 0.0,
+        "tokens_cache": statistics.mean(tokens_cache) if tokens_cache else 0.0,
+        "invalidas": invalidas,
+        "total": len(latencias),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"BENCHMARK PLANTILLAS DE PROMPT ({MODELO})")
+    print("=" * 60)
+
+    resultados = {}
+    for version, plantilla in PLANTILLAS.items():
+        bytes_prefijo = prefijo_estable(plantilla)
+        # Calentamiento: carga el prefijo de esta plantilla en el caché del servidor
+        CLIENT.chat.completions.create(
+            model=MODELO, messages=plantilla.mensajes(DESCRIPCIONES[0]), max_tokens=1
+        )
+        resultados[version] = medir(plantilla, args.repeticiones)
+        resultado = resultados[version]
+        print(
+            f"{version:4} prefijo {bytes_prefijo:5d} B"
+            f"  tokens prompt {resultado['tokens_prompt']:7.1f}"
+            f"  en caché {resultado['tokens_cache']:7.1f}"
+            f"  latencia prom {resultado['latencia_promedio'] * 1000:8.1f} ms"
+            f"  inválidas {resultado['invalidas']}/{resultado['total']}"
+        )
+
+    if "v1" in resultados and len(resultados) > 1:
+        print("-" * 60)
+        base = resultados["v1"]
+        for version, resultado in resultados.items():
+            if version == "v1":
+                continue
+            print(
+                f"{version} vs v1: tokens prompt {resultado['tokens_prompt'] - base['tokens_prompt']:+.1f}"
+                f"  sin caché {(resultado['tokens_prompt'] - resultado['tokens_cache']) - (base['tokens_prompt'] - base['tokens_cache']):+.1f}"
+                f"  latencia {(resultado['latencia_promedio'] - base['latencia_promedio']) * 1000:+.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark de lectura/escritura concurrente sobre SQLite.
+
+Compara el motor sin PRAGMA (journal por defecto) contra PERFIL_SQLITE
+(WAL, mmap, caché, busy_timeout) con una carga mixta: varios hilos registran
+llamadas mientras otros listan llamadas como lo haría el dashboard.
+
+Uso:
+    python test/benchmark_sqlite.py [--segundos 5] [--escritores 4] [--lectores 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+from modelos import Base, Usuario
+from modelos.database import crear_motor, PERFIL_SQLITE
+from esquemas import LlamadaCreate
+from crud.llamada import crear_llamada, obtener_llamadas
+
+
+def preparar_base(motor, llamadas_iniciales: int) -> None:
+    """Crea las tablas, un agente y un historial inicial de llamadas."""
+    Base.metadata.create_all(motor)
+    Sesion = sessionmaker(bind=motor, autoflush=False)
+    with Sesion() as db:
+        db.add(Usuario(nombre="Agente", email="agente@example.com", password="x", rol="agente"))
+        db.commit()
+        for i in range(llamadas_iniciales):
+            crear_llamada(db, _llamada(i))
+
+
+def _llamada(i: int) -> LlamadaCreate:
+    return LlamadaCreate(
+        usuario_id=1,
+        numero_cliente=f"300{i:07d}",
+        duracion_segundos=30 + i % 300,
+        tipo=("venta", "soporte", "reclamo")[i % 3],
+        resultado=("atendida", "resuelta", "escalada", "colgada")[i % 4],
+        fecha_hora=f"2025-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00",
+    )
+
+
+def ejecutar_carga(motor, segundos: float, escritores: int, lectores: int) -> dict:
+    """Lanza hilos escritores y lectores durante `segundos` y cuenta operaciones."""
+    Sesion = sessionmaker(bind=motor, autoflush=False)
+    fin = time.perf_counter() + segundos
+    contadores = {"escrituras": 0, "lecturas": 0, "errores": 0}
+    candado = threading.Lock()
+
+    def escritor(semilla: int):
+        i = semilla * 1_000_000
+        while time.perf_counter() < fin:
+            try:
+                with Sesion() as db:
+                    crear_llamada(db, _llamada(i))
+                with candado:
+                    contadores["escrituras"] += 1
+            except Exception:
+                with candado:
+                    contadores["errores"] += 1
+            i += 1
+
+    def lector(semilla: int):
+        tipos = ("venta", "soporte", "reclamo", None)
+        i = semilla
+        while time.perf_counter() < fin:
+            try:
+                with Sesion() as db:
+                    obtener_llamadas(db, limit=50, tipo=tipos[i % 4])
+                with candado:
+                    contadores["lecturas"] += 1
+            except Exception:
+                with candado:
+                    contadores["errores"] += 1
+            i += 1
+
+    hilos = [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+    hilos += [threading.Thread(target=lector, args=(n,)) for n in range(lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    contadores["escrituras_s"] = contadores["escrituras"] / segundos
+    contadores["lecturas_s"] = contadores["lecturas"] / segundos
+    return contadores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--escritores", type=int, default=4)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--llamadas-iniciales", type=int, default=5000)
+    args = parser.parse_args()
+
+    perfiles = {
+        "por defecto": {},
+        "PERFIL_SQLITE": PERFIL_SQLITE,
+    }
+
+    print("=" * 60)
+    print("BENCHMARK SQLITE - CARGA MIXTA")
+    print(f"{args.escritores} escritores, {args.lectores} lectores, {args.segundos}s")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for indice, (nombre, perfil) in enumerate(perfiles.items()):
+            ruta = os.path.join(directorio, f"benchmark_{indice}.db")
+            motor = crear_motor(f"sqlite:///{ruta}", perfil=perfil)
+            preparar_base(motor, args.llamadas_iniciales)
+            resultado = ejecutar_carga(motor, args.segundos, args.escritores, args.lectores)
+            motor.dispose()
+
+            print(f"Perfil: {nombre}")
+            print(f"  Escrituras/s: {resultado['escrituras_s']:.1f}")
+            print(f"  Lecturas/s:   {resultado['lecturas_s']:.1f}")
+            print(f"  Errores:      {resultado['errores']}")
+            print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark del clasificador por vecinos más cercanos (servicios/clasificador_vecinos.py).
+
+Construye un índice en memoria con textos sintéticos etiquetados (frases de
+cada categoría combinadas al azar), mide el tiempo por consulta y la
+exactitud sobre textos nuevos, y compara guardar/cargar (mmap) del índice.
+No necesita el LLM.
+
+Uso:
+    python test/benchmark_vecinos.py [--ejemplos 20000] [--consultas 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicios.clasificador_vecinos import IndiceVecinos
+
+FRASES = {
+    "venta": [
+        "cliente interesado en cambiar de plan", "ofrecer paquete de datos adicional",
+        "pregunta por el precio del combo hogar", "quiere contratar television",
+        "enviar enlace de pago", "renovar contrato con beneficio", "portabilidad desde otro operador",
+    ],
+    "soporte": [
+        "internet lento desde ayer", "no tiene señal en el celular", "configurar el router wifi",
+        "la factura no carga en la app", "cambiar la clave del wifi", "el decodificador no enciende",
+        "revisar la instalacion",
+    ],
+    "reclamo": [
+        "cobro doble en la factura", "cliente molesto por el servicio", "exige devolucion del dinero",
+        "lleva una semana sin servicio", "el tecnico no llego a la cita", "amenaza con cancelar",
+        "inconforme con la respuesta anterior",
+    ],
+}
+RELLENO = ["el cliente", "llama para", "hoy", "de nuevo", "en la mañana", "indica que", "y ademas"]
+
+
+def texto_aleatorio(generador: random.Random, categoria: str) -> str:
+    """Dos frases de la categoría con palabras de relleno en medio."""
+    frases = generador.sample(FRASES[categoria], 2)
+    return f"{generador.choice(RELLENO)} {frases[0]} {generador.choice(RELLENO)} {frases[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ejemplos", type=int, default=20000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    args = parser.parse_args()
+
+    generador = random.Random(7)
+    categorias = list(FRASES)
+    etiquetas = [generador.choice(categorias) for _ in range(args.ejemplos)]
+    textos = [texto_aleatorio(generador, categoria) for categoria in etiquetas]
+
+    print("=" * 60)
+    print(f"BENCHMARK VECINOS MÁS CERCANOS ({args.ejemplos} ejemplos)")
+    print("=" * 60)
+
+    indice = IndiceVecinos()
+    inicio = time.perf_counter()
+    for posicion in range(0, len(textos), 1000):
+        indice.agregar(textos[posicion:posicion + 1000], etiquetas[posicion:posicion + 1000])
+    print(f"Construcción: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    inicio = time.perf_counter()
+    indice.agregar(["cliente pide cambiar de plan y enviar enlace de pago"], ["venta"])
+    print(f"Agregar 1 ejemplo: {(time.perf_counter() - inicio) * 1e6:.1f} us")
+
+    esperadas = [generador.choice(categorias) for _ in range(args.consultas)]
+    consultas = [texto_aleatorio(generador, categoria) for categoria in esperadas]
+    tiempos = []
+    correctas = 0
+    respondidas = 0
+    for texto, esperada in zip(consultas, esperadas):
+        inicio = time.perf_counter()
+        resultado = indice.clasificar(texto)
+        tiempos.append(time.perf_counter() - inicio)
+        if resultado is not None:
+            respondidas += 1
+            correctas += resultado["categoria"] == esperada
+    tiempos.sort()
+    print(
+        f"Consulta: prom {statistics.mean(tiempos) * 1e6:7.1f} us"
+        f"  p50 {tiempos[len(tiempos) // 2] * 1e6:7.1f} us"
+        f"  p99 {tiempos[int(len(tiempos) * 0.99) - 1] * 1e6:7.1f} us"
+    )
+    print(
+        f"Respondidas sin LLM: {respondidas}/{len(consultas)}"
+        f"  exactitud: {correctas / respondidas if respondidas else 0.0:.3f}"
+    )
+
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        indice.guardar(directorio)
+        print(f"Guardar: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        cargado = IndiceVecinos()
+        inicio = time.perf_counter()
+        cargado.cargar(directorio)
+        print(f"Cargar (mmap): {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        assert cargado.clasificar(consultas[0]) == indice.clasificar(consultas[0])
+        del cargado
+
+
+if __name__ == "__main__":
+    main()
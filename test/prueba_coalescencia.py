@@ -0,0 +1,75 @@
+"""
+Prueba de la agrupación de clasificaciones idénticas en curso
+(VUELOS_CLASIFICACION en servicios/clasificacion_ia.py).
+
+Envía a la vez muchas veces el mismo texto (con variaciones de mayúsculas,
+tildes y espacios) y la misma llamada contra un servidor stub local
+(test/stub_openai.py), y verifica que cada una llegue una sola vez al LLM.
+No necesita LM Studio.
+
+Uso:
+    python test/prueba_coalescencia.py [--peticiones 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_openai import iniciar_stub
+
+STUB = iniciar_stub(latencia=0.2)
+os.environ["LLM_BACKENDS"] = STUB.url
+# Sin caché persistente: una corrida anterior ya habría guardado las respuestas
+os.environ["CLASIFICACION_CACHE_PERSISTENTE_ARCHIVO"] = ""
+
+from servicios.clasificacion_ia import (
+    VUELOS_CLASIFICACION,
+    clasificar_llamada_con_ia_async,
+    clasificar_texto_llamada_async,
+)
+
+TEXTO = "El cliente llama porque la factura llegó con un valor distinto al acordado"
+VARIANTES = [TEXTO, TEXTO.upper(), TEXTO.replace("ó", "o"), f"  {TEXTO}  "]
+
+
+async def rafaga(cantidad: int) -> tuple:
+    textos = await asyncio.gather(
+        *(clasificar_texto_llamada_async(VARIANTES[i % len(VARIANTES)]) for i in range(cantidad))
+    )
+    llamadas = await asyncio.gather(
+        *(clasificar_llamada_con_ia_async("soporte", "escalada", duracion_segundos=240) for _ in range(cantidad))
+    )
+    return textos, llamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PRUEBA AGRUPACIÓN DE CLASIFICACIONES EN CURSO")
+    print("=" * 60)
+
+    textos, llamadas = asyncio.run(rafaga(args.peticiones))
+    estadisticas = VUELOS_CLASIFICACION.estadisticas()
+    print(f"Clasificaciones: {len(textos)} textos + {len(llamadas)} llamadas")
+    print(f"Peticiones al LLM: {STUB.peticiones}")
+    print(f"Agrupadas: {estadisticas['agrupadas']}  (tasa {estadisticas['tasa_agrupadas']:.2%})")
+
+    assert len({resultado["categoria"] for resultado in textos}) == 1
+    assert len({resultado["categoria"] for resultado in llamadas}) == 1
+    assert STUB.peticiones == 2, "Cada entrada debería consultarse una sola vez"
+    assert estadisticas["agrupadas"] == 2 * (args.peticiones - 1)
+    assert estadisticas["en_curso"] == 0
+
+    print("\nOK")
+    STUB.detener()
+
+
+if __name__ == "__main__":
+    main()
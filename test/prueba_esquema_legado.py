@@ -0,0 +1,107 @@
+"""
+Prueba de actualizar_esquema (mantenimiento.py) sobre una base anterior.
+
+Carga data/ddl.sql y data/datos.sql sin el índice único de
+clasificacion_ia.llamada_id (como las bases creadas antes de declararlo) y
+verifica que:
+  - actualizar_esquema crea el índice, así crear_clasificaciones_ia_lote
+    (ON CONFLICT DO NOTHING) omite las llamadas ya clasificadas en lugar de
+    fallar
+  - con clasificaciones repetidas actualizar_esquema falla con un mensaje
+    claro y no cambia la base
+
+No necesita LM Studio.
+
+Uso:
+    python test/prueba_esquema_legado.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import sessionmaker
+from modelos.database import crear_motor
+from esquemas import ClasificacionIACreate
+from crud import crear_clasificaciones_ia_lote
+from mantenimiento import actualizar_esquema
+
+INDICE_UNICO = "uq_clasificacion_ia_llamada_id"
+
+
+def crear_base_legada(archivo: str, duplicada: bool = False) -> None:
+    """Base con el DDL y los datos de ejemplo, sin el índice único."""
+    conexion = sqlite3.connect(archivo)
+    with open(os.path.join(RAIZ, "data", "ddl.sql"), encoding="utf-8") as ddl:
+        conexion.executescript(ddl.read())
+    with open(os.path.join(RAIZ, "data", "datos.sql"), encoding="utf-8") as datos:
+        conexion.executescript(datos.read())
+    conexion.execute(f"DROP INDEX {INDICE_UNICO}")
+    if duplicada:
+        conexion.execute(
+            "INSERT INTO clasificacion_ia (llamada_id, categoria, confianza)"
+            " SELECT llamada_id, categoria, confianza FROM clasificacion_ia LIMIT 1"
+        )
+    conexion.commit()
+    conexion.close()
+
+
+def indices_clasificacion(motor) -> set:
+    return {indice["name"] for indice in inspect(motor).get_indexes("clasificacion_ia")}
+
+
+def main():
+    print("=" * 60)
+    print("PRUEBA ACTUALIZAR ESQUEMA SOBRE UNA BASE ANTERIOR")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # 1. Base sin el índice: actualizar_esquema lo crea y el lote omite las repetidas
+        archivo = os.path.join(directorio, "legada.db")
+        crear_base_legada(archivo)
+        motor = crear_motor(f"sqlite:///{archivo}")
+        assert INDICE_UNICO not in indices_clasificacion(motor)
+        actualizar_esquema(motor)
+        assert INDICE_UNICO in indices_clasificacion(motor)
+
+        Sesion = sessionmaker(bind=motor, autoflush=False)
+        with Sesion() as db:
+            # Los datos de ejemplo tienen todas las llamadas clasificadas: se libera una
+            clasificada, sin_clasificar = db.execute(
+                text("SELECT llamada_id FROM clasificacion_ia ORDER BY llamada_id LIMIT 2")
+            ).scalars().all()
+            db.execute(text("DELETE FROM clasificacion_ia WHERE llamada_id = :id"), {"id": sin_clasificar})
+            db.commit()
+            creadas = crear_clasificaciones_ia_lote(db, [
+                ClasificacionIACreate(llamada_id=llamada_id, categoria="venta", confianza=0.9)
+                for llamada_id in (clasificada, sin_clasificar)
+            ])
+            creadas = [clasificacion.llamada_id for clasificacion in creadas]
+        print(f"Lote sobre la base actualizada: creadas {creadas}, omitida {clasificada}")
+        assert creadas == [sin_clasificar]
+        motor.dispose()
+
+        # 2. Base con clasificaciones repetidas: error claro y sin cambios
+        archivo = os.path.join(directorio, "duplicada.db")
+        crear_base_legada(archivo, duplicada=True)
+        motor = crear_motor(f"sqlite:///{archivo}")
+        try:
+            actualizar_esquema(motor)
+        except ValueError as e:
+            print(f"Base con repetidas: {e}")
+            assert INDICE_UNICO in str(e) and "llamada_id=" in str(e)
+        else:
+            raise AssertionError("actualizar_esquema debería fallar con clasificaciones repetidas")
+        assert INDICE_UNICO not in indices_clasificacion(motor)
+        motor.dispose()
+
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
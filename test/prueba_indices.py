@@ -0,0 +1,161 @@
+"""
+Verifica con EXPLAIN QUERY PLAN que las consultas CRUD usan índices.
+
+Ejecuta cada consulta de lectura de crud/ sobre dos esquemas:
+  - el generado por los modelos (Base.metadata.create_all)
+  - el de data/ddl.sql (para comprobar que los índices están replicados)
+y falla si alguna recorre la tabla completa o necesita un ordenamiento temporal.
+
+Uso:
+    python test/prueba_indices.py
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from modelos import Base
+from modelos.database import crear_motor
+import crud
+from crud.paginacion import codificar_cursor
+
+# (descripción, función CRUD, argumentos con nombre)
+CONSULTAS = [
+    ("obtener_llamada", crud.obtener_llamada, {"llamada_id": 1}),
+    ("obtener_llamadas", crud.obtener_llamadas, {}),
+    ("obtener_llamadas usuario_id", crud.obtener_llamadas, {"usuario_id": 1}),
+    ("obtener_llamadas tipo", crud.obtener_llamadas, {"tipo": "venta"}),
+    ("obtener_llamadas resultado", crud.obtener_llamadas, {"resultado": "resuelta"}),
+    ("obtener_llamadas tipo+resultado", crud.obtener_llamadas, {"tipo": "venta", "resultado": "resuelta"}),
+    ("obtener_llamadas rango", crud.obtener_llamadas, {"fecha_desde": "2025-01-12", "fecha_hasta": "2025-01-14"}),
+    ("obtener_llamadas usuario_id+rango", crud.obtener_llamadas, {"usuario_id": 1, "fecha_desde": "2025-01-12T00:00:00-05:00"}),
+    ("obtener_llamadas_por_usuario", crud.obtener_llamadas_por_usuario, {"usuario_id": 1}),
+    ("obtener_llamadas cursor", crud.obtener_llamadas, {"cursor": codificar_cursor(1736757600, 4)}),
+    ("obtener_llamadas tipo+cursor", crud.obtener_llamadas, {"tipo": "venta", "cursor": codificar_cursor(1736757600, 4)}),
+    ("obtener_llamadas cursor sin fecha", crud.obtener_llamadas, {"cursor": codificar_cursor(None, 4)}),
+    ("exportar_llamadas", lambda db, **kw: list(crud.exportar_llamadas(db, **kw)), {}),
+    ("exportar_llamadas rango", lambda db, **kw: list(crud.exportar_llamadas(db, **kw)), {"fecha_desde": "2025-01-12", "fecha_hasta": "2025-01-14"}),
+    ("exportar_llamadas tipo+rango", lambda db, **kw: list(crud.exportar_llamadas(db, **kw)), {"tipo": "venta", "fecha_desde": "2025-01-12"}),
+    ("obtener_clasificacion_ia", crud.obtener_clasificacion_ia, {"clasificacion_id": 1}),
+    ("obtener_clasificacion_ia_por_llamada", crud.obtener_clasificacion_ia_por_llamada, {"llamada_id": 1}),
+    ("obtener_clasificaciones_ia", crud.obtener_clasificaciones_ia, {}),
+    ("obtener_clasificaciones_ia categoria", crud.obtener_clasificaciones_ia, {"categoria": "venta"}),
+    ("obtener_clasificaciones_ia confianza_minima", crud.obtener_clasificaciones_ia, {"confianza_minima": 0.9}),
+    ("obtener_clasificaciones_ia categoria+confianza", crud.obtener_clasificaciones_ia, {"categoria": "venta", "confianza_minima": 0.9}),
+    ("obtener_clasificaciones_ia cursor", crud.obtener_clasificaciones_ia, {"cursor": codificar_cursor(0.9, 3)}),
+    ("obtener_clasificaciones_ia categoria+cursor", crud.obtener_clasificaciones_ia, {"categoria": "venta", "cursor": codificar_cursor(0.9, 3)}),
+    ("obtener_metrica", crud.obtener_metrica, {"metrica_id": 1}),
+    ("obtener_metrica_por_fecha", crud.obtener_metrica_por_fecha, {"fecha": "2025-01-12"}),
+    ("obtener_metricas", crud.obtener_metricas, {}),
+    ("obtener_metricas rango", crud.obtener_metricas, {"fecha_desde": "2025-01-12", "fecha_hasta": "2025-01-14"}),
+    ("obtener_reporte", crud.obtener_reporte, {"reporte_id": 1}),
+    ("obtener_reportes", crud.obtener_reportes, {}),
+    ("obtener_reportes generado_por", crud.obtener_reportes, {"generado_por": 2}),
+    ("obtener_reportes rango", crud.obtener_reportes, {"fecha_desde": "2025-01-12", "fecha_hasta": "2025-01-14"}),
+    ("obtener_reportes generado_por+rango", crud.obtener_reportes, {"generado_por": 2, "fecha_desde": "2025-01-12"}),
+    ("obtener_reportes_por_usuario", crud.obtener_reportes_por_usuario, {"usuario_id": 2}),
+    ("obtener_reportes cursor", crud.obtener_reportes, {"cursor": codificar_cursor("2025-01-13T00:00:00", 2)}),
+    ("obtener_reportes generado_por+cursor", crud.obtener_reportes, {"generado_por": 2, "cursor": codificar_cursor("2025-01-13T00:00:00", 2)}),
+    ("obtener_usuario", crud.obtener_usuario, {"usuario_id": 1}),
+    ("obtener_usuario_por_email", crud.obtener_usuario_por_email, {"email": "sup@example.com"}),
+]
+
+
+def capturar_sql(motor, funcion, kwargs) -> list:
+    """Ejecuta la función CRUD y devuelve las sentencias SELECT que emitió."""
+    capturadas = []
+
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            capturadas.append((statement, parameters))
+
+    Sesion = sessionmaker(bind=motor, autoflush=False)
+    event.listen(motor, "before_cursor_execute", _capturar)
+    try:
+        with Sesion() as db:
+            funcion(db, **kwargs)
+    finally:
+        event.remove(motor, "before_cursor_execute", _capturar)
+    return capturadas
+
+
+def problemas_del_plan(conexion, statement, parameters) -> list:
+    """Devuelve las líneas del plan que indican recorrido completo u orden temporal."""
+    plan = conexion.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    problemas = []
+    for fila in plan:
+        detalle = fila[-1]
+        if detalle.startswith(("SCAN", "SEARCH")) and "USING" not in detalle:
+            problemas.append(detalle)
+        if "USE TEMP B-TREE" in detalle:
+            problemas.append(detalle)
+    return problemas
+
+
+def verificar_esquema(nombre: str, ruta: str) -> int:
+    """Verifica todas las consultas sobre la base en `ruta`. Retorna el número de fallos."""
+    motor = crear_motor(f"sqlite:///{ruta}", perfil={})
+    conexion = sqlite3.connect(ruta)
+    fallos = 0
+
+    print(f"Esquema: {nombre}")
+    for descripcion, funcion, kwargs in CONSULTAS:
+        for statement, parameters in capturar_sql(motor, funcion, kwargs):
+            problemas = problemas_del_plan(conexion, statement, parameters)
+            estado = "OK   " if not problemas else "FALLA"
+            print(f"  [{estado}] {descripcion}")
+            for problema in problemas:
+                print(f"           {problema}")
+            fallos += bool(problemas)
+
+    conexion.close()
+    motor.dispose()
+    print("-" * 60)
+    return fallos
+
+
+def main():
+    print("=" * 60)
+    print("EXPLAIN QUERY PLAN DE LAS CONSULTAS CRUD")
+    print("=" * 60)
+
+    datos = open(os.path.join(RAIZ, "data", "datos.sql"), encoding="utf-8").read()
+    fallos = 0
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Esquema a partir de los modelos
+        ruta_modelos = os.path.join(directorio, "modelos.db")
+        motor = crear_motor(f"sqlite:///{ruta_modelos}", perfil={})
+        Base.metadata.create_all(motor)
+        motor.dispose()
+        conexion = sqlite3.connect(ruta_modelos)
+        conexion.executescript(
+            "INSERT INTO usuarios (nombre, email, password, rol) VALUES "
+            "('Agente 1', 'agente1@example.com', '123456', 'agente'), "
+            "('Supervisor', 'sup@example.com', '123456', 'supervisor'), "
+            "('Administrador', 'admin@example.com', '123456', 'admin');"
+        )
+        conexion.executescript(datos)
+        conexion.close()
+        fallos += verificar_esquema("modelos (create_all)", ruta_modelos)
+
+        # Esquema a partir de data/ddl.sql
+        ruta_ddl = os.path.join(directorio, "ddl.db")
+        conexion = sqlite3.connect(ruta_ddl)
+        conexion.executescript(open(os.path.join(RAIZ, "data", "ddl.sql"), encoding="utf-8").read())
+        conexion.executescript(datos)
+        conexion.close()
+        fallos += verificar_esquema("data/ddl.sql", ruta_ddl)
+
+    assert fallos == 0, f"{fallos} consultas no usan índice"
+    print("Todas las consultas usan índice.")
+
+
+if __name__ == "__main__":
+    main()
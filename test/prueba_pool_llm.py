@@ -0,0 +1,111 @@
+"""
+Prueba del pool de servidores LLM (servicios/pool_llm.py) con stubs locales.
+
+Arranca tres servidores stub (test/stub_openai.py): uno rápido, uno lento y
+uno que se cae a mitad de la prueba. Verifica que:
+  - el rápido recibe más peticiones (menos peticiones en curso)
+  - al caerse un servidor las peticiones pasan a los demás sin errores, y
+    el servidor queda expulsado (circuito abierto y sondeo fallido)
+  - al volver, un sondeo lo marca sano y la petición de prueba cierra su
+    circuito
+
+No necesita LM Studio.
+
+Uso:
+    python test/prueba_pool_llm.py [--peticiones 60]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_openai import iniciar_stub
+
+RAPIDO = iniciar_stub(latencia=0.02)
+LENTO = iniciar_stub(latencia=0.15)
+INESTABLE = iniciar_stub(latencia=0.02)
+
+# Configuración del pool antes de importar servicios.llm
+os.environ["LLM_BACKENDS"] = ",".join(stub.url for stub in (RAPIDO, LENTO, INESTABLE))
+os.environ["LLM_MAX_REINTENTOS"] = "0"
+os.environ["LLM_CIRCUITO_FALLOS"] = "2"
+os.environ["LLM_CIRCUITO_ESPERA_SEGUNDOS"] = "0.5"
+
+from servicios.llm import POOL_LLM, completar_chat_async
+
+MENSAJES = [{"role": "user", "content": "Escalar a supervisor por tono alterado"}]
+
+
+async def rafaga(cantidad: int) -> list:
+    """
+    Envía `cantidad` peticiones simultáneas; retorna respuestas o excepciones.
+    Cierra los clientes antes de que asyncio.run termine el event loop.
+    """
+    try:
+        return await asyncio.gather(
+            *(completar_chat_async(MENSAJES) for _ in range(cantidad)), return_exceptions=True
+        )
+    finally:
+        await POOL_LLM.cerrar_clientes_async()
+
+
+def imprimir_estado(titulo: str) -> None:
+    print(f"\n{titulo}")
+    for estadisticas in POOL_LLM.estadisticas():
+        print(
+            f"  {estadisticas['url']:32} disponible={str(estadisticas['disponible']):5}"
+            f"  peticiones={estadisticas['peticiones']:3d}  errores={estadisticas['errores']:2d}"
+            f"  latencia prom {estadisticas['latencia_promedio_segundos'] * 1000:6.1f} ms"
+            f"  circuito={estadisticas['circuito']['estado']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=60)
+    args = parser.parse_args()
+    rapido, lento, inestable = POOL_LLM.backends
+
+    print("=" * 60)
+    print("PRUEBA POOL DE SERVIDORES LLM")
+    print("=" * 60)
+
+    # 1. Reparto por peticiones en curso
+    resultados = asyncio.run(rafaga(args.peticiones))
+    errores = [r for r in resultados if isinstance(r, BaseException)]
+    imprimir_estado("Ráfaga con los tres servidores:")
+    assert not errores, errores
+    assert rapido.peticiones > lento.peticiones, "El servidor rápido debería recibir más peticiones"
+
+    # 2. Un servidor se cae: failover y expulsión
+    INESTABLE.fallando = True
+    antes = inestable.peticiones
+    resultados = asyncio.run(rafaga(args.peticiones))
+    errores = [r for r in resultados if isinstance(r, BaseException)]
+    POOL_LLM.sondear()
+    imprimir_estado("Ráfaga con un servidor caído:")
+    assert not errores, f"Peticiones sin failover: {errores[:3]}"
+    assert inestable.interruptor.estado == "abierto" and not inestable.sano
+    # Solo las que ya iban en camino antes de abrir el circuito (muy por debajo de un tercio)
+    assert inestable.peticiones - antes < args.peticiones / 6, "El servidor caído siguió recibiendo peticiones"
+
+    # 3. El servidor vuelve: sondeo sano y petición de prueba
+    INESTABLE.fallando = False
+    POOL_LLM.sondear()
+    time.sleep(0.6)
+    asyncio.run(rafaga(args.peticiones))
+    imprimir_estado("Ráfaga tras recuperar el servidor:")
+    assert inestable.sano and inestable.interruptor.estado == "cerrado"
+
+    print("\nOK")
+    for stub in (RAPIDO, LENTO, INESTABLE):
+        stub.detener()
+
+
+if __name__ == "__main__":
+    main()
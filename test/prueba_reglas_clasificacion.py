@@ -0,0 +1,63 @@
+"""
+Prueba de la clasificación de textos por palabras clave
+(servicios/reglas_clasificacion.py).
+
+Verifica que los textos claros se resuelvan por reglas y que las palabras
+que solo empiezan como una palabra clave ("ventajas", "planta"), o una sola
+palabra clave incidental o negada, no basten para responder sin el LLM.
+No necesita LM Studio.
+
+Uso:
+    python test/prueba_reglas_clasificacion.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servicios.reglas_clasificacion import clasificar_por_reglas, puntajes_reglas
+
+# Texto -> categoría esperada, resuelta por reglas
+DECISIVOS = {
+    "Ofrecer plan premium con descuento del 10%": "venta",
+    "Guiar al cliente a reiniciar el módem de Claro": "soporte",
+    "Escalar a supervisor por tono alterado": "reclamo",
+    "Registrar PQR y confirmar número de radicado": "reclamo",
+    "Pregunta por los planes y las promociones vigentes": "venta",
+    "Reporta varios errores y problemas con la aplicación": "soporte",
+}
+
+# Textos que no deben resolverse por reglas
+NO_DECISIVOS = [
+    "Ventajas del servicio explicadas",
+    "Cliente llama desde la planta de produccion",
+    "No hay ningún error, solo quería confirmar la dirección",
+    "El cliente no quiere ninguna oferta",
+]
+
+
+def main():
+    print("=" * 60)
+    print("PRUEBA CLASIFICACIÓN POR REGLAS")
+    print("=" * 60)
+
+    for texto, esperada in DECISIVOS.items():
+        categoria, decisiva = clasificar_por_reglas(texto)
+        print(f"{texto!r:60} -> {categoria} (decisiva={decisiva})")
+        assert (categoria, decisiva) == (esperada, True), texto
+
+    for texto in NO_DECISIVOS:
+        categoria, decisiva = clasificar_por_reglas(texto)
+        print(f"{texto!r:60} -> {categoria} (decisiva={decisiva})")
+        assert not decisiva, texto
+
+    # Prefijos de palabras clave no cuentan como coincidencia
+    assert not puntajes_reglas("Ventajas del servicio explicadas")
+    assert not puntajes_reglas("Cliente llama desde la planta de produccion")
+
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
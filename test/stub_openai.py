@@ -0,0 +1,224 @@
+"""
+Servidor local compatible con OpenAI para pruebas sin LM Studio.
+
+Responde GET /v1/models y POST /v1/chat/completions (con y sin stream)
+clasificando la última descripción del prompt por palabras clave, tras
+esperar `latencia` segundos más hasta `jitter` segundos. Una fracción
+`tasa_malformadas` de las descripciones recibe una respuesta que no es la
+clasificación pedida (texto libre, JSON cortado o categoría inexistente).
+Con `fallando = True` responde 500 a todo, para simular un servidor caído
+sin cerrar el puerto.
+
+El jitter y las respuestas malformadas dependen solo de la descripción y
+de `semilla` (no del orden de llegada), así dos corridas con la misma
+configuración reciben las mismas respuestas.
+
+Uso como script:
+    python test/stub_openai.py [--puerto 18080] [--latencia 0.05] [--jitter 0.02] [--tasa-malformadas 0.05]
+
+Uso desde otra prueba:
+    stub = iniciar_stub(latencia=0.05)   # puerto libre, en un hilo
+    ... OPENAI_BASE_URL = stub.url ...
+    stub.detener()
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PALABRAS = {
+    "reclamo": ("queja", "pqr", "supervisor", "escalar", "reclamo", "radicado", "cobro", "molesto"),
+    "venta": ("plan", "oferta", "pago", "venta", "descuento", "precio", "contratar"),
+}
+
+
+def clasificar(descripcion: str) -> str:
+    """Categoría de una descripción: la del tipo de llamada o por palabras clave."""
+    descripcion = descripcion.lower()
+    tipo = re.search(r"tipo de llamada: (\w+)", descripcion)
+    if tipo and tipo.group(1) in ("venta", "soporte", "reclamo"):
+        return tipo.group(1)
+    for categoria, palabras in PALABRAS.items():
+        if any(palabra in descripcion for palabra in palabras):
+            return categoria
+    return "soporte"
+
+
+RESPUESTAS_MALFORMADAS = (
+    "Claro, con gusto. Esta llamada parece ser de un cliente que necesita ayuda.",
+    '{"clasificacion": "sop',
+    '{"clasificacion": "consulta"}',
+)
+
+
+class ServidorStub(ThreadingHTTPServer):
+    """ThreadingHTTPServer con la configuración y los contadores del stub."""
+
+    daemon_threads = True
+    # Cola de conexiones pendientes; con la de omisión (5) las ráfagas esperan reintentos de TCP
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        direccion,
+        latencia: float,
+        jitter: float = 0.0,
+        tasa_malformadas: float = 0.0,
+        semilla: int = 0,
+    ):
+        super().__init__(direccion, ManejadorStub)
+        self.latencia = latencia
+        self.jitter = jitter
+        self.tasa_malformadas = tasa_malformadas
+        self.semilla = semilla
+        self.fallando = False
+        self.peticiones = 0
+        self._candado = threading.Lock()
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def contar(self) -> None:
+        with self._candado:
+            self.peticiones += 1
+
+    def azar(self, texto: str, uso: str) -> float:
+        """Número en [0, 1) fijo para cada texto, uso y semilla."""
+        return zlib.crc32(f"{self.semilla}:{uso}:{texto}".encode()) / 2 ** 32
+
+    def detener(self) -> None:
+        """Cierra el servidor y libera el puerto."""
+        self.shutdown()
+        self.server_close()
+
+
+class ManejadorStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo salen en escrituras separadas: con Nagle y el ACK
+    # retrasado del cliente cada respuesta keep-alive esperaría unos 40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente cerró la conexión (tras cortar un stream o agotar su plazo)
+            pass
+
+    def _responder_json(self, estado: int, datos: dict) -> None:
+        cuerpo = json.dumps(datos).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        if self.server.fallando:
+            self._responder_json(500, {"error": {"message": "stub fallando"}})
+            return
+        self._responder_json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+
+    def do_POST(self):
+        peticion = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.contar()
+        if self.server.fallando:
+            self._responder_json(500, {"error": {"message": "stub fallando"}})
+            return
+        ultimo = peticion["messages"][-1]["content"]
+        time.sleep(self.server.latencia + self.server.jitter * self.server.azar(ultimo, "jitter"))
+
+        numeradas = re.findall(r"^(\d+)\. (.*)$", ultimo, re.M)
+        if self.server.azar(ultimo, "malformada") < self.server.tasa_malformadas:
+            contenido = RESPUESTAS_MALFORMADAS[int(self.server.azar(ultimo, "tipo") * len(RESPUESTAS_MALFORMADAS))]
+        elif numeradas:
+            arreglo = [{"id": int(numero), "clasificacion": clasificar(texto)} for numero, texto in numeradas]
+            contenido = json.dumps({"clasificaciones": arreglo} if peticion.get("response_format") else arreglo)
+        else:
+            contenido = json.dumps({"clasificacion": clasificar(ultimo)})
+
+        if peticion.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            fragmento = {
+                "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": peticion["model"],
+                "choices": [{"index": 0, "delta": {"content": contenido}, "finish_reason": None}],
+            }
+            try:
+                for evento in (f"data: {json.dumps(fragmento)}\n\n", "data: [DONE]\n\n"):
+                    datos = evento.encode()
+                    self.wfile.write(f"{len(datos):x}\r\n".encode() + datos + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # El cliente cortó el stream al tener la respuesta
+                self.close_connection = True
+            return
+
+        self._responder_json(200, {
+            "id": "stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": peticion["model"],
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": contenido},
+            }],
+            "usage": {"prompt_tokens": len(ultimo.split()), "completion_tokens": 8, "total_tokens": len(ultimo.split()) + 8},
+        })
+
+
+def iniciar_stub(
+    puerto: int = 0,
+    latencia: float = 0.05,
+    jitter: float = 0.0,
+    tasa_malformadas: float = 0.0,
+    semilla: int = 0,
+) -> ServidorStub:
+    """
+    Arranca un stub en un hilo aparte.
+
+    Args:
+        puerto: Puerto local (0 = uno libre)
+        latencia: Segundos de espera antes de cada respuesta
+        jitter: Segundos adicionales máximos (varía por descripción)
+        tasa_malformadas: Fracción de descripciones con respuesta malformada
+        semilla: Cambia qué descripciones reciben jitter alto o respuesta malformada
+
+    Returns:
+        El servidor; su URL base está en .url
+    """
+    servidor = ServidorStub(("127.0.0.1", puerto), latencia, jitter, tasa_malformadas, semilla)
+    servidor._hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    servidor._hilo.start()
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--puerto", type=int, default=18080)
+    parser.add_argument("--latencia", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tasa-malformadas", type=float, default=0.0)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    servidor = ServidorStub(
+        ("127.0.0.1", args.puerto), args.latencia, args.jitter, args.tasa_malformadas, args.semilla
+    )
+    print(f"Stub OpenAI en {servidor.url} (latencia {args.latencia} s)")
+    servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    main()